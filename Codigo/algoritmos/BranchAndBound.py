@@ -0,0 +1,248 @@
+import heapq
+import time
+import numpy as np
+from numba import njit
+from algoritmos.Budget import new_budget, deadline_budget, remaining_time, resolve_budget, spend, exhausted, record
+from algoritmos.CandidateLists import resolve_candidates
+from algoritmos.CostEvaluation import calculate_cost
+from algoritmos.GreedyAlgorithm import greedy_uflp
+from algoritmos.LowerBound import lagrangian_multipliers, lagrangian_value, all_free, FACILITY_FREE, FACILITY_OPEN, FACILITY_CLOSED
+from algoritmos.Reduction import reduced_cost_fixing, dominance_fixing
+from algoritmos.SwapLocalSeach import swap_heuristic_local_search, swap_heuristic_uflp
+from algoritmos.SwitchLocalSearch import switch_heuristic_uflp
+
+"""
+Branch-and-bound exato (anytime) para instâncias pequenas e médias.
+
+Cada nó fixa o estado (aberta/fechada) de algumas instalações. Em cada nó:
+    - o limite inferior é o Lagrangiano (subida dual seguida de subgradiente, ver LowerBound), com os
+      multiplicadores do nó pai como ponto de partida;
+    - a fixação por custos reduzidos e as regras de dominância (ver Reduction) fixam mais instalações;
+    - a solução do subproblema Lagrangiano, melhorada com o swap, pode melhorar a melhor solução conhecida;
+    - o nó é ramificado na instalação livre com menor custo reduzido em valor absoluto.
+
+Os nós são explorados pelo menor limite (best-first) ou em profundidade (depth-first). A qualquer momento
+a melhor solução conhecida e o menor limite dos nós por explorar dão um gap certificado; quando a árvore
+se esgota a solução é ótima.
+"""
+
+# Estratégias de exploração da árvore
+SEARCH_STRATEGIES = ('best', 'depth')
+
+# Algoritmos usados para a solução inicial (melhor solução conhecida na raiz)
+INITIAL_INCUMBENTS = {
+    'greedy': greedy_uflp,
+    'switch': switch_heuristic_uflp,
+    'swap': swap_heuristic_uflp,
+}
+
+@njit(cache=True)
+def subproblem_solution(cost_matrix, facility_costs, multipliers, status):
+    """
+    Solução do subproblema Lagrangiano de um nó e custos reduzidos das instalações.
+
+    Returns:
+    tuple: Instalações abertas no subproblema (np.array de bool) e custos reduzidos.
+    """
+    num_facilities = cost_matrix.shape[1]
+    reduced = np.empty(num_facilities, dtype=np.float64)
+    facility_open = np.empty(num_facilities, dtype=np.bool_)
+    lagrangian_value(cost_matrix, facility_costs, multipliers, status, reduced, facility_open)
+    return facility_open, reduced
+
+@njit(cache=True)
+def branching_facility(status, reduced):
+    """
+    Instalação livre com o menor custo reduzido em valor absoluto (a mais indecisa); -1 se não houver livres.
+    """
+    chosen = -1
+    for facility in range(status.shape[0]):
+        if status[facility] == FACILITY_FREE and (chosen < 0 or abs(reduced[facility]) < abs(reduced[chosen])):
+            chosen = facility
+    return chosen
+
+def compile_node_kernels(cost_matrix, facility_costs):
+    """
+    Compila os kernels usados nos nós abaixo da raiz (fixações com prazo e ramificação), que numa instância
+    pequena de aquecimento nunca são chamados porque a raiz já prova a otimalidade.
+    """
+    facility_costs = np.asarray(facility_costs, dtype=np.float64)
+    status = all_free(cost_matrix.shape[1])
+    deadline = deadline_budget(new_budget())
+    bound, multipliers = lagrangian_multipliers(cost_matrix, facility_costs, np.inf, 1, status, None, deadline)
+    lagrangian_multipliers(cost_matrix, facility_costs, np.inf, 1, status, multipliers, deadline)
+    facility_open, reduced = subproblem_solution(cost_matrix, facility_costs, multipliers, status)
+    reduced_cost_fixing(cost_matrix, facility_costs, multipliers, np.inf, status)
+    dominance_fixing(cost_matrix, facility_costs, status, budget=deadline)
+    branching_facility(status, reduced)
+
+def branch_and_bound(cost_matrix, facility_costs, initial_solution, initial_cost, candidates, budget=None,
+                     strategy='best', node_iterations=50, gap_tolerance=1e-9, progress=None, report_interval=1.0):
+    """
+    Branch-and-bound a partir de uma solução conhecida.
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações (float64).
+    initial_solution (np.array): Solução inicial (melhor solução conhecida).
+    initial_cost (float): Custo da solução inicial.
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+    budget (np.array): Orçamento de tempo/nós e traço das melhores soluções (ver Budget; None: sem limites). O prazo
+                       é verificado também dentro do limite Lagrangiano, da dominância e do swap das soluções.
+    strategy (str): 'best' (menor limite primeiro) ou 'depth' (em profundidade).
+    node_iterations (int): Iterações do subgradiente em cada nó (a raiz usa 300).
+    gap_tolerance (float): Gap relativo abaixo do qual um nó é cortado.
+    progress (function): Chamada com (tempo, nós, melhor custo, limite inferior) a cada report_interval segundos.
+    report_interval (float): Intervalo entre chamadas de progress, em segundos.
+
+    Returns:
+    tuple: Melhor solução, o seu custo, limite inferior global, número de nós explorados e se a otimalidade foi provada.
+    """
+    if strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f"Estratégia inválida: {strategy} (opções: {', '.join(SEARCH_STRATEGIES)})")
+    num_facilities = cost_matrix.shape[1]
+    if budget is None:
+        budget = new_budget()
+    start_time = time.perf_counter()
+    last_report = start_time
+    best_solution = np.asarray(initial_solution, dtype=np.bool_).copy()
+    best_cost = float(initial_cost)
+    record(budget, best_cost)
+    # Só o prazo, para os passos dentro de um nó (o limite de avaliações conta nós inteiros)
+    deadline = deadline_budget(budget)
+
+    def prune_limit():
+        return best_cost - gap_tolerance * max(1.0, abs(best_cost))
+
+    def try_solution(solution):
+        # Avalia uma solução e, se for melhor, melhora-a com o swap antes de a guardar
+        nonlocal best_solution, best_cost
+        if not solution.any():
+            return
+        cost = calculate_cost(solution, cost_matrix, facility_costs, candidates)
+        if cost < best_cost:
+            # O swap pára no prazo do orçamento (as suas avaliações não contam como nós)
+            solution, cost = swap_heuristic_local_search(cost_matrix, facility_costs, solution, candidates, deadline)
+            best_solution, best_cost = solution.copy(), cost
+            record(budget, best_cost)
+
+    # Nós por explorar: (limite do pai, contador, estado, multiplicadores do pai)
+    counter = 0
+    open_nodes = [(-np.inf, counter, all_free(num_facilities), None)]
+    nodes = 0
+    timed_out = False
+
+    while open_nodes:
+        # Orçamento esgotado (cada nó conta como uma avaliação)
+        if spend(budget, 1):
+            timed_out = True
+            break
+        if strategy == 'best':
+            parent_bound, _, status, multipliers = heapq.heappop(open_nodes)
+        else:
+            parent_bound, _, status, multipliers = open_nodes.pop()
+        if parent_bound >= prune_limit() or np.all(status == FACILITY_CLOSED):
+            continue
+        nodes += 1
+
+        iterations = 300 if multipliers is None else node_iterations
+        bound, multipliers = lagrangian_multipliers(cost_matrix, facility_costs, best_cost, iterations, status, multipliers, deadline)
+        if exhausted(deadline):
+            exhausted(budget) # Marca também o orçamento principal como esgotado
+            # Prazo esgotado a meio do nó: o nó volta para a lista com o limite (válido) calculado até aqui
+            counter += 1
+            open_nodes.append((max(parent_bound, bound), counter, status, multipliers))
+            if strategy == 'best':
+                heapq.heapify(open_nodes)
+            timed_out = True
+            break
+        facility_open, reduced = subproblem_solution(cost_matrix, facility_costs, multipliers, status)
+        try_solution(facility_open)
+        if bound < prune_limit():
+            # Mais instalações fixadas: custos reduzidos (face à melhor solução) e dominância
+            reduced_cost_fixing(cost_matrix, facility_costs, multipliers, best_cost, status)
+            dominance_fixing(cost_matrix, facility_costs, status, budget=deadline)
+
+            facility = branching_facility(status, reduced)
+            if facility < 0:
+                # Todas as instalações fixadas: o nó é uma solução
+                try_solution(status == FACILITY_OPEN)
+            else:
+                children = []
+                for state in (FACILITY_OPEN, FACILITY_CLOSED):
+                    child = status.copy()
+                    child[facility] = state
+                    children.append(child)
+                # Em profundidade, o filho que segue o subproblema Lagrangiano é explorado primeiro
+                if facility_open[facility]:
+                    children.reverse()
+                for child in children:
+                    counter += 1
+                    node = (bound, counter, child, multipliers)
+                    if strategy == 'best':
+                        heapq.heappush(open_nodes, node)
+                    else:
+                        open_nodes.append(node)
+
+        now = time.perf_counter()
+        if progress is not None and now - last_report >= report_interval:
+            last_report = now
+            progress(now - start_time, nodes, best_cost, _global_bound(open_nodes, best_cost, strategy))
+
+    global_bound = _global_bound(open_nodes, best_cost, strategy)
+    proved = not timed_out
+    if progress is not None:
+        progress(time.perf_counter() - start_time, nodes, best_cost, global_bound)
+    return best_solution, best_cost, global_bound, nodes, proved
+
+def _global_bound(open_nodes, best_cost, strategy):
+    # Menor limite dos nós por explorar (a melhor solução, se a árvore estiver esgotada)
+    if not open_nodes:
+        return best_cost
+    if strategy == 'best':
+        return min(open_nodes[0][0], best_cost)
+    return min(min(node[0] for node in open_nodes), best_cost)
+
+def branch_and_bound_uflp(cost_matrix, facility_costs, time_limit=60.0, strategy='best', initial='switch',
+                          candidates=None, verbose=False, max_evaluations=None, budget=None, **params):
+    """
+    Resolve o UFLP com branch-and-bound, começando com a solução de uma heurística.
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    time_limit (float): Tempo máximo em segundos; ao fim dele é devolvida a melhor solução encontrada.
+    strategy (str): 'best' (menor limite primeiro) ou 'depth' (em profundidade).
+    initial (str): Heurística da solução inicial ('greedy', 'switch' ou 'swap').
+    candidates (np.array): Listas de candidatas de cada cliente (None: procura completa).
+    verbose (bool): Escreve a melhor solução e o limite inferior durante a pesquisa.
+    max_evaluations (int): Número máximo de nós explorados (None: sem limite).
+    budget (np.array): Orçamento criado pelo chamador (ver Budget.new_budget), onde ficam os nós e o traço.
+    params: Outros parâmetros de branch_and_bound (node_iterations, gap_tolerance, report_interval, ...).
+
+    Returns:
+    tuple: Melhor solução encontrada e o custo associado.
+    """
+    if initial not in INITIAL_INCUMBENTS:
+        raise ValueError(f"Solução inicial inválida: {initial} (opções: {', '.join(INITIAL_INCUMBENTS)})")
+    facility_costs = np.array(facility_costs, dtype=np.float64)
+    candidates = resolve_candidates(cost_matrix, candidates)
+    budget = resolve_budget(budget, time_limit, max_evaluations)
+
+    # A heurística inicial também conta para o prazo (o greedy é uma só passagem e não tem orçamento)
+    incumbent_params = {} if initial == 'greedy' else {'time_limit': remaining_time(budget)}
+    start, _ = INITIAL_INCUMBENTS[initial](cost_matrix, facility_costs, candidates=candidates, **incumbent_params)
+    # Custo exato (o greedy devolve o custo da sua própria afetação)
+    start_cost = calculate_cost(start, cost_matrix, facility_costs, candidates)
+    progress = print_progress if verbose else None
+    best_solution, best_cost, bound, nodes, proved = branch_and_bound(cost_matrix, facility_costs, start, start_cost,
+                                                                      candidates, budget, strategy,
+                                                                      progress=progress, **params)
+    return best_solution, best_cost
+
+def print_progress(elapsed, nodes, best_cost, bound):
+    """
+    Escreve uma linha de progresso do branch-and-bound.
+    """
+    gap = 100.0 * (best_cost - bound) / abs(bound) if bound else 0.0
+    print(f"  {elapsed:8.2f}s  nós {nodes:<8} melhor {best_cost:.3f}  limite {bound:.3f}  gap {gap:.4f}%")
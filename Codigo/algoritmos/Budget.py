@@ -0,0 +1,210 @@
+import time
+import numpy as np
+from numba import njit, objmode
+
+"""
+Orçamento de execução (tempo e/ou número de avaliações) e traço de convergência dos algoritmos.
+
+O orçamento é um único array float64, partilhado entre o código Python e os kernels Numba e alterado
+no próprio array, por isso os algoritmos não precisam de devolver nada a mais:
+    linha 0: instante de início, prazo (instante absoluto de time.perf_counter) e máximo de avaliações;
+    linha 1: avaliações feitas, número de entradas do traço e 1 se o orçamento se esgotou;
+    linhas 2...: traço, uma entrada (tempo desde o início, avaliações, custo) por melhoria da melhor solução.
+
+Uma avaliação é um vizinho (ou solução) cujo custo foi calculado. Os kernels verificam o orçamento uma vez
+por iteração (spend_capped); o relógio só é lido quando existe prazo, com um custo de ~1 microssegundo.
+O limite de avaliações é rígido: a última passagem pela vizinhança avalia só os vizinhos que ainda cabem.
+"""
+
+# Número de entradas guardadas no traço (quando se esgota, a última entrada é substituída)
+TRACE_CAPACITY = 1024
+
+def new_budget(time_limit=None, max_evaluations=None, trace_capacity=TRACE_CAPACITY):
+    """
+    Cria um orçamento que começa a contar agora.
+
+    Parameters:
+    time_limit (float): Tempo máximo em segundos (None: sem limite).
+    max_evaluations (int): Número máximo de avaliações (None: sem limite).
+    trace_capacity (int): Número máximo de entradas do traço de convergência.
+
+    Returns:
+    np.array: Orçamento (ver o formato no início do módulo).
+    """
+    budget = np.zeros((2 + trace_capacity, 3), dtype=np.float64)
+    set_limits(budget, time_limit, max_evaluations)
+    return budget
+
+def no_budget():
+    """
+    Orçamento sem limites e sem traço (para pesquisas internas de outros algoritmos).
+    """
+    return new_budget(trace_capacity=0)
+
+def set_limits(budget, time_limit=None, max_evaluations=None):
+    """
+    Define os limites de um orçamento já criado, com o tempo a contar a partir de agora.
+    """
+    start = time.perf_counter()
+    budget[0, 0] = start
+    budget[0, 1] = np.inf if time_limit is None else start + time_limit
+    budget[0, 2] = np.inf if max_evaluations is None else max_evaluations
+
+def deadline_budget(budget):
+    """
+    Orçamento só com o prazo de outro orçamento, sem limite de avaliações e sem traço (para pesquisas internas
+    de outros algoritmos, cujas avaliações não devem contar no orçamento principal).
+    """
+    child = no_budget()
+    child[0, :2] = budget[0, :2]
+    return child
+
+def remaining_time(budget):
+    """
+    Segundos que faltam até ao prazo do orçamento (None se não houver prazo).
+    """
+    if budget[0, 1] == np.inf:
+        return None
+    return max(0.0, budget[0, 1] - time.perf_counter())
+
+def resolve_budget(budget=None, time_limit=None, max_evaluations=None):
+    """
+    Orçamento a usar num algoritmo: o dado pelo chamador (com os limites aplicados) ou um novo.
+    """
+    if budget is None:
+        return new_budget(time_limit, max_evaluations)
+    set_limits(budget, time_limit, max_evaluations)
+    return budget
+
+@njit(cache=True)
+def now():
+    """
+    time.perf_counter() dentro de código compilado.
+    """
+    with objmode(current='float64'):
+        current = time.perf_counter()
+    return current
+
+@njit(cache=True)
+def spend(budget, evaluations):
+    """
+    Verifica o orçamento e, se ainda não se esgotou, regista as avaliações de mais uma iteração.
+
+    Returns:
+    bool: True se o orçamento já estava esgotado (a iteração não deve ser feita).
+    """
+    if budget[1, 2] != 0.0:
+        return True
+    if budget[1, 0] >= budget[0, 2] or (budget[0, 1] < np.inf and now() >= budget[0, 1]):
+        budget[1, 2] = 1.0
+        return True
+    budget[1, 0] += evaluations
+    return False
+
+@njit(cache=True)
+def exhausted(budget):
+    """
+    True se o orçamento se esgotou (sem gastar avaliações).
+    """
+    return spend(budget, 0)
+
+@njit(cache=True)
+def remaining_evaluations(budget):
+    """
+    Avaliações que ainda cabem no limite do orçamento (infinito sem limite).
+    """
+    return budget[0, 2] - budget[1, 0]
+
+@njit(cache=True)
+def mark_exhausted(budget):
+    """
+    Marca o orçamento como esgotado (o kernel parou por causa do orçamento).
+    """
+    budget[1, 2] = 1.0
+
+@njit(cache=True)
+def spend_capped(budget, evaluations):
+    """
+    Como spend, mas sem ultrapassar o limite de avaliações: regista só as avaliações da iteração que ainda cabem.
+    Se não couberem todas, o orçamento fica esgotado e o kernel avalia só os primeiros vizinhos (pela ordem da
+    sua vizinhança), com os quais faz a sua última iteração.
+
+    Returns:
+    int: Número de vizinhos a avaliar (evaluations se couberem todos; 0 se o orçamento já estava esgotado).
+    """
+    if spend(budget, 0):
+        return 0
+    allowed = int(min(evaluations, remaining_evaluations(budget)))
+    budget[1, 0] += allowed
+    if allowed < evaluations:
+        mark_exhausted(budget)
+    return allowed
+
+@njit(cache=True)
+def record(budget, cost):
+    """
+    Acrescenta ao traço uma nova melhor solução (tempo, avaliações e custo).
+    Um custo que não melhora a última entrada é ignorado (por ex. o custo inicial de uma pesquisa retomada, ver Checkpoint).
+    """
+    capacity = budget.shape[0] - 2
+    if capacity == 0:
+        return
+    count = int(budget[1, 1])
+    if count > 0 and cost >= budget[1 + min(count, capacity), 2]:
+        return
+    row = 2 + min(count, capacity - 1)
+    budget[row, 0] = now() - budget[0, 0]
+    budget[row, 1] = budget[1, 0]
+    budget[row, 2] = cost
+    budget[1, 1] = min(count + 1, capacity)
+
+@njit(cache=True)
+def child_budgets(budget, num_children):
+    """
+    Cópias dos limites e das avaliações de um orçamento, sem traço, para pesquisas feitas em paralelo.
+    As avaliações que ainda cabem no limite são divididas pelas cópias (as primeiras recebem o resto da
+    divisão), para que todas juntas não ultrapassem o limite do orçamento original. As avaliações de cada
+    cópia são depois somadas ao orçamento original (ver merge_children).
+
+    Returns:
+    np.array: Array (num_children, 2, 3), um orçamento por linha.
+    """
+    children = np.zeros((num_children, 2, 3), dtype=np.float64)
+    remaining = remaining_evaluations(budget)
+    for k in range(num_children):
+        children[k, 0] = budget[0]
+        children[k, 1, 0] = budget[1, 0]
+        children[k, 1, 2] = budget[1, 2]
+        if remaining < np.inf:
+            share = remaining // num_children + (1.0 if k < remaining % num_children else 0.0)
+            children[k, 0, 2] = budget[1, 0] + share
+    return children
+
+@njit(cache=True)
+def merge_children(budget, children):
+    """
+    Soma ao orçamento as avaliações feitas nas cópias criadas por child_budgets (antes de qualquer outra alteração).
+    """
+    base = budget[1, 0]
+    for k in range(children.shape[0]):
+        budget[1, 0] += children[k, 1, 0] - base
+        if children[k, 1, 2] != 0.0:
+            budget[1, 2] = 1.0
+
+def budget_evaluations(budget):
+    """
+    Número de avaliações feitas.
+    """
+    return int(budget[1, 0])
+
+def budget_exhausted(budget):
+    """
+    True se o algoritmo parou por ter esgotado o orçamento.
+    """
+    return bool(budget[1, 2])
+
+def budget_trace(budget):
+    """
+    Traço de convergência: array (n, 3) com tempo desde o início, avaliações e custo de cada melhoria.
+    """
+    return budget[2:2 + int(budget[1, 1])].copy()
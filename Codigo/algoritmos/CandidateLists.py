@@ -0,0 +1,111 @@
+import numpy as np
+from numba import njit, prange
+
+
+"""
+Listas de candidatas por cliente: as k instalações mais baratas de cada cliente, por ordem de custo de afetação.
+
+Para encontrar a melhor instalação aberta de um cliente basta percorrer a sua lista até à primeira aberta,
+o que na prática custa O(1) em vez de O(F). Só quando nenhuma das k candidatas está aberta é que se
+percorrem todas as instalações, por isso o resultado é sempre exato.
+
+Uma lista com k = 0 (ver no_candidates) desativa a poda: todos os kernels fazem a procura completa.
+Os empates são resolvidos pelo índice mais baixo, como na procura completa, por isso os algoritmos
+seguem exatamente o mesmo caminho com ou sem listas.
+"""
+
+
+@njit(parallel=True, cache=True)
+def build_candidate_lists(cost_matrix, k):
+    """
+    Constrói as listas de candidatas de todos os clientes.
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    k (int): Número de instalações guardadas por cliente (limitado a F).
+
+    Returns:
+    np.array: Matriz C x k com os índices das instalações, da mais barata para a mais cara.
+    """
+    num_clients, num_facilities = cost_matrix.shape
+    k = min(max(k, 0), num_facilities)
+    candidates = np.empty((num_clients, k), dtype=np.int64)
+    for client in prange(num_clients):
+        # Ordenação estável: em caso de empate fica primeiro a instalação com o índice mais baixo
+        order = np.argsort(cost_matrix[client], kind='mergesort')
+        candidates[client] = order[:k]
+    return candidates
+
+def no_candidates(num_clients):
+    """
+    Listas vazias (k = 0): os kernels fazem sempre a procura completa.
+    """
+    return np.empty((num_clients, 0), dtype=np.int64)
+
+def resolve_candidates(cost_matrix, candidates=None):
+    """
+    Devolve as listas de candidatas a usar com esta matriz (listas vazias se candidates for None).
+    """
+    if candidates is None:
+        return no_candidates(cost_matrix.shape[0])
+    if candidates.ndim != 2 or candidates.shape[0] != cost_matrix.shape[0]:
+        raise ValueError(f"Listas de candidatas com forma {candidates.shape} não correspondem a {cost_matrix.shape[0]} clientes")
+    return np.ascontiguousarray(candidates, dtype=np.int64)
+
+@njit(cache=True)
+def nearest_open(client, solution, cost_matrix, candidates):
+    """
+    Melhor instalação aberta de um cliente.
+
+    Returns:
+    tuple: Instalação (-1 se não houver nenhuma aberta) e o custo de afetação (infinito se não houver).
+    """
+    num_facilities = cost_matrix.shape[1]
+    for j in range(candidates.shape[1]):
+        facility = candidates[client, j]
+        if solution[facility]:
+            return facility, cost_matrix[client, facility]
+    if candidates.shape[1] == num_facilities:
+        return -1, np.inf
+
+    # Nenhuma candidata aberta: procura completa
+    b_fac, b_cost = -1, np.inf
+    for facility in range(num_facilities):
+        if solution[facility]:
+            cost_val = cost_matrix[client, facility]
+            if cost_val < b_cost:
+                b_fac, b_cost = facility, cost_val
+    return b_fac, b_cost
+
+@njit(cache=True)
+def two_nearest_open(client, solution, cost_matrix, candidates):
+    """
+    Melhor e segunda melhor instalação aberta de um cliente.
+
+    Returns:
+    tuple: best_fac, best_cost, second_fac e second_cost (-1 e infinito quando não existem).
+    """
+    num_facilities = cost_matrix.shape[1]
+    b_fac, b_cost = -1, np.inf
+    s_fac, s_cost = -1, np.inf
+    for j in range(candidates.shape[1]):
+        facility = candidates[client, j]
+        if solution[facility]:
+            if b_fac < 0:
+                b_fac, b_cost = facility, cost_matrix[client, facility]
+            else:
+                return b_fac, b_cost, facility, cost_matrix[client, facility]
+    if candidates.shape[1] == num_facilities:
+        return b_fac, b_cost, s_fac, s_cost
+
+    # Menos de duas candidatas abertas: procura completa
+    b_fac, b_cost = -1, np.inf
+    for facility in range(num_facilities):
+        if solution[facility]:
+            cost_val = cost_matrix[client, facility]
+            if cost_val < b_cost:
+                s_fac, s_cost = b_fac, b_cost
+                b_fac, b_cost = facility, cost_val
+            elif cost_val < s_cost:
+                s_fac, s_cost = facility, cost_val
+    return b_fac, b_cost, s_fac, s_cost
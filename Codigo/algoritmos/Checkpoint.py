@@ -0,0 +1,132 @@
+import os
+import time
+import numpy as np
+from algoritmos.Budget import budget_exhausted
+
+"""
+Checkpoints das pesquisas longas: o estado da pesquisa é guardado periodicamente num ficheiro .npz
+e uma nova execução com o mesmo ficheiro continua exatamente onde a anterior parou.
+
+O estado guardado depende do algoritmo (solução atual e melhor solução, memória tabu, iteração, feixe,
+estado do gerador aleatório, ver RandomState) e inclui sempre o orçamento (ver Budget), com os tempos
+convertidos em tempo já gasto e tempo restante para poderem ser repostos noutro processo.
+
+Nos kernels Numba a pausa usa o próprio orçamento: o prazo é antecipado para o próximo checkpoint, o
+kernel pára no início de uma iteração (sem a fazer) e o prazo verdadeiro é reposto (ver pause_budget e
+resume_budget). Assim os kernels não precisam de nenhum argumento a mais.
+"""
+
+# Intervalo, em segundos, entre checkpoints
+CHECKPOINT_INTERVAL = 60.0
+
+def save_checkpoint(path, algorithm, budget, **state):
+    """
+    Guarda o estado de uma pesquisa (escrita atómica, um ficheiro interrompido nunca substitui o anterior).
+
+    Parameters:
+    path (str): Ficheiro .npz do checkpoint.
+    algorithm (str): Nome do algoritmo (validado ao retomar).
+    budget (np.array): Orçamento da pesquisa (ver Budget).
+    state: Arrays e valores do estado da pesquisa.
+    """
+    portable = budget.copy()
+    current = time.perf_counter()
+    portable[0, 0] = current - budget[0, 0] # Tempo já gasto
+    portable[0, 1] = budget[0, 1] - current # Tempo restante (infinito sem prazo)
+    checkpoint_dir = os.path.dirname(path)
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        np.savez(file, algorithm=algorithm, budget=portable, **state)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path, algorithm, num_facilities, budget):
+    """
+    Carrega o checkpoint de uma pesquisa, se existir, e repõe o orçamento guardado.
+
+    Parameters:
+    path (str): Ficheiro .npz do checkpoint (None: sem checkpoints).
+    algorithm (str): Nome do algoritmo que vai continuar a pesquisa.
+    num_facilities (int): Número de instalações da instância (validado com a solução guardada).
+    budget (np.array): Orçamento da pesquisa, alterado no próprio array com os valores guardados.
+
+    Returns:
+    dict: Estado guardado (nome -> array), ou None se não houver checkpoint.
+    """
+    if path is None or not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        state = {name: data[name] for name in data.files}
+    if str(state.pop('algorithm')) != algorithm or state['best_solution'].shape != (num_facilities,):
+        raise ValueError(f"Checkpoint inválido: {path} (não é de {algorithm} numa instância com {num_facilities} instalações)")
+
+    saved = state.pop('budget')
+    if saved.shape[0] > budget.shape[0]:
+        raise ValueError(f"Checkpoint inválido: {path} (o traço guardado não cabe no orçamento)")
+    current = time.perf_counter()
+    budget[:saved.shape[0]] = saved
+    budget[0, 0] = current - saved[0, 0]
+    budget[0, 1] = current + saved[0, 1]
+    return state
+
+def remove_checkpoint(path):
+    """
+    Apaga o checkpoint de uma pesquisa que terminou.
+    """
+    if path is not None and os.path.exists(path):
+        os.remove(path)
+
+def pause_budget(budget, path, interval=CHECKPOINT_INTERVAL):
+    """
+    Antecipa o prazo do orçamento para o próximo checkpoint (nada, se path for None).
+
+    Returns:
+    float: Prazo verdadeiro, a repor com resume_budget.
+    """
+    deadline = budget[0, 1]
+    if path is not None:
+        budget[0, 1] = min(deadline, time.perf_counter() + interval)
+    return deadline
+
+def resume_budget(budget, deadline):
+    """
+    Repõe o prazo verdadeiro do orçamento depois de um kernel parar.
+
+    Returns:
+    bool: True se o kernel parou só por causa da pausa (deve ser guardado um checkpoint e a pesquisa continuar).
+    """
+    pause = budget[0, 1]
+    budget[0, 1] = deadline
+    # Só é uma pausa se foi o prazo antecipado que parou o kernel (e não o limite de avaliações, mesmo que a meio de uma passagem)
+    if budget_exhausted(budget) and pause < deadline and time.perf_counter() >= pause and budget[1, 0] < budget[0, 2]:
+        budget[1, 2] = 0.0
+        return True
+    return False
+
+def run_with_checkpoints(step, save, budget, path, interval=CHECKPOINT_INTERVAL):
+    """
+    Executa um kernel que usa o orçamento, parando a cada interval segundos para guardar um checkpoint.
+
+    Parameters:
+    step (function): Resultado anterior (None na primeira chamada) -> resultado; continua a pesquisa de onde parou.
+    save (function): Resultado -> None; guarda o checkpoint (ver save_checkpoint).
+    budget (np.array): Orçamento da pesquisa.
+    path (str): Ficheiro .npz do checkpoint (None: o kernel corre uma só vez, sem pausas).
+    interval (float): Segundos entre checkpoints.
+
+    Returns:
+    O resultado da última chamada de step.
+    """
+    result = None
+    while True:
+        deadline = pause_budget(budget, path, interval)
+        evaluations = budget[1, 0]
+        result = step(result)
+        if not resume_budget(budget, deadline):
+            remove_checkpoint(path)
+            return result
+        if budget[1, 0] > evaluations:
+            save(result)
+        else:
+            interval *= 2.0 # O kernel parou antes da primeira iteração: a pausa seguinte é mais longa
@@ -0,0 +1,104 @@
+import numpy as np
+from numba import njit, prange
+from algoritmos.CandidateLists import nearest_open
+
+
+"""
+Kernels de avaliação do custo total de soluções, partilhados por todos os algoritmos.
+"""
+
+# Número de clientes processados por cada bloco do kernel em lote
+CLIENT_BLOCK = 64
+
+
+@njit(cache=True)
+def calculate_cost(solution, cost_matrix, facility_costs, candidates):
+    """
+    Calcula o custo total da solução atual.
+
+    Parameters:
+    solution (np.array): Array booleano que indica se a instalação está aberta.
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+
+    Returns:
+    float: Custo total da solução.
+    """
+    num_clients, num_facilities = cost_matrix.shape
+    cost = 0.0
+    # Calcula o custo de transporte (primeira candidata aberta de cada cliente)
+    for client in range(num_clients):
+        facility, min_cost = nearest_open(client, solution, cost_matrix, candidates)
+        cost += min_cost
+
+    # Adiciona o custo de abertura das instalações
+    for facility in range(num_facilities):
+        if solution[facility]:
+            cost += facility_costs[facility]
+    return cost
+
+
+@njit(parallel=True, cache=True)
+def calculate_cost_batch(solutions, cost_matrix, facility_costs, candidates):
+    """
+    Calcula o custo total de K soluções numa única passagem pela matriz de custos.
+
+    Os clientes são divididos em blocos; cada linha da matriz é lida uma vez e usada para as K
+    soluções, percorrendo apenas as instalações abertas de cada uma. Cada bloco acumula os seus
+    custos parciais numa linha própria, que no fim são somadas sempre pela mesma ordem (o resultado
+    não depende do número de threads). Para cada cliente procura-se primeiro a primeira candidata
+    aberta; só se nenhuma estiver aberta são percorridas as instalações abertas da solução.
+
+    Parameters:
+    solutions (np.array): Matriz booleana K x F (uma solução por linha).
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+
+    Returns:
+    np.array: Custo total de cada uma das K soluções (infinito se não tiver instalações abertas).
+    """
+    num_solutions, num_facilities = solutions.shape
+    num_clients = cost_matrix.shape[0]
+    num_candidates = candidates.shape[1]
+
+    # Índices das instalações abertas de cada solução (evita testar as fechadas para cada cliente)
+    open_count = np.zeros(num_solutions, dtype=np.int64)
+    open_index = np.empty((num_solutions, num_facilities), dtype=np.int64)
+    costs = np.zeros(num_solutions, dtype=np.float64)
+    for k in range(num_solutions):
+        for facility in range(num_facilities):
+            if solutions[k, facility]:
+                open_index[k, open_count[k]] = facility
+                open_count[k] += 1
+                costs[k] += facility_costs[facility]
+
+    num_blocks = (num_clients + CLIENT_BLOCK - 1) // CLIENT_BLOCK
+    partial = np.zeros((num_blocks, num_solutions), dtype=np.float64)
+    for block in prange(num_blocks):
+        start = block * CLIENT_BLOCK
+        end = min(start + CLIENT_BLOCK, num_clients)
+        for client in range(start, end):
+            row = cost_matrix[client]
+            for k in range(num_solutions):
+                min_cost = np.inf
+                found = False
+                for j in range(num_candidates):
+                    facility = candidates[client, j]
+                    if solutions[k, facility]:
+                        min_cost = row[facility]
+                        found = True
+                        break
+                if not found:
+                    for j in range(open_count[k]):
+                        cost_val = row[open_index[k, j]]
+                        if cost_val < min_cost:
+                            min_cost = cost_val
+                partial[block, k] += min_cost
+
+    # Redução determinística dos blocos
+    for block in range(num_blocks):
+        for k in range(num_solutions):
+            costs[k] += partial[block, k]
+    return costs
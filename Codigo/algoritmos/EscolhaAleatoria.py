@@ -1,40 +1,62 @@
-import random
 import numpy as np
-from random import seed
-import time
+from algoritmos.CandidateLists import resolve_candidates
+from algoritmos.CostEvaluation import calculate_cost_batch
 
-def openRandomFacility(cost_matrix, facility_costs, number_of_open_facilities):
+
+def sample_random_solutions(num_facilities, open_counts, rng):
     """
-    Abre um número aleatório de instalações.
+    Sorteia várias soluções aleatórias de uma só vez, cada uma com um número fixo de instalações abertas.
+
+    Cada linha recebe chaves aleatórias uniformes; as open_counts[k] instalações com as menores chaves
+    ficam abertas, o que dá um subconjunto uniforme de tamanho open_counts[k] sem repetições nem tentativas.
 
     Parameters:
-    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
-    facility_costs (np.array): Array de custos de abertura das instalações.
-    number_of_open_facilities (int): Número de instalações a serem abertas.
+    num_facilities (int): Número de instalações.
+    open_counts (np.array): Número de instalações abertas em cada solução (K valores entre 1 e num_facilities).
+    rng (np.random.Generator): Gerador de números aleatórios.
 
     Returns:
-    tuple: Array booleano indicando quais instalações estão abertas e o custo total de abertura.
+    np.array: Matriz booleana K x F (uma solução por linha).
     """
-    # Define a seed aleatória com base no tempo atual e no número de instalações abertas
-    random.seed(time.time() + number_of_open_facilities)
+    open_counts = np.asarray(open_counts, dtype=np.int64)
+    order = np.argsort(rng.random((open_counts.shape[0], num_facilities)), axis=1)
+    solutions = np.zeros((open_counts.shape[0], num_facilities), dtype=np.bool_)
+    np.put_along_axis(solutions, order, np.arange(num_facilities) < open_counts[:, None], axis=1)
+    return solutions
 
-    
-    num_clients, num_facilities = cost_matrix.shape
+def random_solutions_cost(cost_matrix, facility_costs, open_counts, seed=None, candidates=None):
+    """
+    Sorteia soluções aleatórias e calcula o custo total de todas numa única passagem pela matriz de custos.
 
-    # Cria um array booleano para marcar quais instalações estão abertas (começam todas a 0 - fechadas)
-    facilities_open = np.zeros(num_facilities, dtype=bool)
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    open_counts (np.array): Número de instalações abertas em cada solução.
+    seed (int | np.random.Generator): Seed ou gerador (None: entropia do sistema).
+    candidates (np.array): Listas de candidatas de cada cliente (None: procura completa).
 
-    total_cost = 0
+    Returns:
+    tuple: Matriz booleana K x F com as soluções e array com o custo total de cada uma.
+    """
+    rng = np.random.default_rng(seed)
+    solutions = sample_random_solutions(cost_matrix.shape[1], open_counts, rng)
+    costs = calculate_cost_batch(solutions, cost_matrix, np.asarray(facility_costs, dtype=np.float64),
+                                 resolve_candidates(cost_matrix, candidates))
+    return solutions, costs
 
-    i = 0
-    while i < number_of_open_facilities:
-        # Seleciona aleatoriamente uma instalação
-        random_facility = random.randint(0, num_facilities - 1)
+def openRandomFacility(cost_matrix, facility_costs, number_of_open_facilities, seed=None, candidates=None):
+    """
+    Abre um número fixo de instalações escolhidas aleatoriamente.
 
-        # Verifica se a instalação está fechada, se está fechada então vai abri-la
-        if not facilities_open[random_facility]:
-            facilities_open[random_facility] = True
-            total_cost += facility_costs[random_facility]
-            i += 1
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    number_of_open_facilities (int): Número de instalações a serem abertas.
+    seed (int | np.random.Generator): Seed ou gerador para resultados reproduzíveis (None: entropia do sistema).
+    candidates (np.array): Listas de candidatas de cada cliente (None: procura completa).
 
-    return facilities_open, total_cost
\ No newline at end of file
+    Returns:
+    tuple: Array booleano indicando quais instalações estão abertas e o custo total da solução (abertura e afetação).
+    """
+    solutions, costs = random_solutions_cost(cost_matrix, facility_costs, [number_of_open_facilities], seed, candidates)
+    return solutions[0], costs[0]
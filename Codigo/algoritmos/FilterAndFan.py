@@ -1,98 +1,161 @@
+import os
+import time
 import numpy as np
 from numba import njit, prange
-from algoritmos.GreedyAlgorithm import greedy_uflp
+from algoritmos.Budget import new_budget, resolve_budget, spend_capped, exhausted, record, child_budgets, merge_children
+from algoritmos.Checkpoint import load_checkpoint, save_checkpoint, remove_checkpoint, CHECKPOINT_INTERVAL
+from algoritmos.RandomState import new_rng, random_index
+from algoritmos.CandidateLists import resolve_candidates
+from algoritmos.GreedyAlgorithm import build_initial_solution
+from algoritmos.LowerBound import stop_cost_for
+from algoritmos.CostEvaluation import calculate_cost_batch
+from algoritmos.IncrementalCost import init_assignment, flip_delta
+from algoritmos.SwapLocalSeach import swap_heuristic_local_search
+from algoritmos.Profile import count, count_moves, phase, EVALUATIONS, LOCAL_SEARCH_TIME, PERTURBATION_TIME
 
-@njit
-def calculate_cost(solution, cost_matrix, facility_costs):
+
+"""
+Filter and Fan em árvore (pesquisa em feixe).
+
+Em cada nível, cada solução do feixe é expandida (fan) com muitos movimentos compostos (trocar o
+estado de várias instalações ao mesmo tempo). Os movimentos são filtrados em duas fases antes de
+qualquer pesquisa local: primeiro por um ganho estimado barato (soma das variações individuais de
+cada troca, já calculadas para o nó) e depois pelo custo exato, calculado em lote. Só os
+sobreviventes são melhorados com pesquisa local, em paralelo, e os melhores formam o feixe do nível seguinte.
+"""
+
+@njit(cache=True)
+def local_search(cost_matrix, facility_costs, initial_solution, candidates, budget, parallel=True, stop_cost=-np.inf, profile=None):
     """
-    Calcula o custo total da solução atual.
+    Realiza a pesquisa local a partir de uma solução (descida com o fast interchange, ver SwapLocalSeach).
 
     Parameters:
-    solution (np.array): Array booleano que indica se a instalação está aberta.
     cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
     facility_costs (np.array): Array de custos de abertura das instalações.
+    initial_solution (np.array): Solução inicial (com pelo menos uma instalação aberta).
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+    budget (np.array): Orçamento de tempo/avaliações (ver Budget).
+    parallel (bool): Avalia a vizinhança em paralelo.
+    stop_cost (float): Pára assim que o custo for menor ou igual a este valor.
+    profile (np.array): Perfil de execução (ver Profile; None: sem contadores).
 
     Returns:
-    float: Custo total da solução.
+    tuple: Melhor solução encontrada e o custo associado.
     """
-    num_clients, num_facilities = cost_matrix.shape
-    cost = 0.0
-    # Calcula o custo de transporte
-    for client in range(num_clients):
-        min_cost = np.inf
-        for facility in range(num_facilities):
-            if solution[facility]:  # Verifica se a instalação está aberta
-                cost_val = cost_matrix[client, facility]
-                if cost_val < min_cost:
-                    min_cost = cost_val
-        cost += min_cost
+    return swap_heuristic_local_search(cost_matrix, facility_costs, initial_solution, candidates, budget, parallel, stop_cost,
+                                       profile)
 
-    # Adiciona o custo de abertura das instalações
-    cost += np.sum(solution * facility_costs)
-    return cost
+@njit(cache=True)
+def node_flip_deltas(solution, cost_matrix, facility_costs, candidates):
+    """
+    Variação do custo ao trocar o estado de cada instalação de um nó do feixe (base do ganho estimado).
+    """
+    best_fac, best_cost, second_fac, second_cost = init_assignment(solution, cost_matrix, candidates)
+    num_facilities = solution.shape[0]
+    deltas = np.empty(num_facilities, dtype=np.float64)
+    for facility in range(num_facilities):
+        deltas[facility] = flip_delta(facility, solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost)
+    return deltas
 
-@njit(parallel=True)
-def local_search(cost_matrix, facility_costs, initial_solution):
+@njit(cache=True)
+def fan_out(beam, beam_costs, cost_matrix, facility_costs, candidates, num_moves, move_size, rng):
     """
-    Realiza a pesquisa local a partir de um swap
+    Gera num_moves movimentos compostos para cada nó do feixe e estima o custo de cada um.
 
-    Parameters:
-    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
-    facility_costs (np.array): Array de custos de abertura das instalações.
-    initial_solution (np.array): Solução inicial fornecida pelo algoritmo de greedy.
+    Cada movimento troca o estado de move_size instalações distintas, escolhidas aleatoriamente com o
+    gerador rng (ver RandomState), que fica guardado nos checkpoints.
+    O custo estimado é o custo do nó mais a soma das variações individuais (ignora a interação entre trocas).
 
     Returns:
-    tuple: Melhor solução encontrada e o custo associado.
+    tuple: Nó de origem de cada movimento, instalações trocadas (num_moves * W x move_size) e custo estimado.
     """
-    num_clients, num_facilities = cost_matrix.shape
-    current_solution = initial_solution.copy()  # Copia a solução inicial
-    current_cost = calculate_cost(current_solution, cost_matrix, facility_costs)  # Calcula o custo inicial
-    improved = True
-
-    while improved:
-        improved = False
-        best_neighbor = current_solution.copy()  # Inicializa o melhor vizinho como a solução atual
-        best_cost = current_cost
-
-        # Tenta trocar o estado de cada par de instalações
-        for facility1 in prange(num_facilities):  # Utiliza paralelismo para acelerar a execução
-            for facility2 in range(facility1 + 1, num_facilities):
-                neighbor = current_solution.copy()
-                neighbor[facility1] = not neighbor[facility1]  # Troca o estado da instalação 1
-                neighbor[facility2] = not neighbor[facility2]  # Troca o estado da instalação 2
-                neighbor_cost = calculate_cost(neighbor, cost_matrix, facility_costs)  # Calcula o custo do vizinho
-
-                # Verifica se a nova solução é melhor
-                if neighbor_cost < best_cost:
-                    best_cost = neighbor_cost
-                    best_neighbor = neighbor.copy()
-                    improved = True
-        
-        if improved:
-            current_solution = best_neighbor.copy()  # Atualiza a solução atual para a melhor solução encontrada
-            current_cost = best_cost
-
-    return current_solution, current_cost
-
-@njit
-def generate_candidate_solution(current_solution):
-    """
-    Gera uma nova solução candidata a partir da solução atual, fazendo alterações substanciais.
+    beam_width, num_facilities = beam.shape
+    move_size = min(move_size, num_facilities)
+    total = beam_width * num_moves
+    origins = np.empty(total, dtype=np.int64)
+    moves = np.empty((total, move_size), dtype=np.int64)
+    estimates = np.empty(total, dtype=np.float64)
 
-    Parameters:
-    current_solution (np.array): Solução atual.
+    for node in range(beam_width):
+        deltas = node_flip_deltas(beam[node], cost_matrix, facility_costs, candidates)
+        for k in range(num_moves):
+            index = node * num_moves + k
+            origins[index] = node
+            estimate = beam_costs[node]
+            j = 0
+            while j < move_size:
+                facility = random_index(rng, num_facilities)
+                repeated = False
+                for previous in range(j):
+                    if moves[index, previous] == facility:
+                        repeated = True
+                        break
+                if repeated:
+                    continue
+                moves[index, j] = facility
+                estimate += deltas[facility]
+                j += 1
+            estimates[index] = estimate
+    return origins, moves, estimates
 
-    Returns:
-    np.array: Nova solução candidata.
+@njit(cache=True)
+def build_children(beam, origins, moves, selected):
+    """
+    Constrói as soluções (filhos) dos movimentos selecionados, uma por linha.
+    """
+    children = np.empty((selected.shape[0], beam.shape[1]), dtype=np.bool_)
+    for k in range(selected.shape[0]):
+        index = selected[k]
+        children[k] = beam[origins[index]]
+        for j in range(moves.shape[1]):
+            facility = moves[index, j]
+            children[k, facility] = not children[k, facility]
+    return children
+
+@njit(parallel=True, cache=True)
+def improve_survivors(survivors, cost_matrix, facility_costs, candidates, budget, stop_cost, profile=None):
+    """
+    Aplica a pesquisa local a cada sobrevivente, em paralelo (uma pesquisa em série por thread).
+    Cada sobrevivente escreve só na sua linha dos resultados (e tem a sua cópia do orçamento e do perfil),
+    por isso o resultado é determinístico quando o orçamento não tem prazo. As avaliações que restam no limite
+    do orçamento são divididas pelos sobreviventes (ver Budget.child_budgets).
     """
-    num_facilities = len(current_solution)
-    candidate_solution = current_solution.copy()
-    for _ in range(num_facilities // 5):  # Faz alterações substanciais trocando 20% das instalações
-        facility = np.random.randint(num_facilities)
-        candidate_solution[facility] = not candidate_solution[facility]
-    return candidate_solution
+    num_survivors = survivors.shape[0]
+    improved = np.empty_like(survivors)
+    costs = np.empty(num_survivors, dtype=np.float64)
+    budgets = child_budgets(budget, num_survivors)
+    if profile is None:
+        for k in prange(num_survivors):
+            improved[k], costs[k] = local_search(cost_matrix, facility_costs, survivors[k], candidates, budgets[k], False, stop_cost)
+    else:
+        # Contadores de cada sobrevivente, somados ao perfil no fim
+        profiles = np.zeros((num_survivors, profile.shape[0]), dtype=np.float64)
+        for k in prange(num_survivors):
+            improved[k], costs[k] = local_search(cost_matrix, facility_costs, survivors[k], candidates, budgets[k], False, stop_cost,
+                                                 profiles[k])
+        for k in range(num_survivors):
+            profile += profiles[k]
+    merge_children(budget, budgets)
+    return improved, costs
 
-def filter_and_fan(cost_matrix, facility_costs, initial_solution, max_iterations=50, num_candidates=5):
+def _distinct_best(solutions, costs, limit):
+    """
+    Índices das (no máximo) limit melhores soluções distintas, por ordem de custo.
+    """
+    chosen = []
+    for k in np.argsort(costs, kind='stable'):
+        if not np.isfinite(costs[k]):
+            break
+        if any(costs[k] == costs[j] and np.array_equal(solutions[k], solutions[j]) for j in chosen):
+            continue
+        chosen.append(k)
+        if len(chosen) == limit:
+            break
+    return chosen
+
+def filter_and_fan(cost_matrix, facility_costs, initial_solution, candidates, depth=10, beam_width=4, fan_width=32,
+                   move_size=3, num_survivors=8, prefilter_factor=4, patience=3, stop_cost=-np.inf, budget=None,
+                   profile=None, rng=None, checkpoint=None, checkpoint_interval=CHECKPOINT_INTERVAL):
     """
     Aplica o algoritmo Filter and Fan para refinar a solução inicial.
 
@@ -100,49 +163,142 @@ def filter_and_fan(cost_matrix, facility_costs, initial_solution, max_iterations
     cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
     facility_costs (np.array): Array de custos de abertura das instalações.
     initial_solution (np.array): Solução inicial fornecida pelo algoritmo de greedy.
-    max_iterations (int): Número máximo de iterações para a pesquisa.
-    num_candidates (int): Número de candidatos a serem gerados em cada iteração.
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+    depth (int): Número máximo de níveis da árvore.
+    beam_width (int): Número de soluções mantidas em cada nível (largura do feixe).
+    fan_width (int): Número de movimentos compostos gerados por cada solução do feixe.
+    move_size (int): Número de instalações trocadas em cada movimento composto.
+    num_survivors (int): Número de candidatos melhorados com pesquisa local em cada nível.
+    prefilter_factor (int): Pelo ganho estimado ficam num_survivors * prefilter_factor candidatos, que são depois avaliados exatamente.
+    patience (int): Número de níveis seguidos sem melhorar a melhor solução antes de parar.
+    stop_cost (float): Pára assim que a melhor solução tiver custo menor ou igual a este valor (ver LowerBound.stop_cost_for).
+    budget (np.array): Orçamento de tempo/avaliações e traço de convergência (ver Budget; None: sem limites).
+    profile (np.array): Perfil de execução (ver Profile; None: sem contadores). Os movimentos compostos e o filtro
+                        contam como perturbação e a pesquisa local dos sobreviventes como pesquisa local.
+    rng (np.array): Estado do gerador aleatório (ver RandomState; None: novo gerador com seed tirada do np.random).
+    checkpoint (str): Ficheiro .npz onde o estado (feixe, melhor solução, nível e gerador) é guardado no fim de um
+                      nível, se tiverem passado checkpoint_interval segundos desde o último; se já existir, a pesquisa
+                      continua a partir dele (ver Checkpoint). É apagado quando a pesquisa termina.
+    checkpoint_interval (float): Segundos entre checkpoints.
 
     Returns:
     tuple: Melhor solução encontrada e o custo associado.
     """
-    current_solution, current_cost = local_search(cost_matrix, facility_costs, initial_solution)
-    
-    for iteration in range(max_iterations):
-        candidates = []
-        for _ in range(num_candidates):
-            candidate_solution = generate_candidate_solution(current_solution)
-            candidate_solution, candidate_cost = local_search(cost_matrix, facility_costs, candidate_solution)
-            candidates.append((candidate_solution, candidate_cost))
-        
-        # Seleciona a melhor solução candidata
-        best_candidate_solution, best_candidate_cost = min(candidates, key=lambda x: x[1])
-        
-        if best_candidate_cost < current_cost:
-            current_solution, current_cost = best_candidate_solution, best_candidate_cost
-        else:
+    if budget is None:
+        budget = new_budget()
+    if rng is None:
+        rng = new_rng()
+    state = load_checkpoint(checkpoint, 'ff', len(facility_costs), budget)
+    if state is None:
+        with phase(profile, LOCAL_SEARCH_TIME):
+            best_solution, best_cost = local_search(cost_matrix, facility_costs, initial_solution, candidates, budget, True,
+                                                    stop_cost, profile)
+        beam = best_solution.reshape(1, -1).copy()
+        beam_costs = np.array([best_cost])
+        first_level = 0
+        levels_without_improvement = 0
+    else:
+        # Continua a pesquisa de um checkpoint, com o gerador no mesmo estado
+        best_solution, best_cost = state['best_solution'], float(state['best_cost'])
+        beam, beam_costs = state['beam'], state['beam_costs']
+        first_level = int(state['level'])
+        levels_without_improvement = int(state['levels_without_improvement'])
+        rng[:] = state['rng']
+    last_checkpoint = time.perf_counter()
+
+    for level in range(first_level, depth):
+        # Gap certificado pretendido atingido ou orçamento esgotado
+        if best_cost <= stop_cost or exhausted(budget):
             break
-    
-    return current_solution, current_cost
 
-def filter_and_fan_uflp(cost_matrix, facility_costs):
+        with phase(profile, PERTURBATION_TIME):
+            # Fan: movimentos compostos a partir de cada nó do feixe, com custo estimado
+            origins, moves, estimates = fan_out(beam, beam_costs, cost_matrix, facility_costs, candidates, fan_width,
+                                                move_size, rng)
+
+            # Filtro 1: melhores movimentos pelo custo estimado (barato)
+            order = np.argsort(estimates, kind='stable')
+            order = order[np.isfinite(estimates[order])][:num_survivors * prefilter_factor]
+            if len(order) == 0:
+                break
+
+            # Filtro 2: custo exato dos que passaram, todos numa passagem pela matriz (no fim do limite de avaliações,
+            # só os primeiros que ainda cabem)
+            allowed = spend_capped(budget, len(order))
+            if allowed == 0:
+                break
+            order = order[:allowed]
+            children = build_children(beam, origins, moves, order)
+            child_costs = calculate_cost_batch(children, cost_matrix, facility_costs, candidates)
+            chosen = _distinct_best(children, child_costs, num_survivors)
+            # Movimentos compostos: gerados (com custo estimado) e que passaram os dois filtros
+            count(profile, EVALUATIONS, len(order))
+            count_moves(profile, len(estimates), len(chosen))
+            if not chosen:
+                break
+
+        # Só os sobreviventes são melhorados com pesquisa local (em paralelo)
+        with phase(profile, LOCAL_SEARCH_TIME):
+            survivors, survivor_costs = improve_survivors(children[chosen], cost_matrix, facility_costs, candidates, budget,
+                                                          stop_cost, profile)
+
+        # Novo feixe: as melhores soluções distintas
+        next_beam = _distinct_best(survivors, survivor_costs, beam_width)
+        beam = survivors[next_beam]
+        beam_costs = survivor_costs[next_beam]
+
+        if beam_costs[0] < best_cost:
+            best_solution, best_cost = beam[0].copy(), beam_costs[0]
+            record(budget, best_cost)
+            levels_without_improvement = 0
+        else:
+            levels_without_improvement += 1
+            if levels_without_improvement >= patience:
+                break
+
+        if checkpoint is not None and time.perf_counter() - last_checkpoint >= checkpoint_interval:
+            save_checkpoint(checkpoint, 'ff', budget, best_solution=best_solution, best_cost=best_cost, beam=beam,
+                            beam_costs=beam_costs, level=level + 1, levels_without_improvement=levels_without_improvement,
+                            rng=rng)
+            last_checkpoint = time.perf_counter()
+
+    remove_checkpoint(checkpoint)
+    return best_solution, best_cost
+
+def filter_and_fan_uflp(cost_matrix, facility_costs, initial='greedy', candidates=None, target_gap=None, bound=None,
+                        time_limit=None, max_evaluations=None, budget=None, profile=None, **params):
     """
     Aplica o algoritmo Filter and Fan para resolver o UFLP.
 
     Parameters:
     cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
     facility_costs (np.array): Array de custos de abertura das instalações.
+    initial (str): Construção da solução inicial ('greedy', 'add' ou 'add_drop').
+    candidates (np.array): Listas de candidatas de cada cliente (None: procura completa).
+    target_gap (float): Pára quando o gap certificado face ao limite inferior for menor ou igual a este valor (%).
+    bound (float): Limite inferior já calculado (None: é calculado aqui se target_gap for dado).
+    time_limit (float): Tempo máximo em segundos, contado desde o início (None: sem limite).
+    max_evaluations (int): Número máximo de avaliações (None: sem limite).
+    budget (np.array): Orçamento criado pelo chamador (ver Budget.new_budget), onde ficam as avaliações e o traço.
+    profile (np.array): Perfil de execução, onde ficam os contadores e o tempo de cada fase (ver Profile.new_profile).
+    params: Parâmetros do filter_and_fan (depth, beam_width, fan_width, move_size, num_survivors, checkpoint, ...).
 
     Returns:
     tuple: Melhor solução encontrada e o custo associado.
     """
     facility_costs = np.array(facility_costs, dtype=np.float64)
-    
-    # Obtém uma solução inicial usando o algoritmo de greedy
-    facilities_open, initial_cost = greedy_uflp(cost_matrix, facility_costs)
-    initial_solution = np.array(facilities_open, dtype=np.bool_)
+    candidates = resolve_candidates(cost_matrix, candidates)
+    stop_cost = stop_cost_for(cost_matrix, facility_costs, target_gap, bound)
+    budget = resolve_budget(budget, time_limit, max_evaluations)
+
+    # Obtém uma solução inicial usando o algoritmo de greedy (ou o ADD); ao continuar de um checkpoint não é usada
+    if params.get('checkpoint') is not None and os.path.exists(params['checkpoint']):
+        start = None
+    else:
+        start = build_initial_solution(cost_matrix, facility_costs, initial, candidates, profile)
 
     # Aplica o algoritmo Filter and Fan
-    best_solution, best_cost = filter_and_fan(cost_matrix, facility_costs, initial_solution)
+    best_solution, best_cost = filter_and_fan(cost_matrix, facility_costs, start, candidates, stop_cost=stop_cost, budget=budget,
+                                               profile=profile, **params)
 
-    return best_solution, best_cost
\ No newline at end of file
+    return best_solution, best_cost
@@ -1,5 +1,9 @@
+import heapq
 import numpy as np
 from numba import njit
+from algoritmos.CandidateLists import resolve_candidates
+from algoritmos.IncrementalCost import init_assignment, solution_cost, open_delta, apply_open, apply_close, drop_deltas, is_improvement
+from algoritmos.Profile import count, count_moves, phase, EVALUATIONS, CONSTRUCTION_TIME
 
 
 """
@@ -9,14 +13,20 @@ https://www.geeksforgeeks.org/greedy-algorithms/
     que já são boas o bastante para muitos problemas
 """
 
-@njit
-def greedy_uflp(cost_matrix, facility_costs):
+@njit(cache=True)
+def greedy_core(cost_matrix, facility_costs, candidates, profile=None):
     """
     Heurístico construtivo de greedy
 
+    Cada cliente percorre primeiro a sua lista de candidatas (por ordem de custo de afetação) e pára
+    assim que o custo de afetação já não pode bater o melhor valor encontrado; só se a lista acabar
+    antes disso é que são percorridas todas as instalações.
+
     Parameters:
     cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
     facility_costs (np.array): Array de custos de abertura das instalações.
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+    profile (np.array): Perfil de execução (ver Profile; None: sem contadores).
 
     Returns:
     tuple: Array booleano indicando quais instalações estão abertas e o custo total da solução.
@@ -25,36 +35,207 @@ def greedy_uflp(cost_matrix, facility_costs):
     num_clients, num_facilities = cost_matrix.shape
     facilities_open = np.zeros(num_facilities, dtype=np.bool_)
     total_cost = 0.0
+    num_candidates = candidates.shape[1]
+    # Menor valor que o custo de abertura pode acrescentar (limite inferior para a paragem antecipada)
+    min_extra = min(0.0, facility_costs.min())
     
     for client in range(num_clients):
         min_cost = np.inf
         best_facility = -1
-        
-        # Itera sobre cada instalação para encontrar a melhor instalação para o cliente atual
-        for facility in range(num_facilities):
-            # Calcula o custo para atender este cliente em cada instalação
-            if facilities_open[facility]:
-                # Se a instalação já está aberta, apenas o custo de transporte é considerado
-                cost_val = cost_matrix[client][facility]
-            else:
-                # Se a instalação não está aberta, o custo de transporte mais o custo de abertura é considerado
-                cost_val = cost_matrix[client][facility] + facility_costs[facility]
-            
-            # Atualiza o custo mínimo e a melhor instalação se o custo calculado for menor
-            if cost_val < min_cost:
+
+        # Candidatas por ordem de custo de afetação: pára quando nenhuma das seguintes pode ser melhor
+        finished = num_candidates == num_facilities
+        examined = 0
+        for j in range(num_candidates):
+            examined += 1
+            facility = candidates[client, j]
+            cost_val = cost_matrix[client][facility]
+            if cost_val + min_extra > min_cost:
+                finished = True
+                break
+            if not facilities_open[facility]:
+                cost_val += facility_costs[facility]
+            # Empates: fica a instalação com o índice mais baixo, como na procura completa
+            if cost_val < min_cost or (cost_val == min_cost and facility < best_facility):
                 min_cost = cost_val
                 best_facility = facility
+
+        if not finished:
+            # A lista acabou sem garantir a melhor: itera sobre cada instalação para o cliente atual
+            min_cost = np.inf
+            best_facility = -1
+            examined += num_facilities
+            for facility in range(num_facilities):
+                # Calcula o custo para atender este cliente em cada instalação
+                if facilities_open[facility]:
+                    # Se a instalação já está aberta, apenas o custo de transporte é considerado
+                    cost_val = cost_matrix[client][facility]
+                else:
+                    # Se a instalação não está aberta, o custo de transporte mais o custo de abertura é considerado
+                    cost_val = cost_matrix[client][facility] + facility_costs[facility]
+
+                # Atualiza o custo mínimo e a melhor instalação se o custo calculado for menor
+                if cost_val < min_cost:
+                    min_cost = cost_val
+                    best_facility = facility
         
         # Abrir instalação se já não estiver aberta
-        if not facilities_open[best_facility]:
+        opened = not facilities_open[best_facility]
+        if opened:
             facilities_open[best_facility] = True
             total_cost += facility_costs[best_facility]
+        # Movimentos: afetações avaliadas para o cliente e aberturas de instalações
+        count_moves(profile, examined, opened)
         
         # Somar o custo de transporte do cliente à melhor instalação encontrada
         total_cost += cost_matrix[client][best_facility]
     
     return facilities_open, total_cost
 
+def greedy_uflp(cost_matrix, facility_costs, candidates=None, profile=None):
+    """
+    Heurístico construtivo de greedy (ver greedy_core).
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    candidates (np.array): Listas de candidatas de cada cliente (None: procura completa).
+    profile (np.array): Perfil de execução (ver Profile.new_profile; None: sem contadores).
+
+    Returns:
+    tuple: Array booleano indicando quais instalações estão abertas e o custo total da solução.
+    """
+    facility_costs = np.array(facility_costs, dtype=np.float64)
+    with phase(profile, CONSTRUCTION_TIME):
+        return greedy_core(cost_matrix, facility_costs, resolve_candidates(cost_matrix, candidates), profile)
+
+
+@njit(cache=True)
+def greedy_add_core(cost_matrix, facility_costs, use_drop, candidates, profile=None):
+    """
+    Heurístico construtivo ADD (com avaliação preguiçosa) e, opcionalmente, DROP.
+
+    Começa com a instalação que sozinha tem menor custo e vai abrindo a instalação com maior poupança
+    total (redução do custo de afetação menos o custo de abertura) enquanto houver poupança.
+    As poupanças só podem diminuir quando se abrem mais instalações, por isso o valor guardado no heap
+    é um limite superior: só a instalação do topo é recalculada e, se continuar a ser pelo menos tão
+    boa como o limite seguinte, é mesmo a melhor e é aberta sem recalcular as restantes.
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    use_drop (bool): No fim, fecha repetidamente a instalação cujo fecho mais reduz o custo.
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+    profile (np.array): Perfil de execução (ver Profile; None: sem contadores).
+
+    Returns:
+    tuple: Array booleano indicando quais instalações estão abertas e o custo total da solução.
+    """
+    num_clients, num_facilities = cost_matrix.shape
+    facilities_open = np.zeros(num_facilities, dtype=np.bool_)
+
+    # Primeira instalação: a de menor custo quando é a única aberta
+    first_facility = -1
+    first_cost = np.inf
+    for facility in range(num_facilities):
+        cost_val = facility_costs[facility]
+        for client in range(num_clients):
+            cost_val += cost_matrix[client, facility]
+        if cost_val < first_cost:
+            first_cost = cost_val
+            first_facility = facility
+    facilities_open[first_facility] = True
+    best_fac, best_cost, second_fac, second_cost = init_assignment(facilities_open, cost_matrix, candidates)
+    total_cost = solution_cost(facilities_open, facility_costs, best_cost)
+    count(profile, EVALUATIONS, num_facilities + 1)
+    count_moves(profile, num_facilities - 1, 0)
+
+    # Max-heap das poupanças (guardadas com sinal trocado, o heapq é um min-heap)
+    heap = [(-np.inf, -1)]
+    heap.pop()
+    for facility in range(num_facilities):
+        if not facilities_open[facility]:
+            heap.append((open_delta(facility, cost_matrix, facility_costs, best_cost), facility))
+    heapq.heapify(heap)
+
+    while len(heap) > 0:
+        stale_delta, facility = heapq.heappop(heap)
+        if not is_improvement(stale_delta, total_cost):
+            break # Nem o limite superior da melhor poupança melhora a solução
+        delta = open_delta(facility, cost_matrix, facility_costs, best_cost)
+        count_moves(profile, 1, 0)
+        if len(heap) > 0 and delta > heap[0][0]:
+            # Limite desatualizado: volta ao heap com o valor atual
+            heapq.heappush(heap, (delta, facility))
+            continue
+        if not is_improvement(delta, total_cost):
+            break
+        apply_open(facility, facilities_open, cost_matrix, best_fac, best_cost, second_fac, second_cost)
+        count_moves(profile, 0, 1)
+        total_cost += delta
+
+    if use_drop:
+        while True:
+            deltas = drop_deltas(facilities_open, facility_costs, best_fac, best_cost, second_cost)
+            facility = np.argmin(deltas)
+            improves = is_improvement(deltas[facility], total_cost)
+            if profile is not None:
+                count_moves(profile, facilities_open.sum(), improves)
+            if not improves:
+                break
+            apply_close(facility, facilities_open, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates)
+            total_cost += deltas[facility]
+
+    count(profile, EVALUATIONS, 1)
+    return facilities_open, solution_cost(facilities_open, facility_costs, best_cost)
+
+def greedy_add_uflp(cost_matrix, facility_costs, use_drop=False, candidates=None, profile=None):
+    """
+    Heurístico construtivo ADD com avaliação preguiçosa e DROP opcional (ver greedy_add_core).
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    use_drop (bool): No fim, fecha repetidamente a instalação cujo fecho mais reduz o custo.
+    candidates (np.array): Listas de candidatas de cada cliente (None: procura completa).
+    profile (np.array): Perfil de execução (ver Profile.new_profile; None: sem contadores).
+
+    Returns:
+    tuple: Array booleano indicando quais instalações estão abertas e o custo total da solução.
+    """
+    facility_costs = np.array(facility_costs, dtype=np.float64)
+    with phase(profile, CONSTRUCTION_TIME):
+        return greedy_add_core(cost_matrix, facility_costs, use_drop, resolve_candidates(cost_matrix, candidates), profile)
+
+
+# Método de construção da solução inicial das pesquisas locais -> (função, argumentos extra)
+INITIAL_SOLUTIONS = {
+    'greedy': (greedy_core, ()),
+    'add': (greedy_add_core, (False,)),
+    'add_drop': (greedy_add_core, (True,)),
+}
+
+def build_initial_solution(cost_matrix, facility_costs, method, candidates, profile=None):
+    """
+    Constrói a solução inicial de uma pesquisa local.
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações (float64).
+    method (str): 'greedy' (por cliente), 'add' (ADD preguiçoso) ou 'add_drop' (ADD seguido de DROP).
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+    profile (np.array): Perfil de execução, onde fica o tempo de construção (ver Profile; None: sem contadores).
+
+    Returns:
+    np.array: Array booleano indicando quais instalações estão abertas.
+    """
+    if method not in INITIAL_SOLUTIONS:
+        raise ValueError(f"Solução inicial inválida: {method} (opções: {', '.join(INITIAL_SOLUTIONS)})")
+    constructor, args = INITIAL_SOLUTIONS[method]
+    with phase(profile, CONSTRUCTION_TIME):
+        facilities_open, initial_cost = constructor(cost_matrix, facility_costs, *args, candidates, profile)
+    return np.array(facilities_open, dtype=np.bool_)
+
 
 """
 const_Matrix[m][n] -> m são os clientes e n são as facilities
@@ -0,0 +1,264 @@
+import numpy as np
+from numba import njit
+from algoritmos.CandidateLists import two_nearest_open
+
+
+"""
+Motor de avaliação incremental partilhado pelas pesquisas locais.
+
+Para cada cliente guarda-se a melhor e a segunda melhor instalação aberta (e os respetivos custos).
+Com isto, a variação exata do custo ao abrir ou fechar uma instalação é calculada em O(C), em vez
+de copiar a solução e voltar a percorrer a matriz clientes x instalações inteira (O(C*F)).
+A melhor e a segunda melhor instalação de cada cliente são procuradas nas listas de candidatas
+(ver CandidateLists), recorrendo à procura completa apenas quando necessário.
+"""
+
+# Tolerância relativa usada para decidir se um movimento melhora realmente a solução
+IMPROVEMENT_TOL = 1e-9
+
+
+@njit(cache=True)
+def is_improvement(delta, current_cost):
+    """
+    Verifica se uma variação de custo corresponde a uma melhoria real (ignora erros de arredondamento).
+
+    Parameters:
+    delta (float): Variação do custo provocada pelo movimento.
+    current_cost (float): Custo da solução atual.
+
+    Returns:
+    bool: True se o movimento melhora a solução.
+    """
+    return delta < -IMPROVEMENT_TOL * max(1.0, abs(current_cost))
+
+
+@njit(cache=True)
+def _rescan_client(client, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates):
+    """
+    Recalcula a melhor e a segunda melhor instalação aberta de um cliente.
+    """
+    b_fac, b_cost, s_fac, s_cost = two_nearest_open(client, solution, cost_matrix, candidates)
+    best_fac[client] = b_fac
+    best_cost[client] = b_cost
+    second_fac[client] = s_fac
+    second_cost[client] = s_cost
+
+
+@njit(cache=True)
+def init_assignment(solution, cost_matrix, candidates):
+    """
+    Constrói o estado incremental (melhor e segunda melhor instalação aberta de cada cliente).
+
+    Parameters:
+    solution (np.array): Array booleano que indica se a instalação está aberta.
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+
+    Returns:
+    tuple: Arrays best_fac, best_cost, second_fac e second_cost (um valor por cliente).
+    """
+    num_clients = cost_matrix.shape[0]
+    best_fac = np.empty(num_clients, dtype=np.int64)
+    best_cost = np.empty(num_clients, dtype=np.float64)
+    second_fac = np.empty(num_clients, dtype=np.int64)
+    second_cost = np.empty(num_clients, dtype=np.float64)
+    for client in range(num_clients):
+        _rescan_client(client, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates)
+    return best_fac, best_cost, second_fac, second_cost
+
+
+@njit(cache=True)
+def copy_assignment(best_fac, best_cost, second_fac, second_cost):
+    """
+    Copia o estado incremental (usado para avaliar movimentos compostos sem estragar o estado atual).
+    """
+    return best_fac.copy(), best_cost.copy(), second_fac.copy(), second_cost.copy()
+
+
+@njit(cache=True)
+def solution_cost(solution, facility_costs, best_cost):
+    """
+    Calcula o custo total a partir do estado incremental em O(C + F).
+
+    Parameters:
+    solution (np.array): Array booleano que indica se a instalação está aberta.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    best_cost (np.array): Custo de afetação de cada cliente à sua melhor instalação aberta.
+
+    Returns:
+    float: Custo total da solução.
+    """
+    cost = 0.0
+    for client in range(best_cost.shape[0]):
+        cost += best_cost[client]
+    for facility in range(solution.shape[0]):
+        if solution[facility]:
+            cost += facility_costs[facility]
+    return cost
+
+
+@njit(cache=True)
+def open_delta(facility, cost_matrix, facility_costs, best_cost):
+    """
+    Variação exata do custo ao abrir uma instalação fechada, em O(C).
+
+    Parameters:
+    facility (int): Instalação (fechada) a abrir.
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    best_cost (np.array): Custo de afetação de cada cliente à sua melhor instalação aberta.
+
+    Returns:
+    float: Variação do custo total (negativa se o movimento melhora a solução).
+    """
+    delta = facility_costs[facility]
+    for client in range(cost_matrix.shape[0]):
+        diff = cost_matrix[client, facility] - best_cost[client]
+        if diff < 0.0:
+            delta += diff
+    return delta
+
+
+@njit(cache=True)
+def close_delta(facility, facility_costs, best_fac, best_cost, second_cost):
+    """
+    Variação exata do custo ao fechar uma instalação aberta, em O(C).
+
+    Parameters:
+    facility (int): Instalação (aberta) a fechar.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    best_fac (np.array): Melhor instalação aberta de cada cliente.
+    best_cost (np.array): Custo de afetação à melhor instalação aberta.
+    second_cost (np.array): Custo de afetação à segunda melhor instalação aberta.
+
+    Returns:
+    float: Variação do custo total (infinito se fechar deixar clientes sem instalação).
+    """
+    delta = -facility_costs[facility]
+    for client in range(best_fac.shape[0]):
+        if best_fac[client] == facility:
+            delta += second_cost[client] - best_cost[client]
+    return delta
+
+
+@njit(cache=True)
+def flip_delta(facility, solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost):
+    """
+    Variação exata do custo ao trocar o estado (aberta/fechada) de uma instalação.
+
+    Parameters:
+    facility (int): Instalação cujo estado é trocado.
+    solution (np.array): Array booleano que indica se a instalação está aberta.
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    best_fac (np.array): Melhor instalação aberta de cada cliente.
+    best_cost (np.array): Custo de afetação à melhor instalação aberta.
+    second_cost (np.array): Custo de afetação à segunda melhor instalação aberta.
+
+    Returns:
+    float: Variação do custo total.
+    """
+    if solution[facility]:
+        return close_delta(facility, facility_costs, best_fac, best_cost, second_cost)
+    return open_delta(facility, cost_matrix, facility_costs, best_cost)
+
+
+@njit(cache=True)
+def apply_open(facility, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost):
+    """
+    Abre uma instalação e atualiza o estado incremental em O(C).
+    """
+    solution[facility] = True
+    for client in range(cost_matrix.shape[0]):
+        cost_val = cost_matrix[client, facility]
+        if cost_val < best_cost[client]:
+            second_fac[client] = best_fac[client]
+            second_cost[client] = best_cost[client]
+            best_fac[client] = facility
+            best_cost[client] = cost_val
+        elif cost_val < second_cost[client]:
+            second_fac[client] = facility
+            second_cost[client] = cost_val
+
+
+@njit(cache=True)
+def apply_close(facility, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates):
+    """
+    Fecha uma instalação e atualiza o estado incremental.
+    Só os clientes que tinham esta instalação como melhor ou segunda melhor são percorridos de novo.
+    """
+    solution[facility] = False
+    for client in range(cost_matrix.shape[0]):
+        if best_fac[client] == facility or second_fac[client] == facility:
+            _rescan_client(client, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates)
+
+
+@njit(cache=True)
+def apply_flip(facility, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates):
+    """
+    Troca o estado de uma instalação e atualiza o estado incremental.
+    """
+    if solution[facility]:
+        apply_close(facility, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates)
+    else:
+        apply_open(facility, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost)
+
+
+@njit(cache=True)
+def drop_deltas(solution, facility_costs, best_fac, best_cost, second_cost):
+    """
+    Variação do custo ao fechar cada uma das instalações abertas, todas numa única passagem O(C + F).
+
+    Returns:
+    np.array: Variação por instalação (infinito para as instalações fechadas).
+    """
+    num_facilities = solution.shape[0]
+    deltas = np.empty(num_facilities, dtype=np.float64)
+    for facility in range(num_facilities):
+        deltas[facility] = -facility_costs[facility] if solution[facility] else np.inf
+    for client in range(best_fac.shape[0]):
+        if best_fac[client] >= 0:
+            deltas[best_fac[client]] += second_cost[client] - best_cost[client]
+    return deltas
+
+
+@njit(cache=True)
+def interchange_deltas(facility_in, solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost, deltas):
+    """
+    Fast interchange (Whitaker): variação do custo ao abrir facility_in e fechar, em simultâneo, cada
+    uma das instalações abertas, calculada para todas em O(C + F).
+
+    Ao abrir facility_in cada cliente passa a custar min(d1, c); se além disso a sua melhor instalação
+    h for fechada, passa a custar min(d2, c). A diferença entre os dois casos é acumulada em deltas[h].
+    Pressupõe que a solução tem pelo menos uma instalação aberta.
+
+    Parameters:
+    facility_in (int): Instalação (fechada) a abrir.
+    solution (np.array): Array booleano que indica se a instalação está aberta.
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    best_fac, best_cost, second_cost (np.array): Estado incremental (ver init_assignment).
+    deltas (np.array): Array de saída (tamanho F) com a variação de cada troca (facility_in, h);
+                       infinito para as instalações h fechadas.
+
+    Returns:
+    float: Variação do custo ao apenas abrir facility_in (sem fechar nenhuma).
+    """
+    num_facilities = solution.shape[0]
+    for facility in range(num_facilities):
+        deltas[facility] = 0.0 if solution[facility] else np.inf
+
+    add_delta = facility_costs[facility_in]
+    for client in range(cost_matrix.shape[0]):
+        cost_val = cost_matrix[client, facility_in]
+        d1 = best_cost[client]
+        if cost_val < d1:
+            add_delta += cost_val - d1
+            # Fechar a melhor instalação do cliente não custa nada: facility_in já é melhor que ela
+        else:
+            deltas[best_fac[client]] += min(second_cost[client], cost_val) - d1
+
+    for facility in range(num_facilities):
+        if solution[facility]:
+            deltas[facility] += add_delta - facility_costs[facility]
+    return add_delta
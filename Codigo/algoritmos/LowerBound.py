@@ -0,0 +1,272 @@
+import numpy as np
+from numba import njit
+from algoritmos.Budget import exhausted
+from algoritmos.CandidateLists import no_candidates
+from algoritmos.GreedyAlgorithm import greedy_add_core
+
+"""
+Limites inferiores para o UFLP, calculados a partir dos mesmos arrays (facility_costs, cost_matrix).
+
+Dual do problema relaxado (forma condensada de Erlenkotter): maximizar a soma de v_j sujeito a
+    soma_j max(0, v_j - c_ij) <= f_i  para cada instalação i.
+Qualquer v que respeite as restrições dá um limite inferior igual à soma de v_j.
+
+    dual_ascent: heurística de subida dual de Erlenkotter (DUALOC), rápida e já bastante forte.
+    lagrangian_bound: relaxação Lagrangiana das restrições de afetação, otimizada por subgradiente
+                      (passo de Polyak) a partir dos multiplicadores da subida dual; nunca é pior do que ela.
+
+Com um limite inferior LB, o gap certificado de uma solução com custo S é 100 * (S - LB) / LB, que
+majora o gap real face ao ótimo.
+"""
+
+# Métodos disponíveis em lower_bound
+BOUND_METHODS = ('dual', 'lagrangian')
+
+# Estado de cada instalação num subproblema (por ex. na redução ou num nó do branch-and-bound)
+FACILITY_FREE = 0
+FACILITY_OPEN = 1
+FACILITY_CLOSED = 2
+
+def all_free(num_facilities):
+    """
+    Estado sem nenhuma instalação fixada.
+    """
+    return np.full(num_facilities, FACILITY_FREE, dtype=np.int8)
+
+@njit(cache=True)
+def dual_ascent(cost_matrix, facility_costs, status, max_passes=100000, budget=None):
+    """
+    Subida dual de Erlenkotter.
+
+    Começa com v_j = menor custo de afetação do cliente j e, em passagens sucessivas pelos clientes,
+    aumenta cada v_j até ao custo de afetação seguinte, limitado pela menor folga das instalações
+    que já estão a ser "pagas" por esse cliente. Pára quando nenhuma variável pode aumentar.
+
+    As instalações fechadas em status são ignoradas; as abertas têm folga 0 e o seu custo fixo é somado ao limite.
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    status (np.array): Estado de cada instalação (FACILITY_FREE, FACILITY_OPEN ou FACILITY_CLOSED).
+    max_passes (int): Número máximo de passagens pelos clientes.
+    budget (np.array): Orçamento (ver Budget; None: sem limites). Quando se esgota, a subida pára e devolve o
+                       limite atual, que continua válido (v é admissível depois de cada passagem).
+
+    Returns:
+    tuple: Limite inferior, variáveis duais v (uma por cliente) e folga de cada instalação.
+    """
+    num_clients, num_facilities = cost_matrix.shape
+    v = np.empty(num_clients, dtype=np.float64)
+    slack = np.zeros(num_facilities, dtype=np.float64)
+    bound = 0.0
+    for facility in range(num_facilities):
+        if status[facility] == FACILITY_FREE:
+            slack[facility] = facility_costs[facility]
+        elif status[facility] == FACILITY_OPEN:
+            bound += facility_costs[facility]
+    for client in range(num_clients):
+        v[client] = np.inf
+        for facility in range(num_facilities):
+            if status[facility] != FACILITY_CLOSED and cost_matrix[client, facility] < v[client]:
+                v[client] = cost_matrix[client, facility]
+
+    for _ in range(max_passes):
+        if budget is not None and exhausted(budget):
+            break
+        increased = False
+        for client in range(num_clients):
+            current = v[client]
+            next_break = np.inf
+            min_slack = np.inf
+            for facility in range(num_facilities):
+                if status[facility] == FACILITY_CLOSED:
+                    continue
+                cost_val = cost_matrix[client, facility]
+                if cost_val <= current:
+                    if slack[facility] < min_slack:
+                        min_slack = slack[facility]
+                elif cost_val < next_break:
+                    next_break = cost_val
+
+            step = min(next_break - current, min_slack)
+            if step > 1e-12 * max(1.0, abs(current)):
+                v[client] = current + step
+                for facility in range(num_facilities):
+                    if status[facility] != FACILITY_CLOSED and cost_matrix[client, facility] <= current:
+                        slack[facility] = max(0.0, slack[facility] - step)
+                increased = True
+        if not increased:
+            break
+
+    for client in range(num_clients):
+        bound += v[client]
+    return bound, v, slack
+
+@njit(cache=True)
+def lagrangian_value(cost_matrix, facility_costs, multipliers, status, reduced, facility_open):
+    """
+    Valor da relaxação Lagrangiana para os multiplicadores dados (com pelo menos uma instalação aberta).
+
+    Preenche reduced (custo reduzido de cada instalação) e facility_open (solução do subproblema,
+    respeitando as instalações fixadas em status).
+    """
+    num_clients, num_facilities = cost_matrix.shape
+    for facility in range(num_facilities):
+        reduced[facility] = facility_costs[facility]
+    value = 0.0
+    for client in range(num_clients):
+        value += multipliers[client]
+        for facility in range(num_facilities):
+            diff = cost_matrix[client, facility] - multipliers[client]
+            if diff < 0.0:
+                reduced[facility] += diff
+
+    best_facility = -1
+    any_open = False
+    for facility in range(num_facilities):
+        if status[facility] == FACILITY_CLOSED:
+            facility_open[facility] = False
+            continue
+        facility_open[facility] = status[facility] == FACILITY_OPEN or reduced[facility] < 0.0
+        if facility_open[facility]:
+            value += reduced[facility]
+            any_open = True
+        if best_facility < 0 or reduced[facility] < reduced[best_facility]:
+            best_facility = facility
+    if not any_open and best_facility >= 0:
+        # Qualquer solução abre pelo menos uma instalação
+        facility_open[best_facility] = True
+        value += reduced[best_facility]
+    return value
+
+@njit(cache=True)
+def lagrangian_bound(cost_matrix, facility_costs, multipliers, upper_bound, status, max_iterations=300, patience=15, budget=None):
+    """
+    Otimização por subgradiente da relaxação Lagrangiana.
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    multipliers (np.array): Multiplicadores iniciais (por ex. as variáveis duais da subida dual).
+    upper_bound (float): Custo de uma solução conhecida (usado no passo de Polyak).
+    status (np.array): Estado de cada instalação (ver dual_ascent).
+    max_iterations (int): Número máximo de iterações.
+    patience (int): Iterações sem melhorar o limite antes de reduzir o passo para metade.
+    budget (np.array): Orçamento (ver Budget; None: sem limites). Quando se esgota é devolvido o melhor limite até
+                       esse momento (calculado pelo menos uma vez).
+
+    Returns:
+    tuple: Melhor limite inferior e os multiplicadores correspondentes.
+    """
+    num_clients, num_facilities = cost_matrix.shape
+    current = multipliers.astype(np.float64)
+    best_multipliers = current.copy()
+    reduced = np.empty(num_facilities, dtype=np.float64)
+    facility_open = np.empty(num_facilities, dtype=np.bool_)
+    subgradient = np.empty(num_clients, dtype=np.float64)
+    best_bound = -np.inf
+    step_scale = 2.0
+    without_improvement = 0
+
+    for _ in range(max_iterations):
+        value = lagrangian_value(cost_matrix, facility_costs, current, status, reduced, facility_open)
+        if value > best_bound:
+            best_bound = value
+            best_multipliers[:] = current
+            without_improvement = 0
+        else:
+            without_improvement += 1
+            if without_improvement >= patience:
+                step_scale /= 2.0
+                without_improvement = 0
+        if step_scale < 1e-4 or upper_bound - best_bound <= 1e-9 * max(1.0, abs(upper_bound)):
+            break
+        if budget is not None and exhausted(budget):
+            break
+
+        # Subgradiente: 1 - número de instalações abertas a que o cliente ficaria afetado
+        norm = 0.0
+        for client in range(num_clients):
+            assigned = 0
+            for facility in range(num_facilities):
+                if facility_open[facility] and cost_matrix[client, facility] < current[client]:
+                    assigned += 1
+            subgradient[client] = 1.0 - assigned
+            norm += subgradient[client] * subgradient[client]
+        if norm == 0.0:
+            break # A solução do subproblema é admissível: o limite é ótimo
+
+        step = step_scale * (upper_bound - value) / norm
+        for client in range(num_clients):
+            current[client] += step * subgradient[client]
+
+    return best_bound, best_multipliers
+
+def lower_bound(cost_matrix, facility_costs, method='lagrangian', upper_bound=None, max_iterations=300):
+    """
+    Calcula um limite inferior do custo ótimo.
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    method (str): 'dual' (subida dual) ou 'lagrangian' (subida dual seguida de subgradiente).
+    upper_bound (float): Custo de uma solução conhecida (por omissão, o do greedy ADD).
+    max_iterations (int): Número máximo de iterações do subgradiente.
+
+    Returns:
+    float: Limite inferior.
+    """
+    if method not in BOUND_METHODS:
+        raise ValueError(f"Método de limite inferior inválido: {method} (opções: {', '.join(BOUND_METHODS)})")
+    facility_costs = np.array(facility_costs, dtype=np.float64)
+
+    if method == 'dual':
+        return dual_ascent(cost_matrix, facility_costs, all_free(len(facility_costs)))[0]
+    return lagrangian_multipliers(cost_matrix, facility_costs, upper_bound, max_iterations)[0]
+
+def lagrangian_multipliers(cost_matrix, facility_costs, upper_bound=None, max_iterations=300, status=None,
+                           multipliers=None, budget=None):
+    """
+    Subida dual seguida de subgradiente, devolvendo também os multiplicadores (usados na fixação por custos reduzidos).
+
+    Parameters:
+    status (np.array): Instalações fixadas (None: nenhuma).
+    multipliers (np.array): Multiplicadores iniciais (None: os da subida dual, que só é feita neste caso).
+    budget (np.array): Orçamento (ver Budget; None: sem limites); quando se esgota é devolvido o melhor limite até aí.
+
+    Returns:
+    tuple: Limite inferior e multiplicadores correspondentes (um por cliente).
+    """
+    facility_costs = np.asarray(facility_costs, dtype=np.float64)
+    if status is None:
+        status = all_free(len(facility_costs))
+    if upper_bound is None:
+        upper_bound = greedy_add_core(cost_matrix, facility_costs, True, no_candidates(cost_matrix.shape[0]))[1]
+    if multipliers is not None:
+        return lagrangian_bound(cost_matrix, facility_costs, multipliers, upper_bound, status, max_iterations, budget=budget)
+
+    bound, v, slack = dual_ascent(cost_matrix, facility_costs, status, budget=budget)
+    lagrangian, best_multipliers = lagrangian_bound(cost_matrix, facility_costs, v, upper_bound, status, max_iterations,
+                                                    budget=budget)
+    if lagrangian < bound:
+        return bound, v
+    return lagrangian, best_multipliers
+
+def stop_cost_for(cost_matrix, facility_costs, target_gap=None, bound=None):
+    """
+    Custo a partir do qual uma pesquisa pode parar: o da solução que está a target_gap % do limite inferior.
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    target_gap (float): Gap certificado pretendido, em percentagem (None: nunca parar mais cedo).
+    bound (float): Limite inferior já calculado (None: é calculado aqui).
+
+    Returns:
+    float: Custo de paragem (-infinito se target_gap for None).
+    """
+    if target_gap is None:
+        return -np.inf
+    if bound is None:
+        bound = lower_bound(cost_matrix, facility_costs)
+    return bound + abs(bound) * target_gap / 100.0
@@ -0,0 +1,224 @@
+import numpy as np
+from numba import njit, prange
+from algoritmos.IncrementalCost import flip_delta, drop_deltas, interchange_deltas, is_improvement
+
+
+"""
+Procura do melhor movimento nas vizinhanças switch e interchange (swap), em paralelo.
+
+As instalações são divididas em blocos de SCAN_CHUNK. Cada bloco é percorrido por uma única thread,
+que guarda o seu melhor movimento numa posição própria dos arrays de resultados (sem variáveis
+partilhadas entre threads). No fim, os blocos são reduzidos por ordem, com comparação estrita: em caso
+de empate ganha sempre o movimento com o índice mais baixo, exatamente como na versão em série.
+Por isso o resultado é o mesmo com 1 ou N threads, e com parallel=True ou parallel=False.
+"""
+
+# Número de instalações por bloco de trabalho
+SCAN_CHUNK = 8
+
+
+@njit(cache=True)
+def _flip_chunk(start, end, solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost,
+                tabu_until, iteration, current_cost, aspiration_cost):
+    best_facility = -1
+    best_delta = np.inf
+    for facility in range(start, end):
+        delta = flip_delta(facility, solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost)
+        if iteration < tabu_until[facility]:
+            # Aspiração: um movimento tabu só é permitido se melhorar aspiration_cost
+            if not is_improvement(current_cost + delta - aspiration_cost, aspiration_cost):
+                continue
+        if delta < best_delta:
+            best_delta = delta
+            best_facility = facility
+    return best_facility, best_delta
+
+
+@njit(parallel=True, cache=True)
+def _flip_chunks_parallel(solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost,
+                          tabu_until, iteration, current_cost, aspiration_cost):
+    num_facilities = solution.shape[0]
+    num_chunks = (num_facilities + SCAN_CHUNK - 1) // SCAN_CHUNK
+    chunk_facility = np.empty(num_chunks, dtype=np.int64)
+    chunk_delta = np.empty(num_chunks, dtype=np.float64)
+    for chunk in prange(num_chunks):
+        start = chunk * SCAN_CHUNK
+        end = min(start + SCAN_CHUNK, num_facilities)
+        chunk_facility[chunk], chunk_delta[chunk] = _flip_chunk(
+            start, end, solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost,
+            tabu_until, iteration, current_cost, aspiration_cost)
+    return chunk_facility, chunk_delta
+
+
+@njit(cache=True)
+def best_flip_move(solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost,
+                   tabu_until, iteration, current_cost, aspiration_cost, parallel=True):
+    """
+    Melhor movimento switch (trocar o estado de uma instalação).
+
+    Parameters:
+    solution (np.array): Array booleano que indica se a instalação está aberta.
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    best_fac, best_cost, second_cost (np.array): Estado incremental (ver IncrementalCost.init_assignment).
+    tabu_until (np.array): Iteração até à qual cada instalação é tabu (zeros se não houver memória tabu).
+    iteration (int): Iteração atual.
+    current_cost (float): Custo da solução atual.
+    aspiration_cost (float): Um movimento tabu só é admissível se levar a um custo abaixo deste.
+    parallel (bool): Percorre os blocos de instalações em paralelo.
+
+    Returns:
+    tuple: Melhor instalação (-1 se nenhum movimento for admissível) e a variação de custo associada.
+    """
+    if not parallel:
+        return _flip_chunk(0, solution.shape[0], solution, cost_matrix, facility_costs, best_fac, best_cost,
+                           second_cost, tabu_until, iteration, current_cost, aspiration_cost)
+
+    chunk_facility, chunk_delta = _flip_chunks_parallel(
+        solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost,
+        tabu_until, iteration, current_cost, aspiration_cost)
+
+    # Redução determinística: blocos por ordem, comparação estrita
+    best_facility = -1
+    best_delta = np.inf
+    for chunk in range(chunk_facility.shape[0]):
+        if chunk_delta[chunk] < best_delta:
+            best_delta = chunk_delta[chunk]
+            best_facility = chunk_facility[chunk]
+    return best_facility, best_delta
+
+
+@njit(cache=True)
+def _interchange_chunk(start, end, solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost):
+    num_facilities = solution.shape[0]
+    deltas = np.empty(num_facilities, dtype=np.float64) # Memória própria de cada bloco
+    best_in, best_out = -1, -1
+    best_delta = np.inf
+    for facility_in in range(start, end):
+        if solution[facility_in]:
+            continue
+        add_delta = interchange_deltas(facility_in, solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost, deltas)
+        if add_delta < best_delta:
+            best_delta = add_delta
+            best_in, best_out = facility_in, -1
+        for facility_out in range(num_facilities):
+            if deltas[facility_out] < best_delta:
+                best_delta = deltas[facility_out]
+                best_in, best_out = facility_in, facility_out
+    return best_in, best_out, best_delta
+
+
+@njit(parallel=True, cache=True)
+def _interchange_chunks_parallel(solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost):
+    num_facilities = solution.shape[0]
+    num_chunks = (num_facilities + SCAN_CHUNK - 1) // SCAN_CHUNK
+    chunk_in = np.empty(num_chunks, dtype=np.int64)
+    chunk_out = np.empty(num_chunks, dtype=np.int64)
+    chunk_delta = np.empty(num_chunks, dtype=np.float64)
+    for chunk in prange(num_chunks):
+        start = chunk * SCAN_CHUNK
+        end = min(start + SCAN_CHUNK, num_facilities)
+        chunk_in[chunk], chunk_out[chunk], chunk_delta[chunk] = _interchange_chunk(
+            start, end, solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost)
+    return chunk_in, chunk_out, chunk_delta
+
+
+@njit(cache=True)
+def best_interchange_move(solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost, parallel=True):
+    """
+    Melhor movimento interchange: abrir uma instalação fechada e/ou fechar uma aberta (fast interchange).
+
+    Fechar apenas uma instalação é avaliado primeiro, depois cada instalação a abrir (sozinha e trocada
+    com cada instalação aberta), pela ordem dos índices.
+
+    Returns:
+    tuple: Instalação a abrir (-1: nenhuma), instalação a fechar (-1: nenhuma) e a variação de custo.
+    """
+    num_facilities = solution.shape[0]
+
+    # Fechar apenas uma instalação (uma passagem O(C + F))
+    best_in, best_out = -1, -1
+    best_delta = np.inf
+    closing = drop_deltas(solution, facility_costs, best_fac, best_cost, second_cost)
+    for facility in range(num_facilities):
+        if closing[facility] < best_delta:
+            best_delta = closing[facility]
+            best_in, best_out = -1, facility
+
+    if not parallel:
+        move_in, move_out, delta = _interchange_chunk(0, num_facilities, solution, cost_matrix, facility_costs,
+                                                      best_fac, best_cost, second_cost)
+        if delta < best_delta:
+            return move_in, move_out, delta
+        return best_in, best_out, best_delta
+
+    chunk_in, chunk_out, chunk_delta = _interchange_chunks_parallel(
+        solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost)
+
+    # Redução determinística: blocos por ordem, comparação estrita
+    for chunk in range(chunk_in.shape[0]):
+        if chunk_delta[chunk] < best_delta:
+            best_delta = chunk_delta[chunk]
+            best_in, best_out = chunk_in[chunk], chunk_out[chunk]
+    return best_in, best_out, best_delta
+
+
+@njit(cache=True)
+def partial_flip_move(solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost,
+                      tabu_until, iteration, current_cost, aspiration_cost, max_neighbors):
+    """
+    Melhor movimento switch entre as primeiras max_neighbors instalações (a última iteração quando o limite de
+    avaliações não chega para a vizinhança toda, ver Budget.spend_capped), em série.
+
+    Returns:
+    tuple: Melhor instalação (-1 se nenhum movimento for admissível) e a variação de custo associada.
+    """
+    return _flip_chunk(0, min(max_neighbors, solution.shape[0]), solution, cost_matrix, facility_costs, best_fac, best_cost,
+                       second_cost, tabu_until, iteration, current_cost, aspiration_cost)
+
+
+@njit(cache=True)
+def partial_interchange_move(solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost, max_neighbors):
+    """
+    Melhor movimento interchange entre os primeiros max_neighbors vizinhos, pela ordem de best_interchange_move
+    (os fechos, depois cada instalação a abrir: sozinha e trocada com cada instalação aberta), em série.
+
+    Returns:
+    tuple: Instalação a abrir (-1: nenhuma), instalação a fechar (-1: nenhuma) e a variação de custo.
+    """
+    num_facilities = solution.shape[0]
+    left = max_neighbors
+
+    best_in, best_out = -1, -1
+    best_delta = np.inf
+    closing = drop_deltas(solution, facility_costs, best_fac, best_cost, second_cost)
+    for facility in range(num_facilities):
+        if left == 0:
+            return best_in, best_out, best_delta
+        if solution[facility]:
+            left -= 1
+            if closing[facility] < best_delta:
+                best_delta = closing[facility]
+                best_in, best_out = -1, facility
+
+    deltas = np.empty(num_facilities, dtype=np.float64)
+    for facility_in in range(num_facilities):
+        if left == 0:
+            break
+        if solution[facility_in]:
+            continue
+        add_delta = interchange_deltas(facility_in, solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost, deltas)
+        left -= 1
+        if add_delta < best_delta:
+            best_delta = add_delta
+            best_in, best_out = facility_in, -1
+        for facility_out in range(num_facilities):
+            if left == 0:
+                break
+            if not solution[facility_out]:
+                continue
+            left -= 1
+            if deltas[facility_out] < best_delta:
+                best_delta = deltas[facility_out]
+                best_in, best_out = facility_in, facility_out
+    return best_in, best_out, best_delta
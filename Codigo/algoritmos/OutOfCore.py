@@ -0,0 +1,292 @@
+import os
+import numpy as np
+from numba import njit, prange
+from algoritmos.Budget import resolve_budget, spend_capped, record
+from algoritmos.CandidateLists import no_candidates, two_nearest_open
+from algoritmos.IncrementalCost import solution_cost, drop_deltas, is_improvement
+from algoritmos.NeighborhoodScan import SCAN_CHUNK
+from algoritmos.Profile import count, count_moves, phase, EVALUATIONS, CONSTRUCTION_TIME, LOCAL_SEARCH_TIME
+
+"""
+Avaliação por blocos (out-of-core) para instâncias cuja matriz de custos não cabe em memória.
+
+A matriz de custos de alocação (clientes x instalações) fica num ficheiro .npy no disco (ver
+readFile.convert_to_disk) e é lida por blocos de clientes consecutivos (tiles) com um tamanho fixo em
+bytes, sempre pela mesma ordem, do início ao fim do ficheiro: a leitura é sequencial e a memória usada
+pela matriz nunca passa de um bloco. O estado de cada cliente (melhor e segunda melhor instalação
+aberta, ver IncrementalCost) fica todo em memória, O(C) em vez de O(C x F).
+
+    Greedy: uma única passagem, os clientes são afetados bloco a bloco como em greedy_core.
+    Switch: uma passagem por iteração. Em cada bloco é primeiro aplicado aos clientes o movimento
+    escolhido na iteração anterior e depois acumulada a variação do custo de abrir cada instalação
+    fechada; a variação de fechar uma instalação só depende do estado em memória (drop_deltas).
+
+As variações são acumuladas pela ordem dos clientes, como em open_delta e close_delta, por isso os dois
+algoritmos seguem exatamente o mesmo caminho que as versões em memória sem listas de candidatas.
+"""
+
+# Tamanho de cada bloco de clientes lido do disco, em bytes
+TILE_BYTES = 64 * 1024 ** 2
+
+def open_matrix(matrix_path):
+    """
+    Lê o cabeçalho de uma matriz guardada em .npy.
+
+    Parameters:
+    matrix_path (str): Ficheiro .npy com a matriz de custos de alocação (clientes x instalações, ordem C).
+
+    Returns:
+    tuple: Forma da matriz, tipo dos valores e posição do primeiro valor no ficheiro.
+    """
+    with open(matrix_path, 'rb') as file:
+        version = np.lib.format.read_magic(file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+        offset = file.tell()
+    if len(shape) != 2 or fortran_order or dtype not in (np.float64, np.float32):
+        raise ValueError(f"Matriz inválida: {matrix_path} (esperava uma matriz float64 ou float32 em ordem C, tem {shape} {dtype})")
+    return shape, dtype, offset
+
+def tile_rows_for(matrix_path, tile_bytes=TILE_BYTES):
+    """
+    Número de clientes por bloco para que cada bloco ocupe no máximo tile_bytes (pelo menos um cliente).
+    """
+    (num_clients, num_facilities), dtype, _ = open_matrix(matrix_path)
+    return max(1, min(num_clients, tile_bytes // (num_facilities * dtype.itemsize)))
+
+def iter_tiles(matrix_path, tile_rows):
+    """
+    Percorre a matriz por blocos de clientes consecutivos, do início ao fim do ficheiro.
+
+    O mesmo buffer é reutilizado em todos os blocos: cada bloco só é válido até ser pedido o seguinte.
+
+    Parameters:
+    matrix_path (str): Ficheiro .npy com a matriz de custos de alocação.
+    tile_rows (int): Número de clientes por bloco (ver tile_rows_for).
+
+    Returns:
+    generator: Pares (índice do primeiro cliente, bloco de custos com forma linhas x F).
+    """
+    (num_clients, num_facilities), dtype, offset = open_matrix(matrix_path)
+    buffer = np.empty((tile_rows, num_facilities), dtype=dtype)
+    with open(matrix_path, 'rb', buffering=0) as file:
+        if hasattr(os, 'posix_fadvise'):
+            # Leitura sequencial: o sistema pode ler antecipadamente os blocos seguintes
+            os.posix_fadvise(file.fileno(), offset, 0, os.POSIX_FADV_SEQUENTIAL)
+        file.seek(offset)
+        for start in range(0, num_clients, tile_rows):
+            rows = min(tile_rows, num_clients - start)
+            tile = buffer[:rows]
+            view = memoryview(tile).cast('B')
+            read = 0
+            while read < view.nbytes:
+                size = file.readinto(view[read:])
+                if not size:
+                    raise ValueError(f"Matriz inválida: {matrix_path} (o ficheiro acaba antes do cliente {start + rows})")
+                read += size
+            yield start, tile
+
+@njit(cache=True)
+def greedy_tile(tile, facility_costs, facilities_open, total_cost, profile=None):
+    """
+    Greedy por cliente (ver GreedyAlgorithm.greedy_core, procura completa) num bloco de clientes.
+
+    Parameters:
+    tile (np.array): Bloco de custos de alocação (clientes do bloco x instalações).
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    facilities_open (np.array): Instalações abertas pelos blocos anteriores (alterado no próprio array).
+    total_cost (float): Custo acumulado dos blocos anteriores.
+    profile (np.array): Perfil de execução (ver Profile; None: sem contadores).
+
+    Returns:
+    float: Custo acumulado depois deste bloco.
+    """
+    num_rows, num_facilities = tile.shape
+    for row in range(num_rows):
+        min_cost = np.inf
+        best_facility = -1
+        for facility in range(num_facilities):
+            cost_val = tile[row, facility]
+            if not facilities_open[facility]:
+                cost_val += facility_costs[facility]
+            if cost_val < min_cost:
+                min_cost = cost_val
+                best_facility = facility
+
+        opened = not facilities_open[best_facility]
+        if opened:
+            facilities_open[best_facility] = True
+            total_cost += facility_costs[best_facility]
+        count_moves(profile, num_facilities, opened)
+        total_cost += tile[row, best_facility]
+    return total_cost
+
+@njit(parallel=True, cache=True)
+def update_tile(tile, start, solution, flipped, best_fac, best_cost, second_fac, second_cost, candidates):
+    """
+    Aplica aos clientes de um bloco a troca de estado de uma instalação (solution já tem o novo estado).
+
+    Parameters:
+    tile (np.array): Bloco de custos de alocação (clientes start... x instalações).
+    start (int): Índice do primeiro cliente do bloco.
+    solution (np.array): Array booleano que indica se a instalação está aberta.
+    flipped (int): Instalação cujo estado foi trocado (-1: recalcula o estado de todos os clientes).
+    best_fac, best_cost, second_fac, second_cost (np.array): Estado incremental de todos os clientes.
+    candidates (np.array): Listas vazias com uma linha por cliente do bloco (procura completa).
+    """
+    for row in prange(tile.shape[0]):
+        client = start + row
+        if flipped >= 0 and solution[flipped]:
+            # Abertura: a nova instalação só pode passar a melhor ou a segunda melhor
+            cost_val = tile[row, flipped]
+            if cost_val < best_cost[client]:
+                second_fac[client] = best_fac[client]
+                second_cost[client] = best_cost[client]
+                best_fac[client] = flipped
+                best_cost[client] = cost_val
+            elif cost_val < second_cost[client]:
+                second_fac[client] = flipped
+                second_cost[client] = cost_val
+        elif flipped < 0 or best_fac[client] == flipped or second_fac[client] == flipped:
+            # Fecho (ou estado inicial): só os clientes afetados são percorridos de novo
+            b_fac, b_cost, s_fac, s_cost = two_nearest_open(row, solution, tile, candidates)
+            best_fac[client] = b_fac
+            best_cost[client] = b_cost
+            second_fac[client] = s_fac
+            second_cost[client] = s_cost
+
+@njit(parallel=True, cache=True)
+def accumulate_open_deltas(tile, start, solution, best_cost, open_deltas):
+    """
+    Soma a variação do custo de abrir cada instalação fechada, para os clientes de um bloco.
+
+    Cada thread trata um bloco de SCAN_CHUNK instalações e percorre os clientes por ordem, por isso
+    a soma de cada instalação é feita pela mesma ordem que em open_delta.
+
+    Parameters:
+    tile (np.array): Bloco de custos de alocação (clientes start... x instalações).
+    start (int): Índice do primeiro cliente do bloco.
+    solution (np.array): Array booleano que indica se a instalação está aberta.
+    best_cost (np.array): Custo de afetação de cada cliente à sua melhor instalação aberta.
+    open_deltas (np.array): Variações acumuladas (começam nos custos de abertura, alterado no próprio array).
+    """
+    num_rows, num_facilities = tile.shape
+    num_chunks = (num_facilities + SCAN_CHUNK - 1) // SCAN_CHUNK
+    for chunk in prange(num_chunks):
+        first = chunk * SCAN_CHUNK
+        last = min(first + SCAN_CHUNK, num_facilities)
+        for row in range(num_rows):
+            current = best_cost[start + row]
+            for facility in range(first, last):
+                if not solution[facility]:
+                    diff = tile[row, facility] - current
+                    if diff < 0.0:
+                        open_deltas[facility] += diff
+
+def greedy_tiled_uflp(matrix_path, facility_costs, tile_bytes=TILE_BYTES, profile=None):
+    """
+    Greedy por cliente com a matriz de custos lida do disco por blocos.
+
+    Parameters:
+    matrix_path (str): Ficheiro .npy com a matriz de custos de alocação (ver readFile.convert_to_disk).
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    tile_bytes (int): Memória máxima de cada bloco de clientes.
+    profile (np.array): Perfil de execução (ver Profile; None: sem contadores).
+
+    Returns:
+    tuple: Array booleano indicando quais instalações estão abertas e o custo total da solução.
+    """
+    facility_costs = np.array(facility_costs, dtype=np.float64)
+    facilities_open = np.zeros(len(facility_costs), dtype=np.bool_)
+    total_cost = 0.0
+    with phase(profile, CONSTRUCTION_TIME):
+        for _, tile in iter_tiles(matrix_path, tile_rows_for(matrix_path, tile_bytes)):
+            total_cost = greedy_tile(tile, facility_costs, facilities_open, total_cost, profile)
+    count(profile, EVALUATIONS, 1)
+    return facilities_open, total_cost
+
+def switch_tiled_local_search(matrix_path, facility_costs, initial_solution, budget, tile_rows, stop_cost=-np.inf, profile=None):
+    """
+    Local Search Switch com a matriz de custos lida do disco, uma passagem sequencial por iteração.
+
+    Parameters:
+    matrix_path (str): Ficheiro .npy com a matriz de custos de alocação.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    initial_solution (np.array): Solução inicial.
+    budget (np.array): Orçamento de tempo/avaliações e traço de convergência (ver Budget).
+    tile_rows (int): Número de clientes por bloco (ver tile_rows_for).
+    stop_cost (float): Pára assim que o custo atual for menor ou igual a este valor.
+    profile (np.array): Perfil de execução (ver Profile; None: sem contadores).
+
+    Returns:
+    tuple: Melhor solução encontrada e o custo associado.
+    """
+    (num_clients, num_facilities), _, _ = open_matrix(matrix_path)
+    current_solution = initial_solution.copy()
+    # Estado incremental de todos os clientes, sempre em memória
+    best_fac = np.empty(num_clients, dtype=np.int64)
+    best_cost = np.empty(num_clients, dtype=np.float64)
+    second_fac = np.empty(num_clients, dtype=np.int64)
+    second_cost = np.empty(num_clients, dtype=np.float64)
+    candidates = no_candidates(tile_rows)
+    flipped = -1 # Na primeira passagem o estado de todos os clientes é calculado
+
+    while True:
+        # Uma passagem pelo ficheiro: aplica o último movimento e acumula as variações das aberturas
+        open_deltas = facility_costs.copy()
+        for start, tile in iter_tiles(matrix_path, tile_rows):
+            update_tile(tile, start, current_solution, flipped, best_fac, best_cost, second_fac, second_cost, candidates[:tile.shape[0]])
+            accumulate_open_deltas(tile, start, current_solution, best_cost, open_deltas)
+        current_cost = solution_cost(current_solution, facility_costs, best_cost)
+        count(profile, EVALUATIONS, 1)
+        record(budget, current_cost)
+
+        # Pára quando o gap pretendido é atingido ou o orçamento se esgota (cada iteração avalia F vizinhos)
+        if current_cost <= stop_cost:
+            break
+        allowed = spend_capped(budget, num_facilities)
+        if allowed == 0:
+            break
+        count_moves(profile, allowed, 0)
+
+        # Melhor vizinho: fechos a partir do estado em memória, aberturas da passagem (empates: índice mais baixo);
+        # na última iteração do limite de avaliações, só entre as primeiras allowed instalações
+        deltas = np.where(current_solution, drop_deltas(current_solution, facility_costs, best_fac, best_cost, second_cost), open_deltas)
+        deltas = deltas[:allowed]
+        best_facility = int(np.argmin(deltas))
+        if not is_improvement(deltas[best_facility], current_cost):
+            break
+
+        # O movimento é aplicado aos clientes na passagem seguinte
+        current_solution[best_facility] = not current_solution[best_facility]
+        flipped = best_facility
+        count_moves(profile, 0, 1)
+
+    return current_solution, current_cost
+
+def switch_tiled_uflp(matrix_path, facility_costs, initial=None, tile_bytes=TILE_BYTES, stop_cost=-np.inf,
+                      time_limit=None, max_evaluations=None, budget=None, profile=None):
+    """
+    Switch com a matriz de custos lida do disco por blocos, a começar pelo greedy (também por blocos).
+
+    Parameters:
+    matrix_path (str): Ficheiro .npy com a matriz de custos de alocação (ver readFile.convert_to_disk).
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    initial (np.array): Solução inicial (None: greedy_tiled_uflp).
+    tile_bytes (int): Memória máxima de cada bloco de clientes.
+    stop_cost (float): Pára assim que o custo atual for menor ou igual a este valor.
+    time_limit, max_evaluations, budget: Orçamento da pesquisa (ver Budget.resolve_budget).
+    profile (np.array): Perfil de execução (ver Profile; None: sem contadores).
+
+    Returns:
+    tuple: Melhor solução encontrada e o custo associado.
+    """
+    facility_costs = np.array(facility_costs, dtype=np.float64)
+    budget = resolve_budget(budget, time_limit, max_evaluations)
+    if initial is None:
+        initial, _ = greedy_tiled_uflp(matrix_path, facility_costs, tile_bytes, profile)
+    with phase(profile, LOCAL_SEARCH_TIME):
+        return switch_tiled_local_search(matrix_path, facility_costs, np.asarray(initial, dtype=np.bool_), budget,
+                                         tile_rows_for(matrix_path, tile_bytes), stop_cost, profile)
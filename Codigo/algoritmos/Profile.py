@@ -0,0 +1,87 @@
+import os
+import time
+from contextlib import contextmanager
+import numpy as np
+from numba import njit
+
+"""
+Perfil de execução dos algoritmos (opcional): contadores dentro dos kernels e tempo de cada fase.
+
+O perfil é um array float64 com uma posição por contador (PROFILE_FIELDS), passado aos kernels e alterado
+no próprio array, tal como o orçamento (ver Budget):
+    evaluations: custos de soluções completas calculados (custo inicial, depois de cada movimento, filtro exato do FF);
+    moves_tried: movimentos cuja variação do custo foi calculada (vizinhos, aberturas e fechos do ADD/DROP);
+    moves_accepted: movimentos aplicados;
+    construction_time, local_search_time, perturbation_time: segundos em cada fase.
+
+Sem perfil os kernels recebem None. O Numba compila uma versão à parte para esse tipo, em que os ramos
+"if profile is not None" são eliminados, por isso os contadores desativados não custam nada nos ciclos.
+Os contadores são atualizados uma vez por iteração (nunca dentro dos ciclos paralelos sobre a vizinhança).
+
+O perfil é ativado com a variável de ambiente UFLP_PROFILE=1 (ou com --profile no runBenchmarks).
+"""
+
+# Variável de ambiente que ativa o perfil por omissão
+PROFILE_ENV = 'UFLP_PROFILE'
+PROFILING = os.environ.get(PROFILE_ENV, '') not in ('', '0')
+
+# Contadores do perfil, pela ordem das posições no array
+PROFILE_FIELDS = ('evaluations', 'moves_tried', 'moves_accepted', 'construction_time', 'local_search_time',
+                  'perturbation_time')
+EVALUATIONS = 0
+MOVES_TRIED = 1
+MOVES_ACCEPTED = 2
+CONSTRUCTION_TIME = 3
+LOCAL_SEARCH_TIME = 4
+PERTURBATION_TIME = 5
+
+def new_profile(enabled=None):
+    """
+    Cria um perfil vazio.
+
+    Parameters:
+    enabled (bool): Se False devolve None (perfil desativado); None usa a variável de ambiente UFLP_PROFILE.
+
+    Returns:
+    np.array: Perfil (um contador por posição, ver PROFILE_FIELDS) ou None.
+    """
+    if not (PROFILING if enabled is None else enabled):
+        return None
+    return np.zeros(len(PROFILE_FIELDS), dtype=np.float64)
+
+@njit(cache=True)
+def count(profile, counter, amount=1):
+    """
+    Soma amount a um contador do perfil (nada, se o perfil for None).
+    """
+    if profile is not None:
+        profile[counter] += amount
+
+@njit(cache=True)
+def count_moves(profile, tried, accepted):
+    """
+    Regista os movimentos avaliados e aplicados numa iteração.
+    """
+    if profile is not None:
+        profile[MOVES_TRIED] += tried
+        profile[MOVES_ACCEPTED] += accepted
+
+@contextmanager
+def phase(profile, counter):
+    """
+    Soma ao contador (CONSTRUCTION_TIME, LOCAL_SEARCH_TIME ou PERTURBATION_TIME) o tempo do bloco with.
+    """
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile[counter] += time.perf_counter() - start
+
+def profile_summary(profile):
+    """
+    Perfil como dicionário (contador -> valor), com as contagens inteiras e os tempos em segundos.
+    """
+    return {field: float(value) if field.endswith('_time') else int(value) for field, value in zip(PROFILE_FIELDS, profile)}
@@ -0,0 +1,48 @@
+import numpy as np
+from numba import njit
+
+"""
+Gerador de números aleatórios explícito (SplitMix64), para algoritmos que guardam checkpoints.
+
+O gerador do Numba (np.random dentro de código compilado) tem um estado global que não pode ser lido nem
+reposto a partir do Python. Aqui o estado é um array com um único uint64, passado aos kernels e alterado
+no próprio array, por isso pode ser guardado num checkpoint (ver Checkpoint) e a pesquisa continua com
+exatamente a mesma sequência de números.
+"""
+
+# Constantes do SplitMix64 (globais do módulo, congeladas pelo Numba como uint64)
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+def new_rng(seed=None):
+    """
+    Cria o estado do gerador.
+
+    Parameters:
+    seed (int): Seed (None: tirada do np.random, que o runner inicializa com a seed do job).
+
+    Returns:
+    np.array: Estado do gerador (um uint64).
+    """
+    if seed is None:
+        seed = np.random.randint(0, np.iinfo(np.int64).max, dtype=np.int64)
+    return np.array([seed], dtype=np.uint64)
+
+@njit(cache=True)
+def next_random(rng):
+    """
+    Próximo número aleatório de 64 bits (avança o estado).
+    """
+    rng[0] += _GOLDEN_GAMMA
+    z = rng[0]
+    z = (z ^ (z >> np.uint64(30))) * _MIX_1
+    z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    return z ^ (z >> np.uint64(31))
+
+@njit(cache=True)
+def random_index(rng, high):
+    """
+    Inteiro aleatório entre 0 e high - 1.
+    """
+    return np.int64(next_random(rng) % np.uint64(high))
@@ -0,0 +1,212 @@
+import numpy as np
+from numba import njit
+from algoritmos.Budget import no_budget, exhausted
+from algoritmos.CandidateLists import resolve_candidates, no_candidates
+from algoritmos.CostEvaluation import calculate_cost
+from algoritmos.GreedyAlgorithm import greedy_add_core
+from algoritmos.LowerBound import lagrangian_multipliers, all_free, FACILITY_FREE, FACILITY_OPEN, FACILITY_CLOSED
+from algoritmos.SwapLocalSeach import swap_heuristic_local_search
+
+"""
+Redução do problema antes das heurísticas: fixa instalações que estão abertas (ou fechadas) em pelo menos
+uma solução ótima e elimina as colunas das fechadas da matriz de custos de alocação.
+
+    Fixação por custos reduzidos: com os multiplicadores Lagrangianos (ver LowerBound), obrigar uma instalação
+    a mudar de estado aumenta o limite inferior; se o ultrapassar o custo de uma solução conhecida, o estado
+    fica fixo.
+    Dominância (regras de Khumawala): uma instalação cuja poupança máxima face às instalações já abertas não
+    paga o custo fixo fica fechada; uma instalação que poupa mais do que o custo fixo mesmo com todas as
+    outras abertas fica aberta.
+
+No problema reduzido as instalações fixas abertas têm custo fixo 0 (o seu custo fixo passa para uma constante)
+e as soluções são convertidas de volta para os índices originais com expand_solution.
+"""
+
+@njit(cache=True)
+def reduced_cost_fixing(cost_matrix, facility_costs, multipliers, upper_bound, status):
+    """
+    Fixação por custos reduzidos a partir dos multiplicadores Lagrangianos.
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    multipliers (np.array): Multiplicadores Lagrangianos (um por cliente).
+    upper_bound (float): Custo de uma solução conhecida.
+    status (np.array): Estado de cada instalação (alterado no próprio array).
+
+    Returns:
+    int: Número de instalações fixadas.
+    """
+    num_clients, num_facilities = cost_matrix.shape
+    reduced = np.empty(num_facilities, dtype=np.float64)
+    for facility in range(num_facilities):
+        reduced[facility] = facility_costs[facility]
+    base = 0.0
+    for client in range(num_clients):
+        base += multipliers[client]
+        for facility in range(num_facilities):
+            diff = cost_matrix[client, facility] - multipliers[client]
+            if diff < 0.0:
+                reduced[facility] += diff
+
+    # Limite Lagrangiano respeitando os estados já fixados
+    for facility in range(num_facilities):
+        if status[facility] == FACILITY_OPEN:
+            base += reduced[facility]
+        elif status[facility] == FACILITY_FREE:
+            base += min(0.0, reduced[facility])
+
+    tolerance = 1e-9 * max(1.0, abs(upper_bound))
+    fixed = 0
+    for facility in range(num_facilities):
+        if status[facility] != FACILITY_FREE:
+            continue
+        # Limite com a instalação no estado contrário ao da solução do subproblema
+        if base + abs(reduced[facility]) > upper_bound + tolerance:
+            status[facility] = FACILITY_CLOSED if reduced[facility] >= 0.0 else FACILITY_OPEN
+            fixed += 1
+    return fixed
+
+@njit(cache=True)
+def dominance_fixing(cost_matrix, facility_costs, status, max_rounds=100, budget=None):
+    """
+    Regras de dominância de Khumawala, aplicadas até nenhuma instalação mudar de estado.
+
+    Em cada ronda, a melhor instalação aberta e as duas melhores não fechadas de cada cliente são
+    calculadas uma vez; as instalações fixadas durante a ronda só tornam estes valores mais conservadores.
+    Com budget (ver Budget), pára no início de uma ronda quando o orçamento se esgota (as fixações já feitas são válidas).
+
+    Returns:
+    int: Número de instalações fixadas.
+    """
+    num_clients, num_facilities = cost_matrix.shape
+    open_best = np.empty(num_clients, dtype=np.float64)
+    best_fac = np.empty(num_clients, dtype=np.int64)
+    best = np.empty(num_clients, dtype=np.float64)
+    second = np.empty(num_clients, dtype=np.float64)
+    fixed = 0
+
+    for _ in range(max_rounds):
+        if budget is not None and exhausted(budget):
+            break
+        any_open = False
+        for facility in range(num_facilities):
+            if status[facility] == FACILITY_OPEN:
+                any_open = True
+        for client in range(num_clients):
+            open_best[client] = np.inf
+            best_fac[client] = -1
+            best[client] = np.inf
+            second[client] = np.inf
+            for facility in range(num_facilities):
+                if status[facility] == FACILITY_CLOSED:
+                    continue
+                cost_val = cost_matrix[client, facility]
+                if status[facility] == FACILITY_OPEN and cost_val < open_best[client]:
+                    open_best[client] = cost_val
+                if cost_val < best[client]:
+                    second[client] = best[client]
+                    best[client] = cost_val
+                    best_fac[client] = facility
+                elif cost_val < second[client]:
+                    second[client] = cost_val
+
+        changed = False
+        for facility in range(num_facilities):
+            if status[facility] != FACILITY_FREE:
+                continue
+            close_saving = 0.0 # Poupança máxima de abrir a instalação, face às já abertas
+            open_saving = 0.0 # Poupança mínima, com todas as outras não fechadas abertas
+            for client in range(num_clients):
+                cost_val = cost_matrix[client, facility]
+                if cost_val < open_best[client]:
+                    close_saving += open_best[client] - cost_val
+                other = second[client] if best_fac[client] == facility else best[client]
+                if cost_val < other:
+                    open_saving += other - cost_val
+
+            if any_open and close_saving <= facility_costs[facility]:
+                status[facility] = FACILITY_CLOSED
+                fixed += 1
+                changed = True
+            elif open_saving > facility_costs[facility]:
+                status[facility] = FACILITY_OPEN
+                fixed += 1
+                changed = True
+        if not changed:
+            break
+    return fixed
+
+def reduce_instance(cost_matrix, facility_costs, upper_bound=None, candidates=None):
+    """
+    Calcula o estado de cada instalação (livre, aberta ou fechada) com as duas técnicas de redução.
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    upper_bound (float): Custo de uma solução conhecida (por omissão, o do ADD/DROP seguido do swap).
+    candidates (np.array): Listas de candidatas de cada cliente (None: procura completa).
+
+    Returns:
+    np.array: Estado de cada instalação (FACILITY_FREE, FACILITY_OPEN ou FACILITY_CLOSED, ver LowerBound).
+    """
+    facility_costs = np.array(facility_costs, dtype=np.float64)
+    candidates = resolve_candidates(cost_matrix, candidates)
+    if upper_bound is None:
+        start = greedy_add_core(cost_matrix, facility_costs, True, candidates)[0]
+        upper_bound = swap_heuristic_local_search(cost_matrix, facility_costs, start, candidates, no_budget())[1]
+
+    status = all_free(len(facility_costs))
+    bound, multipliers = lagrangian_multipliers(cost_matrix, facility_costs, upper_bound)
+    reduced_cost_fixing(cost_matrix, facility_costs, multipliers, upper_bound, status)
+    if dominance_fixing(cost_matrix, facility_costs, status) > 0:
+        # As instalações fixadas pela dominância tornam o limite Lagrangiano mais forte
+        reduced_cost_fixing(cost_matrix, facility_costs, multipliers, upper_bound, status)
+    return status
+
+def reduced_problem(cost_matrix, facility_costs, status):
+    """
+    Constrói o problema reduzido: só as colunas das instalações não fechadas, com custo fixo 0 nas fixas abertas.
+
+    Returns:
+    tuple: Índices originais das colunas mantidas, matriz reduzida, custos fixos reduzidos e a constante
+           (soma dos custos fixos das instalações fixas abertas) a somar ao custo do problema reduzido.
+    """
+    facility_costs = np.asarray(facility_costs, dtype=np.float64)
+    kept = np.flatnonzero(status != FACILITY_CLOSED)
+    forced = status[kept] == FACILITY_OPEN
+    reduced_costs = np.where(forced, 0.0, facility_costs[kept])
+    offset = float(facility_costs[kept][forced].sum())
+    reduced_matrix = np.ascontiguousarray(cost_matrix[:, kept])
+    return kept, reduced_matrix, reduced_costs, offset
+
+def expand_solution(reduced_solution, kept, status):
+    """
+    Converte uma solução do problema reduzido para os índices originais (com as instalações fixas abertas).
+    """
+    solution = status == FACILITY_OPEN
+    solution[kept] |= np.asarray(reduced_solution, dtype=np.bool_)
+    return solution
+
+def solve_reduced(solver, cost_matrix, facility_costs, reduction, **params):
+    """
+    Executa um algoritmo no problema reduzido e devolve a solução e o custo no problema original.
+
+    Parameters:
+    solver (function): Algoritmo (cost_matrix, facility_costs, **params) -> (solução, custo).
+    cost_matrix (np.array): Matriz de custos original.
+    facility_costs (np.array): Custos fixos originais.
+    reduction (tuple): Estado das instalações seguido do resultado de reduced_problem.
+    params: Parâmetros do algoritmo (candidates, se existir, tem de corresponder à matriz reduzida).
+
+    Returns:
+    tuple: Solução (índices originais) e o custo associado.
+    """
+    status, kept, reduced_matrix, reduced_costs, offset = reduction
+    if params.get('bound') is not None:
+        # O limite inferior do problema original também desce a constante das instalações fixas abertas
+        params['bound'] -= offset
+    reduced_solution, reduced_cost = solver(reduced_matrix, reduced_costs, **params)
+    solution = expand_solution(reduced_solution, kept, status)
+    facility_costs = np.asarray(facility_costs, dtype=np.float64)
+    return solution, calculate_cost(solution, cost_matrix, facility_costs, no_candidates(cost_matrix.shape[0]))
@@ -1,91 +1,110 @@
 import numpy as np
 from numba import njit
-from algoritmos.GreedyAlgorithm import greedy_uflp
-
-@njit
-def calculate_cost(solution, cost_matrix, facility_costs):
-    """
-    Calcula o custo total da solução atual.
-
-    Parameters:
-    solution (np.array): Array booleano que indica se a instalação está aberta.
-    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
-    facility_costs (np.array): Array de custos de abertura das instalações.
-
-    Returns:
-    float: Custo total da solução.
+from algoritmos.Budget import resolve_budget, spend_capped, record
+from algoritmos.Checkpoint import load_checkpoint, save_checkpoint, run_with_checkpoints, CHECKPOINT_INTERVAL
+from algoritmos.CandidateLists import resolve_candidates
+from algoritmos.GreedyAlgorithm import build_initial_solution
+from algoritmos.LowerBound import stop_cost_for
+from algoritmos.IncrementalCost import init_assignment, solution_cost, apply_open, apply_close, is_improvement
+from algoritmos.NeighborhoodScan import best_interchange_move, partial_interchange_move
+from algoritmos.Profile import count, count_moves, phase, EVALUATIONS, LOCAL_SEARCH_TIME
+
+@njit(cache=True)
+def swap_heuristic_local_search(cost_matrix, facility_costs, initial_solution, candidates, budget, parallel=True, stop_cost=-np.inf, profile=None):
     """
+    Local Search Swap (interchange): fecha uma instalação aberta e abre uma fechada.
 
-    num_clients, num_facilities = cost_matrix.shape
-    cost = 0.0
-    # Calcula o custo de transporte
-    for client in range(num_clients):
-        min_cost = np.inf
-        for facility in range(num_facilities):
-            # Se a instalação estiver aberta
-            if solution[facility]:
-                cost_val = cost_matrix[client, facility]
-                if cost_val < min_cost:
-                    min_cost = cost_val
-        cost += min_cost
-
-    # Adiciona o custo de abertura das instalações
-    cost += np.sum(solution * facility_costs)
-    return cost
-
-@njit
-def swap_heuristic_local_search(cost_matrix, facility_costs, initial_solution):
-    """
-    Local Search Swap.
+    Os ganhos de todas as trocas (g entra, h sai) para uma instalação g são calculados de uma vez
+    com o fast interchange de Whitaker (ver IncrementalCost.interchange_deltas), por isso uma
+    passagem completa custa O(F * (C + F)) em vez de reavaliar cada par. Tal como nas
+    implementações habituais do fast interchange, abrir ou fechar uma só instalação também é
+    considerado (troca com uma instalação "vazia"), para que o número de instalações abertas possa mudar.
 
     Parameters:
     cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
     facility_costs (np.array): Array de custos de abertura das instalações.
-    initial_solution (np.array): Solução inicial fornecida pelo greedy algorithm.
+    initial_solution (np.array): Solução inicial fornecida pelo greedy algorithm (com pelo menos uma instalação aberta).
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+    budget (np.array): Orçamento de tempo/avaliações e traço de convergência (ver Budget; no_budget() para nenhum).
+    parallel (bool): Avalia a vizinhança em paralelo (o resultado é igual ao da versão em série).
+    stop_cost (float): Pára assim que o custo atual for menor ou igual a este valor (ver LowerBound.stop_cost_for).
+    profile (np.array): Perfil de execução (ver Profile; None: sem contadores).
 
     Returns:
     tuple: Melhor solução encontrada e o custo associado.
     """
 
-    num_clients, num_facilities = cost_matrix.shape
+    num_facilities = cost_matrix.shape[1]
     current_solution = initial_solution.copy()
-    current_cost = calculate_cost(current_solution, cost_matrix, facility_costs) # Calcula o custo inicial
+    # Estado incremental: melhor e segunda melhor instalação aberta de cada cliente
+    best_fac, best_cost, second_fac, second_cost = init_assignment(current_solution, cost_matrix, candidates)
+    current_cost = solution_cost(current_solution, facility_costs, best_cost) # Calcula o custo inicial
+    count(profile, EVALUATIONS, 1)
+    record(budget, current_cost)
     improved = True
 
-    while improved:
+    # Pára também quando o gap certificado pretendido é atingido
+    while improved and current_cost > stop_cost:
         improved = False
-        best_neighbor = current_solution.copy() # Inicializa o melhor vizinho como a solução atual
-        best_cost = current_cost
-
-        # Tenta trocar o estado de cada par de instalações
-        for facility1 in range(num_facilities):
-            for facility2 in range(facility1 + 1, num_facilities):
-                neighbor = current_solution.copy()
-                neighbor[facility1] = not neighbor[facility1]  # Mudar o estado da instalação 1
-                neighbor[facility2] = not neighbor[facility2]  # Mudar o estado da instalação 2
-                neighbor_cost = calculate_cost(neighbor, cost_matrix, facility_costs)  # Calcula o custo do vizinho
-
-                # Verifica se a nova solução é melhor
-                if neighbor_cost < best_cost:
-                    best_cost = neighbor_cost
-                    best_neighbor = neighbor.copy()
-                    improved = True
-        
-        if improved:
-            current_solution = best_neighbor.copy() # Atualiza a solução atual para a melhor solução encontrada
-            current_cost = best_cost
+        # Orçamento esgotado: devolve a solução atual (cada passagem avalia todas as trocas, aberturas e fechos)
+        num_open = 0
+        for facility in range(num_facilities):
+            num_open += current_solution[facility]
+        neighbors = (num_facilities - num_open) * (num_open + 1) + num_open
+        allowed = spend_capped(budget, neighbors)
+        if allowed == 0:
+            break
+        count_moves(profile, allowed, 0)
+
+        # Melhor troca (instalação a abrir, instalação a fechar); -1 significa "nenhuma"
+        if allowed == neighbors:
+            facility_in, facility_out, best_delta = best_interchange_move(current_solution, cost_matrix, facility_costs,
+                                                                          best_fac, best_cost, second_cost, parallel)
+        else:
+            # Última passagem: só os vizinhos que ainda cabem no limite de avaliações
+            facility_in, facility_out, best_delta = partial_interchange_move(current_solution, cost_matrix, facility_costs,
+                                                                             best_fac, best_cost, second_cost, allowed)
+
+        if (facility_in >= 0 or facility_out >= 0) and is_improvement(best_delta, current_cost):
+            # Aplica o movimento (abrir primeiro, para que os clientes da instalação fechada já a vejam)
+            if facility_in >= 0:
+                apply_open(facility_in, current_solution, cost_matrix, best_fac, best_cost, second_fac, second_cost)
+            if facility_out >= 0:
+                apply_close(facility_out, current_solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates)
+            current_cost = solution_cost(current_solution, facility_costs, best_cost)
+            count_moves(profile, 0, 1)
+            count(profile, EVALUATIONS, 1)
+            record(budget, current_cost)
+            improved = True
 
     return current_solution, current_cost
 
-def swap_heuristic_uflp(cost_matrix, facility_costs):
+def swap_heuristic_uflp(cost_matrix, facility_costs, parallel=True, initial='greedy', candidates=None, target_gap=None, bound=None,
+                        time_limit=None, max_evaluations=None, budget=None, profile=None,
+                        checkpoint=None, checkpoint_interval=CHECKPOINT_INTERVAL):
     # converter facility_costs para um array em numpy
     facility_costs = np.array(facility_costs, dtype=np.float64)
+    # Listas de candidatas por cliente (None: procura completa)
+    candidates = resolve_candidates(cost_matrix, candidates)
+    # Custo a partir do qual a solução está a target_gap % do limite inferior (None: nunca parar mais cedo)
+    stop_cost = stop_cost_for(cost_matrix, facility_costs, target_gap, bound)
+    # Orçamento de tempo/avaliações, a contar já com a construção da solução inicial
+    budget = resolve_budget(budget, time_limit, max_evaluations)
     
-    # Comçar com uma solução inicial do algoritmo de greedy
-    facilities_open, initial_cost = greedy_uflp(cost_matrix, facility_costs)
-    initial_solution = np.array(facilities_open, dtype=np.bool_)
-
-    # Começar o Swap local Search
-    best_solution, best_cost = swap_heuristic_local_search(cost_matrix, facility_costs, initial_solution)
+    # Comçar com uma solução inicial do algoritmo de greedy (ou do ADD, ver GreedyAlgorithm.build_initial_solution)
+    # Com checkpoint (ver Checkpoint), uma pesquisa interrompida continua da última solução guardada
+    state = load_checkpoint(checkpoint, 'swap', len(facility_costs), budget)
+    if state is None:
+        start = build_initial_solution(cost_matrix, facility_costs, initial, candidates, profile)
+    else:
+        start = state['best_solution']
+
+    # Começar o Swap local Search (com os contadores e o tempo no perfil, se existir)
+    with phase(profile, LOCAL_SEARCH_TIME):
+        # Cada chamada continua da solução em que a anterior parou (o estado da descida é só a solução atual)
+        step = lambda previous: swap_heuristic_local_search(cost_matrix, facility_costs, start if previous is None else previous[0],
+                                                            candidates, budget, parallel, stop_cost, profile)
+        save = lambda result: save_checkpoint(checkpoint, 'swap', budget, best_solution=result[0])
+        best_solution, best_cost = run_with_checkpoints(step, save, budget, checkpoint, checkpoint_interval)
 
     return best_solution, best_cost
\ No newline at end of file
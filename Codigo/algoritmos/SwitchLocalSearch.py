@@ -1,38 +1,16 @@
 import numpy as np
 from numba import njit
-from algoritmos.GreedyAlgorithm import greedy_uflp
+from algoritmos.Budget import resolve_budget, spend_capped, record
+from algoritmos.Checkpoint import load_checkpoint, save_checkpoint, run_with_checkpoints, CHECKPOINT_INTERVAL
+from algoritmos.CandidateLists import resolve_candidates
+from algoritmos.GreedyAlgorithm import build_initial_solution
+from algoritmos.LowerBound import stop_cost_for
+from algoritmos.IncrementalCost import init_assignment, solution_cost, apply_flip, is_improvement
+from algoritmos.NeighborhoodScan import best_flip_move, partial_flip_move
+from algoritmos.Profile import count, count_moves, phase, EVALUATIONS, LOCAL_SEARCH_TIME
 
-@njit
-def calculate_cost(solution, cost_matrix, facility_costs):
-    """
-    Calcula o custo total da solução atual.
-
-    Parameters:
-    solution (np.array): Array booleano que indica se a instalação está aberta.
-    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
-    facility_costs (np.array): Array de custos de abertura das instalações.
-
-    Returns:
-    float: Custo total da solução.
-    """
-    num_clients, num_facilities = cost_matrix.shape
-    cost = 0.0
-    # Calcula o custo de transporte 
-    for client in range(num_clients):
-        min_cost = np.inf
-        for facility in range(num_facilities):
-            if solution[facility]: # Verifica se a instalação está aberta
-                cost_val = cost_matrix[client, facility]
-                if cost_val < min_cost:
-                    min_cost = cost_val
-        cost += min_cost
-
-    # Adiciona o custo de abertura das instalações
-    cost += np.sum(solution * facility_costs)
-    return cost
-
-@njit
-def switch_heuristic_local_search(cost_matrix, facility_costs, initial_solution):
+@njit(cache=True)
+def switch_heuristic_local_search(cost_matrix, facility_costs, initial_solution, candidates, budget, parallel=True, stop_cost=-np.inf, profile=None):
     """
     Local Search Switch.
 
@@ -40,46 +18,80 @@ def switch_heuristic_local_search(cost_matrix, facility_costs, initial_solution)
     cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
     facility_costs (np.array): Array de custos de abertura das instalações.
     initial_solution (np.array): Solução inicial fornecida pelo algoritmo de greedy.
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+    budget (np.array): Orçamento de tempo/avaliações e traço de convergência (ver Budget; no_budget() para nenhum).
+    parallel (bool): Avalia a vizinhança em paralelo (o resultado é igual ao da versão em série).
+    stop_cost (float): Pára assim que o custo atual for menor ou igual a este valor (ver LowerBound.stop_cost_for).
+    profile (np.array): Perfil de execução (ver Profile; None: sem contadores).
 
     Returns:
     tuple: Melhor solução encontrada e o custo associado.
     """
-    num_clients, num_facilities = cost_matrix.shape
+    num_facilities = cost_matrix.shape[1]
     current_solution = initial_solution.copy() # Copia a solução inicial
-    current_cost = calculate_cost(current_solution, cost_matrix, facility_costs) # Calcula o custo inicial
+    # Estado incremental: melhor e segunda melhor instalação aberta de cada cliente
+    best_fac, best_cost, second_fac, second_cost = init_assignment(current_solution, cost_matrix, candidates)
+    current_cost = solution_cost(current_solution, facility_costs, best_cost) # Calcula o custo inicial
+    no_tabu = np.zeros(num_facilities, dtype=np.int64) # O switch não tem memória tabu
+    count(profile, EVALUATIONS, 1)
+    record(budget, current_cost)
     improved = True
 
-    while improved:
+    # Pára também quando o gap certificado pretendido é atingido
+    while improved and current_cost > stop_cost:
         improved = False
-        best_neighbor = current_solution.copy() # Inicializa o melhor vizinho como a solução atual
-        best_cost = current_cost
+        # Orçamento esgotado: devolve a solução atual (cada iteração avalia F vizinhos)
+        allowed = spend_capped(budget, num_facilities)
+        if allowed == 0:
+            break
+        count_moves(profile, allowed, 0)
 
-        for facility in range(num_facilities):
-            neighbor = current_solution.copy()
-            neighbor[facility] = not neighbor[facility] # Troca o estado da instalação
-            neighbor_cost = calculate_cost(neighbor, cost_matrix, facility_costs) # Calcula o custo do vizinho
+        # Melhor vizinho (instalação cujo estado é trocado), com a variação do custo de cada troca em O(C)
+        if allowed == num_facilities:
+            best_facility, best_delta = best_flip_move(current_solution, cost_matrix, facility_costs, best_fac, best_cost,
+                                                       second_cost, no_tabu, 0, current_cost, current_cost, parallel)
+        else:
+            # Última iteração: só os vizinhos que ainda cabem no limite de avaliações
+            best_facility, best_delta = partial_flip_move(current_solution, cost_matrix, facility_costs, best_fac, best_cost,
+                                                          second_cost, no_tabu, 0, current_cost, current_cost, allowed)
 
-            # Verifica se a nova solução é melhor
-            if neighbor_cost < best_cost:
-                best_cost = neighbor_cost
-                best_neighbor = neighbor.copy() 
-                improved = True
-        
-        if improved:
-            current_solution = best_neighbor.copy() # Atualiza a solução atual para a melhor solução encontrada
-            current_cost = best_cost
+        if best_facility >= 0 and is_improvement(best_delta, current_cost):
+            # Aplica o movimento e atualiza o estado incremental
+            apply_flip(best_facility, current_solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates)
+            current_cost = solution_cost(current_solution, facility_costs, best_cost)
+            count_moves(profile, 0, 1)
+            count(profile, EVALUATIONS, 1)
+            record(budget, current_cost)
+            improved = True
 
     return current_solution, current_cost
 
-def switch_heuristic_uflp(cost_matrix, facility_costs):
+def switch_heuristic_uflp(cost_matrix, facility_costs, parallel=True, initial='greedy', candidates=None, target_gap=None, bound=None,
+                          time_limit=None, max_evaluations=None, budget=None, profile=None,
+                          checkpoint=None, checkpoint_interval=CHECKPOINT_INTERVAL):
     # Converter facility_costs para um array em numpy
     facility_costs = np.array(facility_costs, dtype=np.float64)
+    # Listas de candidatas por cliente (None: procura completa)
+    candidates = resolve_candidates(cost_matrix, candidates)
+    # Custo a partir do qual a solução está a target_gap % do limite inferior (None: nunca parar mais cedo)
+    stop_cost = stop_cost_for(cost_matrix, facility_costs, target_gap, bound)
+    # Orçamento de tempo/avaliações, a contar já com a construção da solução inicial
+    budget = resolve_budget(budget, time_limit, max_evaluations)
     
-    # Comçar com uma solução inicial do algoritmo de greedy
-    facilities_open, initial_cost = greedy_uflp(cost_matrix, facility_costs)
-    initial_solution = np.array(facilities_open, dtype=np.bool_)
+    # Comçar com uma solução inicial do algoritmo de greedy (ou do ADD, ver GreedyAlgorithm.build_initial_solution)
+    # Com checkpoint (ver Checkpoint), uma pesquisa interrompida continua da última solução guardada
+    state = load_checkpoint(checkpoint, 'switch', len(facility_costs), budget)
+    if state is None:
+        start = build_initial_solution(cost_matrix, facility_costs, initial, candidates, profile)
+    else:
+        start = state['best_solution']
 
-    # Iniciar a pesquisa local Switch
-    best_solution, best_cost = switch_heuristic_local_search(cost_matrix, facility_costs, initial_solution)
+    # Iniciar a pesquisa local Switch (com os contadores e o tempo no perfil, se existir)
+    with phase(profile, LOCAL_SEARCH_TIME):
+        # Cada chamada continua da solução em que a anterior parou (o estado da descida é só a solução atual)
+        step = lambda previous: switch_heuristic_local_search(cost_matrix, facility_costs, start if previous is None else previous[0],
+                                                              candidates, budget, parallel, stop_cost, profile)
+        save = lambda result: save_checkpoint(checkpoint, 'switch', budget, best_solution=result[0])
+        best_solution, best_cost = run_with_checkpoints(step, save, budget, checkpoint, checkpoint_interval)
 
     return best_solution, best_cost
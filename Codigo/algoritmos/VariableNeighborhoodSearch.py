@@ -0,0 +1,320 @@
+import numpy as np
+from numba import njit
+from algoritmos.Budget import resolve_budget, spend_capped, exhausted, record, now
+from algoritmos.Checkpoint import load_checkpoint, save_checkpoint, run_with_checkpoints, CHECKPOINT_INTERVAL
+from algoritmos.RandomState import new_rng, random_index
+from algoritmos.CandidateLists import resolve_candidates
+from algoritmos.GreedyAlgorithm import build_initial_solution
+from algoritmos.LowerBound import stop_cost_for
+from algoritmos.IncrementalCost import init_assignment, solution_cost, apply_flip, is_improvement
+from algoritmos.NeighborhoodScan import best_flip_move, best_interchange_move, partial_flip_move, partial_interchange_move
+from algoritmos.Profile import count, count_moves, EVALUATIONS, LOCAL_SEARCH_TIME, PERTURBATION_TIME
+
+"""
+Variable Neighborhood Search (VNS): perturbações (shakes) de tamanho crescente seguidas de uma descida
+que alterna as vizinhanças switch e interchange (VND).
+
+A solução inicial é primeiro melhorada com uma descida. Em cada iteração são trocados os estados de k
+instalações aleatórias e a solução obtida é melhorada até ser um ótimo local das duas vizinhanças. Se for melhor do que a solução atual passa a ser a solução atual
+e k volta a k_min; senão a solução atual é reposta e k aumenta (até k_max, depois recomeça em k_min).
+
+Tudo é feito sobre um único estado incremental (solução e melhor/segunda melhor instalação de cada
+cliente, ver IncrementalCost), sem copiar arrays. Cada troca de estado é registada num registo de
+alterações (undo log) com as instalações cujo estado difere da solução atual; repor a solução atual
+custa só O(alterações x C). Uma descida interrompida pelo orçamento conta como uma iteração completa (fica o
+que já melhorou, se for melhor do que a solução atual), por isso a pesquisa devolve sempre a melhor solução
+encontrada e o estado fica sempre numa solução atual completa, que é o que um checkpoint guarda.
+"""
+
+@njit(cache=True)
+def _flip_logged(facility, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates, log, position, log_size):
+    """
+    Troca o estado de uma instalação e atualiza o registo de alterações.
+
+    Returns:
+    int: Novo tamanho do registo.
+    """
+    apply_flip(facility, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates)
+    if position[facility] >= 0:
+        # Voltou ao estado da solução atual: sai do registo (troca com a última entrada)
+        log_size -= 1
+        last = log[log_size]
+        log[position[facility]] = last
+        position[last] = position[facility]
+        position[facility] = -1
+    else:
+        log[log_size] = facility
+        position[facility] = log_size
+        log_size += 1
+    return log_size
+
+@njit(cache=True)
+def _forget(log, position, log_size):
+    """
+    Esvazia o registo de alterações (a solução obtida passa a ser a solução atual).
+    """
+    for j in range(log_size):
+        position[log[j]] = -1
+
+@njit(cache=True)
+def _undo(solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates, log, position, log_size):
+    """
+    Repõe a solução atual a partir do registo de alterações (e esvazia o registo).
+    As instalações fechadas são reabertas primeiro, para que nunca fiquem todas fechadas.
+    """
+    for j in range(log_size):
+        facility = log[j]
+        if not solution[facility]:
+            apply_flip(facility, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates)
+            position[facility] = -1 # Já reposta
+    for j in range(log_size):
+        facility = log[j]
+        if position[facility] >= 0:
+            apply_flip(facility, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates)
+    _forget(log, position, log_size)
+
+@njit(cache=True)
+def shake(k, rng, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates, log, position):
+    """
+    Troca o estado de k instalações distintas, escolhidas aleatoriamente, sem fechar a última aberta.
+
+    Returns:
+    int: Tamanho do registo de alterações (número de instalações trocadas).
+    """
+    num_facilities = solution.shape[0]
+    num_open = 0
+    for facility in range(num_facilities):
+        num_open += solution[facility]
+    log_size = 0
+    # Número limitado de sorteios: em instâncias muito pequenas podem não existir k trocas possíveis
+    for _ in range(4 * k):
+        if log_size == k:
+            break
+        facility = random_index(rng, num_facilities)
+        if position[facility] >= 0 or (solution[facility] and num_open == 1):
+            continue
+        num_open += -1 if solution[facility] else 1
+        log_size = _flip_logged(facility, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates,
+                                log, position, log_size)
+    return log_size
+
+@njit(cache=True)
+def variable_neighborhood_descent(solution, cost_matrix, facility_costs, best_fac, best_cost, second_fac, second_cost, candidates,
+                                  budget, log, position, log_size, parallel=True, profile=None):
+    """
+    Descida pelas vizinhanças switch e interchange: o switch é aplicado até não melhorar, depois é
+    procurada uma troca (interchange) e, se melhorar, volta-se ao switch.
+
+    Returns:
+    tuple: Custo da solução obtida, tamanho do registo de alterações e True se o orçamento parou a descida a meio.
+    """
+    num_facilities = solution.shape[0]
+    no_tabu = np.zeros(num_facilities, dtype=np.int64)
+    current_cost = solution_cost(solution, facility_costs, best_cost)
+    count(profile, EVALUATIONS, 1)
+
+    while True:
+        # Switch: melhor troca de estado de uma instalação
+        allowed = spend_capped(budget, num_facilities)
+        if allowed == 0:
+            return current_cost, log_size, True
+        count_moves(profile, allowed, 0)
+        if allowed == num_facilities:
+            facility, delta = best_flip_move(solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost,
+                                             no_tabu, 0, current_cost, current_cost, parallel)
+        else:
+            # Última passagem: só os vizinhos que ainda cabem no limite de avaliações
+            facility, delta = partial_flip_move(solution, cost_matrix, facility_costs, best_fac, best_cost, second_cost,
+                                                no_tabu, 0, current_cost, current_cost, allowed)
+        if facility >= 0 and is_improvement(delta, current_cost):
+            log_size = _flip_logged(facility, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates,
+                                    log, position, log_size)
+            current_cost = solution_cost(solution, facility_costs, best_cost)
+            count_moves(profile, 0, 1)
+            count(profile, EVALUATIONS, 1)
+            continue
+
+        # Interchange: só quando a solução já é um ótimo local do switch
+        num_open = 0
+        for j in range(num_facilities):
+            num_open += solution[j]
+        neighbors = (num_facilities - num_open) * (num_open + 1) + num_open
+        allowed = spend_capped(budget, neighbors)
+        if allowed == 0:
+            return current_cost, log_size, True
+        count_moves(profile, allowed, 0)
+        if allowed == neighbors:
+            facility_in, facility_out, delta = best_interchange_move(solution, cost_matrix, facility_costs, best_fac, best_cost,
+                                                                     second_cost, parallel)
+        else:
+            facility_in, facility_out, delta = partial_interchange_move(solution, cost_matrix, facility_costs, best_fac,
+                                                                        best_cost, second_cost, allowed)
+        if not ((facility_in >= 0 or facility_out >= 0) and is_improvement(delta, current_cost)):
+            return current_cost, log_size, False
+
+        # Abrir primeiro, para que os clientes da instalação fechada já vejam a nova
+        if facility_in >= 0:
+            log_size = _flip_logged(facility_in, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates,
+                                    log, position, log_size)
+        if facility_out >= 0:
+            log_size = _flip_logged(facility_out, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates,
+                                    log, position, log_size)
+        current_cost = solution_cost(solution, facility_costs, best_cost)
+        count_moves(profile, 0, 1)
+        count(profile, EVALUATIONS, 1)
+
+@njit(cache=True)
+def vns_steps(cost_matrix, facility_costs, solution, candidates, budget, rng, progress, max_iterations=1000, k_min=1, k_max=8,
+              parallel=True, stop_cost=-np.inf, profile=None):
+    """
+    Iterações da VNS a partir de uma solução atual (alterada no próprio array).
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    solution (np.array): Solução atual; no fim fica a melhor solução encontrada.
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+    budget (np.array): Orçamento de tempo/avaliações e traço de convergência (ver Budget; no_budget() para nenhum).
+    rng (np.array): Estado do gerador aleatório (ver RandomState).
+    progress (np.array): Iteração seguinte, tamanho atual da perturbação (k) e 1 se a descida a partir da solução
+                         inicial já terminou, alterados no próprio array.
+    max_iterations (int): Número máximo de iterações (perturbação seguida de descida).
+    k_min, k_max (int): Menor e maior número de instalações trocadas numa perturbação.
+    parallel (bool): Avalia as vizinhanças em paralelo (o resultado é igual ao da versão em série).
+    stop_cost (float): Pára assim que o custo da solução atual for menor ou igual a este valor (ver LowerBound.stop_cost_for).
+    profile (np.array): Perfil de execução (ver Profile; None: sem contadores). As perturbações contam como
+                        perturbação e as descidas como pesquisa local.
+
+    Returns:
+    float: Custo da melhor solução.
+    """
+    num_facilities = solution.shape[0]
+    k_max = min(k_max, num_facilities)
+    best_fac, best_cost, second_fac, second_cost = init_assignment(solution, cost_matrix, candidates)
+    current_cost = solution_cost(solution, facility_costs, best_cost)
+    count(profile, EVALUATIONS, 1)
+    record(budget, current_cost)
+    # Registo de alterações face à solução atual: instalações trocadas e a sua posição no registo (-1: nenhuma)
+    log = np.empty(num_facilities, dtype=np.int64)
+    position = np.full(num_facilities, -1, dtype=np.int64)
+
+    if progress[2] == 0 and current_cost > stop_cost:
+        # Descida a partir da solução inicial; se o orçamento a interromper, fica o que já melhorou e é retomada
+        # na chamada seguinte (a descida só depende da solução)
+        start = now() if profile is not None else 0.0
+        cost, log_size, interrupted = variable_neighborhood_descent(solution, cost_matrix, facility_costs, best_fac, best_cost,
+                                                                    second_fac, second_cost, candidates, budget, log, position,
+                                                                    0, parallel, profile)
+        _forget(log, position, log_size)
+        if cost < current_cost:
+            current_cost = cost
+            record(budget, current_cost)
+        progress[2] = 0 if interrupted else 1
+        if profile is not None:
+            profile[LOCAL_SEARCH_TIME] += now() - start
+
+    while progress[2] == 1 and progress[0] < max_iterations and current_cost > stop_cost:
+        if exhausted(budget):
+            break
+        k = progress[1]
+
+        start = now() if profile is not None else 0.0
+        log_size = shake(k, rng, solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates, log, position)
+        count_moves(profile, 0, log_size)
+        if profile is not None:
+            middle = now()
+            profile[PERTURBATION_TIME] += middle - start
+            start = middle
+
+        cost, log_size, interrupted = variable_neighborhood_descent(solution, cost_matrix, facility_costs, best_fac, best_cost,
+                                                                    second_fac, second_cost, candidates, budget, log, position,
+                                                                    log_size, parallel, profile)
+        # Uma descida interrompida pelo orçamento conta como completa: a solução a que chegou é comparada como as outras
+        if is_improvement(cost - current_cost, current_cost):
+            # Nova solução atual: volta à menor perturbação
+            _forget(log, position, log_size)
+            current_cost = cost
+            record(budget, current_cost)
+            progress[1] = k_min
+        else:
+            _undo(solution, cost_matrix, best_fac, best_cost, second_fac, second_cost, candidates, log, position, log_size)
+            progress[1] = k + 1 if k < k_max else k_min
+        if profile is not None:
+            profile[LOCAL_SEARCH_TIME] += now() - start
+        progress[0] += 1
+        if interrupted:
+            break
+
+    return current_cost
+
+@njit(cache=True)
+def vns_core(cost_matrix, facility_costs, initial_solution, candidates, budget, rng, max_iterations=1000, k_min=1, k_max=8,
+             parallel=True, stop_cost=-np.inf, profile=None):
+    """
+    Núcleo da VNS a partir de uma solução inicial (ver vns_steps).
+
+    Returns:
+    tuple: Melhor solução encontrada e o custo associado.
+    """
+    solution = initial_solution.copy()
+    progress = np.array([0, k_min, 0], dtype=np.int64)
+    best_cost = vns_steps(cost_matrix, facility_costs, solution, candidates, budget, rng, progress, max_iterations,
+                          k_min, k_max, parallel, stop_cost, profile)
+    return solution, best_cost
+
+def vns_uflp(cost_matrix, facility_costs, max_iterations=1000, k_min=1, k_max=8, parallel=True, initial='greedy', candidates=None,
+             target_gap=None, bound=None, time_limit=None, max_evaluations=None, budget=None, profile=None, rng=None,
+             checkpoint=None, checkpoint_interval=CHECKPOINT_INTERVAL):
+    """
+    Aplica a Variable Neighborhood Search para resolver o problema de localização de instalações sem capacidade.
+
+    Parameters:
+    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
+    facility_costs (np.array): Array de custos de abertura das instalações.
+    max_iterations (int): Número máximo de iterações (perturbação seguida de descida).
+    k_min, k_max (int): Menor e maior número de instalações trocadas numa perturbação.
+    parallel (bool): Avalia as vizinhanças em paralelo.
+    initial (str): Construção da solução inicial ('greedy', 'add' ou 'add_drop').
+    candidates (np.array): Listas de candidatas de cada cliente (None: procura completa).
+    target_gap (float): Pára quando o gap certificado face ao limite inferior for menor ou igual a este valor (%).
+    bound (float): Limite inferior já calculado (None: é calculado aqui se target_gap for dado).
+    time_limit (float): Tempo máximo em segundos, contado desde o início (None: sem limite).
+    max_evaluations (int): Número máximo de avaliações de vizinhos (None: sem limite).
+    budget (np.array): Orçamento criado pelo chamador (ver Budget.new_budget), onde ficam as avaliações e o traço.
+    profile (np.array): Perfil de execução, onde ficam os contadores e o tempo de cada fase (ver Profile.new_profile).
+    rng (np.array): Estado do gerador aleatório (ver RandomState; None: novo gerador com seed tirada do np.random).
+    checkpoint (str): Ficheiro .npz onde o estado (solução atual, iteração, k e gerador) é guardado a cada
+                      checkpoint_interval segundos; se já existir, a pesquisa continua a partir dele (ver Checkpoint).
+                      É apagado quando a pesquisa termina.
+    checkpoint_interval (float): Segundos entre checkpoints.
+
+    Returns:
+    tuple: Melhor solução encontrada e o custo associado.
+    """
+    if not 1 <= k_min <= k_max:
+        raise ValueError(f"Tamanho das perturbações inválido: k_min={k_min}, k_max={k_max} (1 <= k_min <= k_max)")
+    facility_costs = np.array(facility_costs, dtype=np.float64)
+    candidates = resolve_candidates(cost_matrix, candidates)
+    stop_cost = stop_cost_for(cost_matrix, facility_costs, target_gap, bound)
+    budget = resolve_budget(budget, time_limit, max_evaluations)
+    if rng is None:
+        rng = new_rng()
+
+    state = load_checkpoint(checkpoint, 'vns', len(facility_costs), budget)
+    if state is None:
+        # Solução inicial do algoritmo de greedy (ou do ADD)
+        solution = build_initial_solution(cost_matrix, facility_costs, initial, candidates, profile).copy()
+        progress = np.array([0, k_min, 0], dtype=np.int64)
+    else:
+        # Continua a pesquisa de um checkpoint, com o gerador no mesmo estado
+        solution, progress = state['best_solution'], state['progress']
+        rng[:] = state['rng']
+
+    # O estado (solução atual, progresso e gerador) é alterado no próprio array; cada chamada continua da
+    # iteração em que a anterior parou. O tempo de cada fase é medido dentro do kernel.
+    step = lambda previous: vns_steps(cost_matrix, facility_costs, solution, candidates, budget, rng, progress, max_iterations,
+                                      k_min, k_max, parallel, stop_cost, profile)
+    save = lambda result: save_checkpoint(checkpoint, 'vns', budget, best_solution=solution, progress=progress, rng=rng)
+    best_cost = run_with_checkpoints(step, save, budget, checkpoint, checkpoint_interval)
+
+    return solution, best_cost
@@ -1,108 +1,107 @@
 import numpy as np
 from numba import njit
-from algoritmos.GreedyAlgorithm import greedy_uflp
-
-@njit
-def calculate_cost(solution, cost_matrix, facility_costs):
+from algoritmos.Budget import resolve_budget, spend_capped, record
+from algoritmos.Checkpoint import load_checkpoint, save_checkpoint, run_with_checkpoints, CHECKPOINT_INTERVAL
+from algoritmos.CandidateLists import resolve_candidates
+from algoritmos.GreedyAlgorithm import build_initial_solution
+from algoritmos.LowerBound import stop_cost_for
+from algoritmos.IncrementalCost import init_assignment, solution_cost, apply_flip, is_improvement
+from algoritmos.NeighborhoodScan import best_flip_move, partial_flip_move
+from algoritmos.Profile import count, count_moves, phase, EVALUATIONS, LOCAL_SEARCH_TIME
+
+@njit(cache=True)
+def tabu_search_steps(cost_matrix, facility_costs, current_solution, best_solution, tabu_until, first_iteration, candidates,
+                      budget, max_iterations=100, tabu_tenure=5, parallel=True, stop_cost=-np.inf, profile=None):
     """
-    Calcula o custo total da solução atual.
-
-    Parameters:
-    solution (np.array): Array booleano que indica se a instalação está aberta.
-    cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
-    facility_costs (np.array): Array de custos de abertura das instalações.
+    Iterações first_iteration, ..., max_iterations - 1 da pesquisa tabu a partir de um estado guardado
+    (solução atual, melhor solução e memória tabu, alterados no próprio array; ver tabu_search_core).
 
     Returns:
-    float: Custo total da solução.
+    tuple: Custo da melhor solução e a iteração seguinte (por onde continuar se o orçamento parou a pesquisa).
     """
-    num_clients, num_facilities = cost_matrix.shape
-    cost = 0.0
-    # Calcula o custo de transporte
-    for client in range(num_clients):
-        min_cost = np.inf
-        for facility in range(num_facilities):
-            if solution[facility]:  # Verifica se a instalação está aberta
-                cost_val = cost_matrix[client, facility]
-                if cost_val < min_cost:
-                    min_cost = cost_val
-        cost += min_cost
-
-    # Adiciona o custo de abertura das instalações
-    cost += np.sum(solution * facility_costs)
-    return cost
-
-@njit
-def is_solution_in_tabu_list(solution, tabu_list):
-    """
-    Verifica se a solução atual está na lista tabu.
-
-    Parameters:
-    solution (np.array): Solução atual.
-    tabu_list (np.array): Lista tabu que contém as soluções proibidas.
-
-    Returns:
-    bool: True se a solução está na lista tabu, False caso contrário.
-    """
-    for tabu_solution in tabu_list:
-        if np.array_equal(solution, tabu_solution):
-            return True
-    return False
-
-@njit(parallel=True)
-def tabu_search_core(cost_matrix, facility_costs, initial_solution, max_iterations=100, tabu_tenure=5):
+    num_facilities = cost_matrix.shape[1]
+    # Estado incremental: melhor e segunda melhor instalação aberta de cada cliente
+    best_fac, best_cost_client, second_fac, second_cost = init_assignment(current_solution, cost_matrix, candidates)
+    current_cost = solution_cost(current_solution, facility_costs, best_cost_client)
+    best_cost = solution_cost(best_solution, facility_costs, init_assignment(best_solution, cost_matrix, candidates)[1])
+
+    count(profile, EVALUATIONS, 1)
+    record(budget, best_cost)
+
+    next_iteration = first_iteration
+    for iteration in range(first_iteration, max_iterations):
+        # Gap certificado pretendido atingido ou orçamento esgotado (cada iteração avalia F vizinhos)
+        if best_cost <= stop_cost:
+            break
+        allowed = spend_capped(budget, num_facilities)
+        if allowed == 0:
+            break
+        next_iteration = iteration + 1
+
+        # Melhor movimento admissível (argmin sobre a vizinhança, sem a construir nem ordenar)
+        if allowed == num_facilities:
+            best_move, best_move_delta = best_flip_move(current_solution, cost_matrix, facility_costs, best_fac, best_cost_client,
+                                                        second_cost, tabu_until, iteration, current_cost, best_cost, parallel)
+        else:
+            # Última iteração: só os vizinhos que ainda cabem no limite de avaliações
+            best_move, best_move_delta = partial_flip_move(current_solution, cost_matrix, facility_costs, best_fac,
+                                                           best_cost_client, second_cost, tabu_until, iteration, current_cost,
+                                                           best_cost, allowed)
+
+        # Todos os movimentos são tabu (ou deixariam clientes sem instalação)
+        count_moves(profile, allowed, best_move >= 0)
+        if best_move < 0:
+            break
+
+        # Aplica o movimento e atualiza o estado incremental
+        apply_flip(best_move, current_solution, cost_matrix, best_fac, best_cost_client, second_fac, second_cost, candidates)
+        current_cost = solution_cost(current_solution, facility_costs, best_cost_client)
+        count(profile, EVALUATIONS, 1)
+        tabu_until[best_move] = iteration + 1 + tabu_tenure
+
+        if is_improvement(current_cost - best_cost, best_cost):
+            best_solution[:] = current_solution
+            best_cost = current_cost
+            record(budget, best_cost)
+
+    return best_cost, next_iteration
+
+@njit(cache=True)
+def tabu_search_core(cost_matrix, facility_costs, initial_solution, candidates, budget, max_iterations=100, tabu_tenure=5, parallel=True, stop_cost=-np.inf, profile=None):
     """
     Núcleo da pesquisa tabu para refinar a solução inicial.
 
+    A memória tabu guarda atributos de movimentos e não soluções completas: depois de trocar o estado
+    de uma instalação, essa instalação fica tabu até à iteração tabu_until[instalação], o que torna a
+    verificação O(1). Um movimento tabu é aceite se levar a uma solução melhor do que a melhor
+    encontrada até agora (critério de aspiração). Em cada iteração é escolhido o melhor movimento
+    admissível (mesmo que piore a solução atual), sem ordenar a vizinhança.
+
     Parameters:
     cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
     facility_costs (np.array): Array de custos de abertura das instalações.
     initial_solution (np.array): Solução inicial fornecida pelo algoritmo de greedy.
+    candidates (np.array): Listas de candidatas de cada cliente (ver CandidateLists).
+    budget (np.array): Orçamento de tempo/avaliações e traço de convergência (ver Budget; no_budget() para nenhum).
     max_iterations (int): Número máximo de iterações para a pesquisa.
-    tabu_tenure (int): Número de soluções a serem mantidas na lista tabu.
+    tabu_tenure (int): Número de iterações durante as quais uma instalação alterada não pode voltar a ser alterada.
+    parallel (bool): Avalia a vizinhança em paralelo (o resultado é igual ao da versão em série).
+    stop_cost (float): Pára assim que o custo da melhor solução for menor ou igual a este valor (ver LowerBound.stop_cost_for).
+    profile (np.array): Perfil de execução (ver Profile; None: sem contadores).
 
     Returns:
     tuple: Melhor solução encontrada e o custo associado.
     """
-    num_clients, num_facilities = cost_matrix.shape
     current_solution = initial_solution.copy()
-    current_cost = calculate_cost(current_solution, cost_matrix, facility_costs)
-    best_solution = current_solution.copy()
-    best_cost = current_cost
-    tabu_list = np.zeros((tabu_tenure, num_facilities), dtype=np.bool_)
-    tabu_list_ptr = 0 # pointer para a posição atual na tabu list
-
-    for iteration in range(max_iterations):
-        neighborhood = []
-
-        # Gera vizinhos alterando o estado de cada instalação
-        for facility in range(num_facilities):
-            neighbor = current_solution.copy()
-            neighbor[facility] = not neighbor[facility]
-            if not is_solution_in_tabu_list(neighbor, tabu_list):
-                neighbor_cost = calculate_cost(neighbor, cost_matrix, facility_costs)
-                neighborhood.append((neighbor, neighbor_cost))
-
-        # Seleciona o melhor movimento não-tabu
-        if neighborhood:
-            neighborhood.sort(key=lambda x: x[1])  # Ordena os vizinhos pelo custo
-            for neighbor, neighbor_cost in neighborhood:
-                if neighbor_cost < best_cost:
-                    best_solution = neighbor.copy()
-                    best_cost = neighbor_cost
-                    break
-
-            # Atualiza a solução atual e o custo
-            current_solution = best_solution.copy()
-            current_cost = best_cost
-
-            # Atualiza a lista tabu
-            tabu_list[tabu_list_ptr % tabu_tenure] = current_solution.copy() 
-            tabu_list_ptr += 1
-            # tabu_list_ptr % tabu_tenure é  Calcula o índice na tabu_list onde a solução atual será armazenada. Isso garante que o índice esteja sempre dentro dos limites da tabu_list.
-
+    best_solution = initial_solution.copy()
+    tabu_until = np.zeros(initial_solution.shape[0], dtype=np.int64) # Iteração até à qual cada instalação é tabu
+    best_cost, _ = tabu_search_steps(cost_matrix, facility_costs, current_solution, best_solution, tabu_until, 0, candidates,
+                                     budget, max_iterations, tabu_tenure, parallel, stop_cost, profile)
     return best_solution, best_cost
 
-def tabu_search_uflp(cost_matrix, facility_costs, max_iterations=100, tabu_tenure=5):
+def tabu_search_uflp(cost_matrix, facility_costs, max_iterations=100, tabu_tenure=5, parallel=True, initial='greedy', candidates=None,
+                     target_gap=None, bound=None, time_limit=None, max_evaluations=None, budget=None, profile=None,
+                     checkpoint=None, checkpoint_interval=CHECKPOINT_INTERVAL):
     """
     Aplica a pesquisa tabu para resolver o problema de localização de instalações sem capacidade.
 
@@ -110,19 +109,49 @@ def tabu_search_uflp(cost_matrix, facility_costs, max_iterations=100, tabu_tenur
     cost_matrix (np.array): Matriz de custos de transporte entre clientes e instalações.
     facility_costs (np.array): Array de custos de abertura das instalações.
     max_iterations (int): Número máximo de iterações para a pesquisa.
-    tabu_tenure (int): Número de soluções a serem mantidas na lista tabu.
+    tabu_tenure (int): Número de iterações durante as quais uma instalação alterada fica tabu.
+    parallel (bool): Avalia a vizinhança em paralelo.
+    initial (str): Construção da solução inicial ('greedy', 'add' ou 'add_drop').
+    candidates (np.array): Listas de candidatas de cada cliente (None: procura completa).
+    target_gap (float): Pára quando o gap certificado face ao limite inferior for menor ou igual a este valor (%).
+    bound (float): Limite inferior já calculado (None: é calculado aqui se target_gap for dado).
+    time_limit (float): Tempo máximo em segundos, contado desde o início (None: sem limite).
+    max_evaluations (int): Número máximo de avaliações de vizinhos (None: sem limite).
+    budget (np.array): Orçamento criado pelo chamador (ver Budget.new_budget), onde ficam as avaliações e o traço.
+    profile (np.array): Perfil de execução, onde ficam os contadores e o tempo de cada fase (ver Profile.new_profile).
+    checkpoint (str): Ficheiro .npz onde o estado é guardado a cada checkpoint_interval segundos; se já existir, a
+                      pesquisa continua a partir dele (ver Checkpoint). É apagado quando a pesquisa termina.
+    checkpoint_interval (float): Segundos entre checkpoints.
 
     Returns:
     tuple: Melhor solução encontrada e o custo associado.
     """
     # Converte facility_costs para um array do numpy
     facility_costs = np.array(facility_costs, dtype=np.float64)
+    candidates = resolve_candidates(cost_matrix, candidates)
+    stop_cost = stop_cost_for(cost_matrix, facility_costs, target_gap, bound)
+    budget = resolve_budget(budget, time_limit, max_evaluations)
     
-    # Inicia o algoritmo com uma solução inicial do algoritmo de greedy
-    facilities_open, initial_cost = greedy_uflp(cost_matrix, facility_costs)
-    initial_solution = np.array(facilities_open, dtype=np.bool_)
-
-    # Chama o núcleo da pesquisa tabu otimizado
-    best_solution, best_cost = tabu_search_core(cost_matrix, facility_costs, initial_solution, max_iterations, tabu_tenure)
+    state = load_checkpoint(checkpoint, 'tabu', len(facility_costs), budget)
+    if state is None:
+        # Inicia o algoritmo com uma solução inicial do algoritmo de greedy (ou do ADD)
+        start = build_initial_solution(cost_matrix, facility_costs, initial, candidates, profile)
+        current_solution, best_solution = start.copy(), start.copy()
+        tabu_until = np.zeros(len(facility_costs), dtype=np.int64)
+        first_iteration = 0
+    else:
+        # Continua a pesquisa de um checkpoint
+        current_solution, best_solution, tabu_until = state['current_solution'], state['best_solution'], state['tabu_until']
+        first_iteration = int(state['iteration'])
+
+    # Chama o núcleo da pesquisa tabu otimizado, parando em cada checkpoint para guardar o estado
+    # (o estado é alterado no próprio array; cada chamada continua da iteração em que a anterior parou)
+    step = lambda previous: tabu_search_steps(cost_matrix, facility_costs, current_solution, best_solution, tabu_until,
+                                              first_iteration if previous is None else previous[1], candidates, budget,
+                                              max_iterations, tabu_tenure, parallel, stop_cost, profile)
+    save = lambda result: save_checkpoint(checkpoint, 'tabu', budget, current_solution=current_solution,
+                                          best_solution=best_solution, tabu_until=tabu_until, iteration=result[1])
+    with phase(profile, LOCAL_SEARCH_TIME):
+        best_cost, _ = run_with_checkpoints(step, save, budget, checkpoint, checkpoint_interval)
 
     return best_solution, best_cost
\ No newline at end of file
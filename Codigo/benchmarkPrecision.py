@@ -0,0 +1,77 @@
+import argparse
+import os
+import numpy as np
+from utils.getFiles import getTxtFilesFromFolder
+from utils.readFile import read_data
+from utils.optimal import read_optimal, optimal_for, gap_percent
+from utils.benchmarkRunner import ALGORITHMS, run_algorithm, warm_up
+from algoritmos.CandidateLists import no_candidates
+from algoritmos.CostEvaluation import calculate_cost
+
+"""
+Perda de precisão da matriz de custos em float32 face a float64, nas instâncias com ótimo conhecido.
+
+Para cada instância e algoritmo, a solução obtida com a matriz float32 é reavaliada exatamente (float64)
+e comparada com a solução obtida com a matriz float64 e com o ótimo de optimal.txt.
+
+Uso: python Codigo/benchmarkPrecision.py [pasta_instancias] -a greedy swap tabu
+"""
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def main():
+    parser = argparse.ArgumentParser(description='Perda de precisão da matriz float32 face a float64.')
+    parser.add_argument('directory', nargs='?', default=os.path.join(ROOT_DIR, 'Instancias'),
+                        help='Pasta com as instâncias (procura recursiva de ficheiros .txt).')
+    parser.add_argument('-a', '--algorithms', nargs='+', choices=list(ALGORITHMS), default=['greedy', 'swap', 'tabu'],
+                        help='Algoritmos a comparar.')
+    parser.add_argument('--optimal', default=os.path.join(ROOT_DIR, 'Instancias', 'optimal.txt'),
+                        help='Ficheiro com as soluções ótimas conhecidas.')
+    args = parser.parse_args()
+
+    # Só as instâncias com ótimo conhecido são comparadas
+    if not os.path.exists(args.optimal):
+        parser.error(f"Ficheiro de soluções ótimas não encontrado: {args.optimal}")
+    optimal = read_optimal(args.optimal)
+    file_paths = [f for f in sorted(getTxtFilesFromFolder(args.directory)) if optimal_for(optimal, f) is not None]
+    warm_up(args.algorithms, {}, dtype='float64')
+    warm_up(args.algorithms, {}, dtype='float32')
+
+    gaps = {algorithm: ([], []) for algorithm in args.algorithms}
+    different = {algorithm: 0 for algorithm in args.algorithms}
+    max_rounding = 0.0
+
+    for file_path in file_paths:
+        m, n, fixed_costs, matrix64 = read_data(file_path)
+        matrix32 = read_data(file_path, dtype='float32')[3]
+        optimal_cost = optimal_for(optimal, file_path)
+        fixed_costs = np.asarray(fixed_costs, dtype=np.float64)
+        full_scan = no_candidates(n)
+
+        # Maior erro relativo de arredondamento de um custo de alocação
+        rounding = np.max(np.abs(matrix32.astype(np.float64) - matrix64) / np.maximum(np.abs(matrix64), 1e-300))
+        max_rounding = max(max_rounding, rounding)
+
+        for algorithm in args.algorithms:
+            solution64, cost64, time64 = run_algorithm(algorithm, matrix64, fixed_costs, {})
+            solution32, cost32, time32 = run_algorithm(algorithm, matrix32, fixed_costs, {})
+            # Custo exato (float64) da solução encontrada com a matriz float32
+            exact32 = calculate_cost(solution32, matrix64, fixed_costs, full_scan)
+            exact64 = calculate_cost(solution64, matrix64, fixed_costs, full_scan)
+            gap64 = gap_percent(exact64, optimal_cost)
+            gap32 = gap_percent(exact32, optimal_cost)
+            gaps[algorithm][0].append(gap64)
+            gaps[algorithm][1].append(gap32)
+            same = np.array_equal(solution64, solution32)
+            different[algorithm] += not same
+            print(f"{os.path.basename(file_path):<14} {algorithm:<8} float64 {exact64:.3f} ({gap64:.4f}%)  "
+                  f"float32 {exact32:.3f} ({gap32:.4f}%)  erro custo float32 {abs(cost32 - exact32) / exact32:.2e}  "
+                  f"tempo {time64:.3f}s/{time32:.3f}s  {'igual' if same else 'DIFERENTE'}")
+
+    print(f"Maior erro relativo de arredondamento da matriz: {max_rounding:.2e}")
+    for algorithm, (gaps64, gaps32) in gaps.items():
+        print(f"{algorithm:<8} gap médio float64 {np.mean(gaps64):.4f}%  float32 {np.mean(gaps32):.4f}%  "
+              f"soluções diferentes {different[algorithm]}/{len(gaps64)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import time
+import os
+import numpy as np
+from utils.getFiles import getTxtFilesFromFolder
+from utils.readFile import read_data, parse_data, read_data_legacy
+
+"""
+Compara o leitor vetorizado (parse_data) com o leitor original linha a linha (read_data_legacy)
+e com o carregamento a partir da cache binária (read_data).
+
+Uso: python Codigo/benchmarkReadData.py [pasta_instancias] [-r repeticoes]
+"""
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de leitura das instâncias com cada leitor.')
+    parser.add_argument('directory', nargs='?', default=os.path.join(ROOT_DIR, 'Instancias'),
+                        help='Pasta com as instâncias (procura recursiva de ficheiros .txt).')
+    parser.add_argument('-r', '--repetitions', type=int, default=3,
+                        help='Repetições de cada leitura (conta o melhor tempo).')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"Pasta de instâncias não encontrada: {args.directory}")
+    file_paths = getTxtFilesFromFolder(args.directory)
+
+    total_legacy = 0.0
+    total_new = 0.0
+    total_cached = 0.0
+
+    for file_path in file_paths:
+        # Melhor tempo de várias repetições para cada leitor
+        legacy_time = np.inf
+        for _ in range(args.repetitions):
+            start_time = time.perf_counter()
+            legacy = read_data_legacy(file_path)
+            legacy_time = min(legacy_time, time.perf_counter() - start_time)
+
+        new_time = np.inf
+        for _ in range(args.repetitions):
+            start_time = time.perf_counter()
+            new = parse_data(file_path)
+            new_time = min(new_time, time.perf_counter() - start_time)
+
+        # Carregamento da cache (a primeira chamada garante que a entrada existe)
+        read_data(file_path)
+        cached_time = np.inf
+        for _ in range(args.repetitions):
+            start_time = time.perf_counter()
+            cached = read_data(file_path)
+            cached_time = min(cached_time, time.perf_counter() - start_time)
+
+        # Os leitores têm de devolver exatamente os mesmos dados
+        same = (legacy[0] == new[0] and legacy[1] == new[1]
+                and np.array_equal(legacy[2], new[2]) and np.array_equal(legacy[3], new[3])
+                and np.array_equal(legacy[2], cached[2]) and np.array_equal(legacy[3], cached[3]))
+
+        total_legacy += legacy_time
+        total_new += new_time
+        total_cached += cached_time
+        print(f"{os.path.basename(file_path):<14} legacy {legacy_time:.4f}s  novo {new_time:.4f}s  "
+              f"cache {cached_time:.5f}s  x{legacy_time / new_time:.1f}  {'OK' if same else 'DIFERENTE'}")
+
+    print(f"Total: legacy {total_legacy:.3f}s  novo {total_new:.3f}s  cache {total_cached:.4f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import csv
+import os
+from utils.readFile import read_data, MATRIX_DTYPES
+from utils.generateInstance import generate_instance, instance_name, COST_MODELS
+from utils.benchmarkRunner import ALGORITHMS, parse_params, run_algorithm, warm_up
+from algoritmos.CandidateLists import build_candidate_lists
+
+"""
+Benchmark de escalabilidade: tempo de execução de cada algoritmo em função de C (com F fixo) e de F (com C fixo).
+
+As instâncias são geradas com utils/generateInstance.py (só se ainda não existirem) e os tempos são
+escritos num CSV. Se o matplotlib estiver instalado é também gerado um gráfico log-log com as duas curvas.
+
+Exemplo:
+    python Codigo/benchmarkScaling.py -a greedy switch swap tabu ff --clients 1000 2000 5000 10000 --facilities 100 200 500 1000
+"""
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCALING_COLUMNS = ['Algoritmo', 'Modelo', 'Variavel', 'Num. Instalacoes', 'Num. Clientes', 'S.Obtida', 'TC']
+
+def plot_scaling(rows, algorithms, output_png):
+    """
+    Gráfico do tempo de execução em função de C e de F (um painel para cada), uma curva por algoritmo.
+    """
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("Aviso: matplotlib não está instalado, o gráfico não foi gerado (os tempos estão no CSV)")
+        return
+
+    figure, axes = plt.subplots(1, 2, figsize=(11, 4.5))
+    for axis, variable, column in ((axes[0], 'C', 'Num. Clientes'), (axes[1], 'F', 'Num. Instalacoes')):
+        for algorithm in algorithms:
+            points = sorted((row[column], row['TC']) for row in rows
+                            if row['Algoritmo'] == algorithm and row['Variavel'] == variable)
+            if points:
+                axis.plot(*zip(*points), marker='o', label=algorithm)
+        axis.set_xscale('log')
+        axis.set_yscale('log')
+        axis.set_xlabel(column)
+        axis.set_ylabel('Tempo (s)')
+        axis.grid(True, which='both', alpha=0.3)
+        axis.legend()
+    axes[0].set_title('Tempo em função de C (F fixo)')
+    axes[1].set_title('Tempo em função de F (C fixo)')
+    figure.tight_layout()
+    figure.savefig(output_png, dpi=120)
+    print(f"Gráfico: {output_png}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de execução dos algoritmos em função do tamanho da instância.')
+    parser.add_argument('-a', '--algorithms', nargs='+', choices=list(ALGORITHMS), default=['greedy', 'switch', 'swap', 'tabu', 'ff'],
+                        help='Algoritmos a executar.')
+    parser.add_argument('-p', '--param', action='append', default=[], metavar='ALGORITMO.PARAMETRO=VALOR',
+                        help='Parâmetro de um algoritmo, por ex. tabu.max_iterations=200 (pode ser repetido).')
+    parser.add_argument('-m', '--model', choices=COST_MODELS, default='euclidean', help='Modelo de custos das instâncias.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed das instâncias geradas.')
+    parser.add_argument('--clients', nargs='+', type=int, default=[500, 1000, 2000, 4000],
+                        help='Valores de C a testar (com F = --base-facilities).')
+    parser.add_argument('--facilities', nargs='+', type=int, default=[50, 100, 200, 400],
+                        help='Valores de F a testar (com C = --base-clients).')
+    parser.add_argument('--base-facilities', type=int, default=100, help='F usado na variação de C.')
+    parser.add_argument('--base-clients', type=int, default=1000, help='C usado na variação de F.')
+    parser.add_argument('--instances-dir', default=os.path.join(ROOT_DIR, 'InstanciasSinteticas'),
+                        help='Pasta onde as instâncias geradas são guardadas.')
+    parser.add_argument('--candidates', type=int, default=16, metavar='K',
+                        help='Tamanho das listas de instalações candidatas por cliente (0 = procura completa).')
+    parser.add_argument('--dtype', choices=list(MATRIX_DTYPES), default='float64', help='Tipo da matriz de custos de alocação.')
+    parser.add_argument('-o', '--output', default=os.path.join(ROOT_DIR, 'ResultadosCsv', 'scaling.csv'),
+                        help='Ficheiro CSV com os tempos (o gráfico é guardado ao lado, com extensão .png).')
+    args = parser.parse_args()
+
+    params = parse_params(args.param)
+    sizes = ([('C', args.base_facilities, num_clients) for num_clients in args.clients]
+             + [('F', num_facilities, args.base_clients) for num_facilities in args.facilities])
+
+    compile_times = warm_up(args.algorithms, params, args.candidates, args.dtype)
+    for algorithm, compile_time in compile_times.items():
+        print(f"Aquecimento {algorithm:<8} {compile_time:.3f}s")
+
+    rows = []
+    for variable, num_facilities, num_clients in sizes:
+        file_path = os.path.join(args.instances_dir, instance_name(num_facilities, num_clients, args.model, args.seed))
+        if not os.path.exists(file_path):
+            generate_instance(file_path, num_facilities, num_clients, args.model, args.seed)
+        m, n, fixed_costs, allocation_costs = read_data(file_path, dtype=args.dtype)
+        candidates = build_candidate_lists(allocation_costs, args.candidates) if args.candidates > 0 else None
+
+        for algorithm in args.algorithms:
+            solution, cost, execution_time = run_algorithm(algorithm, allocation_costs, fixed_costs, params,
+                                                           candidates=candidates)
+            rows.append({'Algoritmo': algorithm, 'Modelo': args.model, 'Variavel': variable, 'Num. Instalacoes': m,
+                         'Num. Clientes': n, 'S.Obtida': round(cost, 3), 'TC': round(execution_time, 6)})
+            print(f"F={m:<6} C={n:<7} {algorithm:<8} custo {cost:.3f}  tempo {execution_time:.4f}s")
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, mode='w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=SCALING_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    plot_scaling(rows, args.algorithms, os.path.splitext(args.output)[0] + '.png')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import os
+from utils.resultsStore import open_store, export_results, LEGACY_COLUMNS
+
+"""
+Exporta os resultados guardados na base de dados (ver utils/resultsStore.py) para uma tabela CSV ou xlsx.
+
+Com --legacy a tabela tem só as colunas das tabelas antigas (ResultadosCsv/*.csv e Resultados Finais/*.xlsx),
+normalmente para um único algoritmo. O xlsx precisa do openpyxl.
+
+Exemplos:
+    python Codigo/exportResults.py -o ResultadosCsv/todos.csv
+    python Codigo/exportResults.py -a swap --legacy -o "Resultados Finais/Swap.xlsx"
+"""
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def main():
+    parser = argparse.ArgumentParser(description='Exporta a base de dados de resultados para CSV ou xlsx.')
+    parser.add_argument('db', nargs='?', default=os.path.join(ROOT_DIR, 'ResultadosCsv', 'results.db'),
+                        help='Base de dados SQLite (a mesma do runBenchmarks --db).')
+    parser.add_argument('-o', '--output', required=True, help='Ficheiro .csv ou .xlsx a escrever.')
+    parser.add_argument('-a', '--algorithms', nargs='+', default=None, help='Algoritmos a exportar (por omissão, todos).')
+    parser.add_argument('--legacy', action='store_true', help='Só as colunas das tabelas antigas (uma tabela por algoritmo).')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"Base de dados não encontrada: {args.db}")
+    with open_store(args.db) as store:
+        try:
+            count = export_results(store, args.output, args.algorithms, LEGACY_COLUMNS if args.legacy else None)
+        except ImportError as error:
+            parser.error(str(error))
+    print(f"{count} linhas exportadas para {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -1,48 +1,56 @@
+import argparse
 import csv
 import os
-import statistics
+import numpy as np
 from utils.readFile import read_data
-from algoritmos.EscolhaAleatoria import openRandomFacility
-
-file_path = r'C:\Users\User\OneDrive - Instituto Politécnico do Porto\Documentos\Obsidian Vault\AAO - Trabalho Pratico\Algoritmos\FicheirosTeste\M\Kcapmo1.txt'
-
-
-# Ficheiro CSV que vai ser criado
-output_csv = './Results/Media.csv'
-
-# Abre o ficheiro csv para escrita
-with open(output_csv, mode='w', newline='') as file:
-    writer = csv.writer(file)
-    writer.writerow(['Ficheiro', 'Num. Instalacoes Abertas', 'Media'])
-
-
-
-    fixed_costs, allocation_costs = read_data(file_path)
-    print(f"Li agora coisas do: {file_path}")
-    print(len(fixed_costs))
-
-    i = 0
-    j = 0
-    max_facilities = len(fixed_costs)
-    iterations_per_facility = 200
-    solutions = []
-    for i in range(max_facilities):
-        solutions = []
-        for j in range(iterations_per_facility):
-
-            facilities_open, total_cost = openRandomFacility(allocation_costs, fixed_costs, i + 1)
-            solutions.append(total_cost)
-
-            # Print results
-            # print(f"Facilities open: {facilities_open}")
-            # print(f"Total cost: {total_cost}")
-
-        # Calculate the mean of the solutions
-        if solutions:
-            mean_solution = statistics.mean(solutions)
-        else:
-            mean_solution = 0
-
-        # Escreve os resultados no ficheiro csv
-        writer.writerow([os.path.basename(file_path), i + 1, round(mean_solution, 3)])
-        print(f"{i+1}: {round(mean_solution, 3)}")
\ No newline at end of file
+from algoritmos.EscolhaAleatoria import random_solutions_cost
+
+"""
+Estudo do número de instalações a abrir na escolha aleatória.
+
+Para cada número de instalações abertas (1 a F) sorteia várias soluções aleatórias e regista o custo médio.
+Todas as F x amostras soluções são sorteadas e avaliadas em lotes, cada lote numa única passagem pela matriz.
+
+Exemplo:
+    python Codigo/pickNumberForRandomAlgorithm.py Instancias/M/Kcapmo1.txt --samples 200 --seed 0
+"""
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def main():
+    parser = argparse.ArgumentParser(description='Custo médio da escolha aleatória para cada número de instalações abertas.')
+    parser.add_argument('file', nargs='?', default=os.path.join(ROOT_DIR, 'Instancias', 'M', 'Kcapmo1.txt'),
+                        help='Instância a estudar.')
+    parser.add_argument('-n', '--samples', type=int, default=200,
+                        help='Número de soluções aleatórias para cada número de instalações abertas.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed do gerador de números aleatórios.')
+    parser.add_argument('--batch-size', type=int, default=20000,
+                        help='Número máximo de soluções avaliadas em cada lote (limita a memória usada).')
+    parser.add_argument('-o', '--output', default=os.path.join(ROOT_DIR, 'ResultadosCsv', 'Media.csv'),
+                        help='Ficheiro CSV com o custo médio por número de instalações abertas.')
+    args = parser.parse_args()
+
+    num_facilities, num_clients, fixed_costs, allocation_costs = read_data(args.file)
+    print(f"Li agora coisas do: {args.file} ({num_facilities} instalações, {num_clients} clientes)")
+
+    # Uma linha por solução: samples soluções com 1 instalação aberta, depois com 2, ..., até F
+    open_counts = np.repeat(np.arange(1, num_facilities + 1), args.samples)
+    costs = np.empty(open_counts.shape[0], dtype=np.float64)
+    rng = np.random.default_rng(args.seed)
+    for start in range(0, open_counts.shape[0], args.batch_size):
+        end = min(start + args.batch_size, open_counts.shape[0])
+        _, costs[start:end] = random_solutions_cost(allocation_costs, fixed_costs, open_counts[start:end], rng)
+    mean_costs = costs.reshape(num_facilities, args.samples).mean(axis=1)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Ficheiro', 'Num. Instalacoes Abertas', 'Media'])
+        for count, mean_cost in enumerate(mean_costs, start=1):
+            writer.writerow([os.path.basename(args.file), count, round(mean_cost, 3)])
+
+    best = int(np.argmin(mean_costs))
+    print(f"Melhor número de instalações abertas: {best + 1} (custo médio {round(mean_costs[best], 3)})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import os
+from utils.getFiles import getTxtFilesFromFolder
+from utils.optimal import read_optimal
+from utils.readFile import MATRIX_DTYPES
+from algoritmos.LowerBound import BOUND_METHODS
+from algoritmos.Profile import PROFILING
+from utils.benchmarkRunner import ALGORITHMS, HEURISTICS, parse_params, run_benchmark, open_results
+from utils.resultsStore import open_store
+
+"""
+Executa os algoritmos selecionados sobre todas as instâncias de uma pasta e escreve uma única tabela de resultados.
+
+Cada resultado é também guardado numa base de dados SQLite (--db) assim que o job termina. Se a execução
+for interrompida, basta repeti-la: os jobs já guardados são saltados e a tabela CSV fica completa
+(as tabelas podem também ser exportadas da base de dados com exportResults.py).
+
+Exemplos:
+    python Codigo/runBenchmarks.py
+    python Codigo/runBenchmarks.py Instancias/M -a greedy switch tabu -p tabu.max_iterations=200
+    python Codigo/runBenchmarks.py -a ff random --seeds 0 1 2 3 --workers 4
+    python Codigo/runBenchmarks.py InstanciasSinteticas -a tabu -p tabu.max_iterations=1000 -p tabu.target_gap=0.5
+"""
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos algoritmos para o UFLP.')
+    parser.add_argument('directory', nargs='?', default=os.path.join(ROOT_DIR, 'Instancias'),
+                        help='Pasta com as instâncias (procura recursiva de ficheiros .txt).')
+    parser.add_argument('-a', '--algorithms', nargs='+', choices=list(ALGORITHMS), default=HEURISTICS,
+                        help='Algoritmos a executar (por omissão, todas as heurísticas; bnb é o branch-and-bound exato).')
+    parser.add_argument('-p', '--param', action='append', default=[], metavar='ALGORITMO.PARAMETRO=VALOR',
+                        help='Parâmetro de um algoritmo, por ex. tabu.tabu_tenure=10 (pode ser repetido).')
+    parser.add_argument('-o', '--output', default=os.path.join(ROOT_DIR, 'ResultadosCsv', 'results.csv'),
+                        help='Ficheiro CSV com a tabela de resultados.')
+    parser.add_argument('--db', default=os.path.join(ROOT_DIR, 'ResultadosCsv', 'results.db'),
+                        help='Base de dados SQLite onde os resultados são acrescentados (retoma execuções interrompidas).')
+    parser.add_argument('--checkpoint-dir', default=None, metavar='PASTA',
+                        help='Guarda o estado das pesquisas (switch, swap, tabu, ff) nesta pasta; um job interrompido '
+                             'continua do último checkpoint.')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='Executa de novo os jobs que já estão na base de dados (as novas linhas são acrescentadas).')
+    parser.add_argument('--optimal', default=os.path.join(ROOT_DIR, 'Instancias', 'optimal.txt'),
+                        help='Ficheiro com as soluções ótimas conhecidas (colunas S.Otima e %%).')
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0],
+                        help='Seeds a executar para cada par (instância, algoritmo).')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='Número de processos em paralelo (1 = execução em série).')
+    parser.add_argument('--threads-per-worker', type=int, default=1,
+                        help='Número de threads Numba de cada processo quando --workers > 1.')
+    parser.add_argument('--candidates', type=int, default=16, metavar='K',
+                        help='Tamanho das listas de instalações candidatas por cliente (0 = procura completa).')
+    parser.add_argument('--dtype', choices=list(MATRIX_DTYPES), default='float64',
+                        help='Tipo da matriz de custos de alocação (float32 usa metade da memória; os totais são sempre float64).')
+    parser.add_argument('--bound', choices=list(BOUND_METHODS) + ['none'], default='lagrangian',
+                        help='Limite inferior usado nas colunas LB e %%LB (gap certificado) e pelo parâmetro target_gap.')
+    parser.add_argument('--reduce', action='store_true',
+                        help='Fixa instalações por dominância e custos reduzidos e resolve o problema reduzido.')
+    parser.add_argument('--profile', action='store_true', default=PROFILING,
+                        help='Contadores dos kernels e tempo por fase na coluna Perfil (também com UFLP_PROFILE=1).')
+    args = parser.parse_args()
+
+    params = parse_params(args.param)
+    optimal = read_optimal(args.optimal) if os.path.exists(args.optimal) else {}
+    file_paths = sorted(getTxtFilesFromFolder(args.directory))
+
+    store = open_store(args.db)
+    file, writer = open_results(args.output)
+    with file, store:
+        run_benchmark(file_paths, args.algorithms, params, optimal, writer,
+                      seeds=args.seeds, workers=args.workers, threads_per_worker=args.threads_per_worker,
+                      candidates_k=args.candidates, dtype=args.dtype,
+                      bound_method=None if args.bound == 'none' else args.bound, reduce=args.reduce,
+                      profile=args.profile, store=store, resume=not args.no_resume, checkpoint_dir=args.checkpoint_dir,
+                      instance_root=args.directory)
+
+# Necessário para os processos criados com spawn não voltarem a executar o script
+if __name__ == '__main__':
+    main()
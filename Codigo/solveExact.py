@@ -0,0 +1,69 @@
+import argparse
+import os
+import numpy as np
+from utils.getFiles import getTxtFilesFromFolder
+from utils.readFile import read_data
+from utils.optimal import read_optimal, optimal_for
+from algoritmos.BranchAndBound import branch_and_bound, print_progress, INITIAL_INCUMBENTS, SEARCH_STRATEGIES
+from algoritmos.Budget import new_budget
+from algoritmos.CandidateLists import build_candidate_lists
+from algoritmos.CostEvaluation import calculate_cost
+
+"""
+Resolve instâncias de forma exata com o branch-and-bound (algoritmos/BranchAndBound.py).
+
+Durante a pesquisa são escritos a melhor solução e o limite inferior. No fim, as instâncias cuja otimalidade
+foi provada podem ser acrescentadas a um ficheiro no formato de optimal.txt ("nome valor").
+
+Exemplos:
+    python Codigo/solveExact.py Instancias/ORLIB
+    python Codigo/solveExact.py InstanciasSinteticas/euclidean_F100_C1000_s0.txt --time-limit 600 --write-optimal novos_otimos.txt
+"""
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def main():
+    parser = argparse.ArgumentParser(description='Branch-and-bound exato para o UFLP.')
+    parser.add_argument('paths', nargs='+', help='Ficheiros de instâncias ou pastas (procura recursiva de ficheiros .txt).')
+    parser.add_argument('-t', '--time-limit', type=float, default=60.0, help='Tempo máximo por instância, em segundos.')
+    parser.add_argument('-s', '--strategy', choices=SEARCH_STRATEGIES, default='best', help='Ordem de exploração dos nós.')
+    parser.add_argument('--initial', choices=list(INITIAL_INCUMBENTS), default='switch', help='Heurística da solução inicial.')
+    parser.add_argument('--candidates', type=int, default=16, metavar='K',
+                        help='Tamanho das listas de instalações candidatas por cliente (0 = procura completa).')
+    parser.add_argument('--report-interval', type=float, default=1.0, help='Segundos entre linhas de progresso.')
+    parser.add_argument('--optimal', default=os.path.join(ROOT_DIR, 'Instancias', 'optimal.txt'),
+                        help='Ficheiro com as soluções ótimas conhecidas (para comparação).')
+    parser.add_argument('--write-optimal', default=None, metavar='FICHEIRO',
+                        help='Acrescenta "nome valor" a este ficheiro para cada instância com otimalidade provada.')
+    args = parser.parse_args()
+
+    optimal = read_optimal(args.optimal) if os.path.exists(args.optimal) else {}
+    file_paths = []
+    for path in args.paths:
+        file_paths += sorted(getTxtFilesFromFolder(path)) if os.path.isdir(path) else [path]
+
+    for file_path in file_paths:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        m, n, fixed_costs, allocation_costs = read_data(file_path)
+        fixed_costs = np.asarray(fixed_costs, dtype=np.float64)
+        candidates = build_candidate_lists(allocation_costs, args.candidates)
+
+        budget = new_budget(args.time_limit)
+        start, _ = INITIAL_INCUMBENTS[args.initial](allocation_costs, fixed_costs, candidates=candidates)
+        start_cost = calculate_cost(start, allocation_costs, fixed_costs, candidates)
+        print(f"{name} (F={m}, C={n}): solução inicial ({args.initial}) {start_cost:.3f}")
+
+        solution, cost, bound, nodes, proved = branch_and_bound(allocation_costs, fixed_costs, start, start_cost, candidates,
+                                                                budget, args.strategy, progress=print_progress,
+                                                                report_interval=args.report_interval)
+        known = optimal_for(optimal, file_path)
+        status = 'ótimo provado' if proved else f"limite de tempo, gap {100.0 * (cost - bound) / abs(bound):.4f}%"
+        print(f"{name}: {cost:.3f} ({status}, {nodes} nós, {int(solution.sum())} instalações abertas)"
+              + ('' if known is None else f", optimal.txt {known:.3f}"))
+
+        if proved and args.write_optimal:
+            with open(args.write_optimal, 'a') as file:
+                file.write(f"{name} {cost:.3f}\n")
+
+if __name__ == '__main__':
+    main()
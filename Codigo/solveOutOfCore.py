@@ -0,0 +1,72 @@
+import argparse
+import os
+import time
+try:
+    import resource
+except ImportError:
+    resource = None # Windows: o pico de memória não é escrito
+from utils.getFiles import getTxtFilesFromFolder
+from utils.readFile import read_disk_data, MATRIX_DTYPES
+from utils.optimal import read_optimal, optimal_for
+from algoritmos.Budget import new_budget, budget_evaluations
+from algoritmos.OutOfCore import greedy_tiled_uflp, switch_tiled_uflp, TILE_BYTES
+
+"""
+Greedy e switch em instâncias cuja matriz de custos não cabe em memória (algoritmos/OutOfCore.py).
+
+Cada instância de texto é convertida uma vez, por blocos, em ficheiros .npy ao lado do ficheiro original
+(readFile.convert_to_disk); depois a matriz é lida do disco por blocos de clientes de --tile-mb MiB.
+No fim de cada instância é escrito o pico de memória do processo.
+
+Exemplos:
+    python Codigo/solveOutOfCore.py InstanciasSinteticas/euclidean_F1000_C100000_s0.txt --tile-mb 32
+    python Codigo/solveOutOfCore.py Instancias/M -a greedy --dtype float32
+"""
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+ALGORITHMS = ('greedy', 'switch')
+
+def main():
+    parser = argparse.ArgumentParser(description='Greedy e switch com a matriz de custos lida do disco por blocos.')
+    parser.add_argument('paths', nargs='+', help='Ficheiros de instâncias ou pastas (procura recursiva de ficheiros .txt).')
+    parser.add_argument('-a', '--algorithms', nargs='+', choices=ALGORITHMS, default=list(ALGORITHMS), help='Algoritmos a executar.')
+    parser.add_argument('--tile-mb', type=float, default=TILE_BYTES / 1024 ** 2, help='Memória de cada bloco de clientes, em MiB.')
+    parser.add_argument('--dtype', choices=list(MATRIX_DTYPES), default='float64', help='Tipo da matriz guardada no disco.')
+    parser.add_argument('-t', '--time-limit', type=float, default=None, help='Tempo máximo do switch por instância, em segundos.')
+    parser.add_argument('--optimal', default=os.path.join(ROOT_DIR, 'Instancias', 'optimal.txt'),
+                        help='Ficheiro com as soluções ótimas conhecidas (para comparação).')
+    args = parser.parse_args()
+
+    optimal = read_optimal(args.optimal) if os.path.exists(args.optimal) else {}
+    tile_bytes = int(args.tile_mb * 1024 ** 2)
+    file_paths = []
+    for path in args.paths:
+        file_paths += sorted(getTxtFilesFromFolder(path)) if os.path.isdir(path) else [path]
+
+    for file_path in file_paths:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        start = time.perf_counter()
+        m, n, fixed_costs, matrix_path = read_disk_data(file_path, args.dtype)
+        known = optimal_for(optimal, file_path)
+        print(f"{name} (F={m}, C={n}): matriz em {matrix_path} ({time.perf_counter() - start:.2f}s)")
+
+        initial = None
+        for algorithm in args.algorithms:
+            start = time.perf_counter()
+            if algorithm == 'greedy':
+                initial, cost = greedy_tiled_uflp(matrix_path, fixed_costs, tile_bytes)
+                detail = ''
+            else:
+                budget = new_budget()
+                _, cost = switch_tiled_uflp(matrix_path, fixed_costs, initial, tile_bytes, time_limit=args.time_limit, budget=budget)
+                detail = f", {budget_evaluations(budget)} avaliações"
+            gap = '' if known is None else f", gap {100.0 * (cost - known) / known:.4f}%"
+            print(f"  {algorithm}: {cost:.3f} ({time.perf_counter() - start:.2f}s{detail}{gap})")
+
+        if resource is not None:
+            # ru_maxrss em KiB (Linux)
+            print(f"  pico de memória: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,482 @@
+import ast
+import csv
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from numba import njit, set_num_threads
+from utils.readFile import read_data, MATRIX_DTYPES
+from utils.instanceCache import load_cached_array, store_cached_array
+from utils.optimal import optimal_for, gap_percent
+from utils.resultsStore import store_result, load_results, job_key
+from algoritmos.Budget import new_budget, budget_evaluations, budget_trace
+from algoritmos.Profile import new_profile, profile_summary
+from algoritmos.CandidateLists import build_candidate_lists
+from algoritmos.LowerBound import lower_bound
+from algoritmos.Reduction import reduce_instance, reduced_problem, solve_reduced, FACILITY_FREE
+from algoritmos.EscolhaAleatoria import openRandomFacility
+from algoritmos.GreedyAlgorithm import greedy_uflp, greedy_add_uflp
+from algoritmos.SwitchLocalSearch import switch_heuristic_uflp
+from algoritmos.SwapLocalSeach import swap_heuristic_uflp
+from algoritmos.tabuSearch import tabu_search_uflp
+from algoritmos.FilterAndFan import filter_and_fan_uflp
+from algoritmos.VariableNeighborhoodSearch import vns_uflp
+from algoritmos.BranchAndBound import branch_and_bound_uflp, compile_node_kernels
+
+"""
+Execução de vários algoritmos sobre um conjunto de instâncias.
+
+Cada execução é um job (instância, algoritmo, seed). Os jobs podem correr no processo atual ou
+distribuídos por um conjunto de processos, em tarefas com os jobs de uma mesma instância (ver group_jobs);
+em ambos os casos os resultados são escritos pela ordem dos jobs, independentemente da ordem em que terminam.
+"""
+
+RESULT_COLUMNS = ['Ficheiro', 'Caminho', 'Algoritmo', 'Seed', 'Num. Instalacoes', 'Num. Clientes', 'S.Otima', 'S.Obtida', '%', 'TC',
+                  'TCompilacao', 'LB', '%LB', 'F.Reduzido', 'Avaliacoes', 'Traco', 'Perfil']
+
+def random_facility_uflp(cost_matrix, facility_costs, open_fraction=0.08, candidates=None):
+    """
+    Escolha aleatória com um número de instalações abertas proporcional ao número de instalações.
+
+    Regra de 3 simples com base no estudo realizado para o primeiro ficheiro (8 em 100 foi o melhor número).
+    A seed é tirada do módulo random, que o runner inicializa com a seed do job.
+    """
+    number_of_open_facilities = max(1, math.floor(len(facility_costs) * open_fraction))
+    return openRandomFacility(cost_matrix, facility_costs, number_of_open_facilities, seed=random.getrandbits(32),
+                              candidates=candidates)
+
+# Nome do algoritmo na linha de comandos -> função (cost_matrix, facility_costs, **params) -> (solução, custo)
+ALGORITHMS = {
+    'greedy': greedy_uflp,
+    'add': greedy_add_uflp,
+    'random': random_facility_uflp,
+    'switch': switch_heuristic_uflp,
+    'swap': swap_heuristic_uflp,
+    'tabu': tabu_search_uflp,
+    'ff': filter_and_fan_uflp,
+    'vns': vns_uflp,
+    'bnb': branch_and_bound_uflp,
+}
+
+# Algoritmos que aceitam um orçamento (time_limit, max_evaluations ou budget, ver Budget) e registam o traço de convergência
+BUDGETED_ALGORITHMS = {'switch', 'swap', 'tabu', 'ff', 'vns', 'bnb'}
+
+# Algoritmos que aceitam um perfil de execução (contadores e tempo por fase, ver Profile)
+PROFILED_ALGORITHMS = {'greedy', 'add', 'switch', 'swap', 'tabu', 'ff', 'vns'}
+
+# Algoritmos que guardam checkpoints e podem continuar uma pesquisa interrompida (ver Checkpoint)
+CHECKPOINTED_ALGORITHMS = {'switch', 'swap', 'tabu', 'ff', 'vns'}
+
+# Algoritmos executados por omissão (o branch-and-bound pode demorar o seu time_limit em cada instância)
+HEURISTICS = [name for name in ALGORITHMS if name != 'bnb']
+
+def parse_params(assignments):
+    """
+    Converte parâmetros no formato "algoritmo.parametro=valor" num dicionário por algoritmo.
+
+    Parameters:
+    assignments (list): Lista de strings, por ex. ["tabu.max_iterations=200", "ff.beam_width=8"].
+
+    Returns:
+    dict: Algoritmo -> {parametro: valor}.
+    """
+    params = {}
+    for assignment in assignments or []:
+        key, _, value = assignment.partition('=')
+        algorithm, _, name = key.partition('.')
+        if not name or not value or algorithm not in ALGORITHMS:
+            raise ValueError(f"Parâmetro inválido: {assignment} (formato: algoritmo.parametro=valor)")
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            pass  # Fica como string
+        params.setdefault(algorithm, {})[name] = value
+    return params
+
+@njit(cache=True)
+def _seed_numba(seed):
+    # O gerador do Numba é independente do np.random do Python e tem de ser inicializado dentro de código compilado
+    np.random.seed(seed)
+
+def seed_random_state(seed):
+    """
+    Inicializa todos os geradores aleatórios usados pelos algoritmos (random, np.random e Numba).
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    _seed_numba(seed)
+
+def run_algorithm(algorithm, cost_matrix, facility_costs, params, seed=0, candidates=None, bound=None, reduction=None,
+                  budget=None, profile=None, checkpoint=None):
+    """
+    Executa um algoritmo e mede o seu tempo de execução.
+
+    As listas de candidatas (ver CandidateLists) e o limite inferior (ver LowerBound) são calculados uma
+    vez por instância, fora do tempo medido. O limite só é passado aos algoritmos com target_gap.
+    Com reduction (ver load_reduction) o algoritmo resolve o problema reduzido, e as listas de candidatas
+    têm de ter sido construídas sobre a matriz reduzida; a solução devolvida usa os índices originais.
+    Com budget (ver Budget.new_budget) as avaliações e o traço de convergência ficam disponíveis no fim; os
+    limites continuam a vir dos parâmetros do algoritmo (time_limit, max_evaluations).
+    Com profile (ver Profile.new_profile) os contadores e o tempo de cada fase ficam no perfil.
+    Com checkpoint (ficheiro .npz, ver Checkpoint) o estado da pesquisa é guardado periodicamente e, se o
+    ficheiro já existir, a pesquisa continua a partir dele.
+
+    Returns:
+    tuple: Solução, custo e tempo de execução em segundos.
+    """
+    solver = ALGORITHMS[algorithm]
+    solver_params = dict(params.get(algorithm, {}))
+    if candidates is not None:
+        solver_params['candidates'] = candidates
+    if budget is not None:
+        solver_params['budget'] = budget
+    if profile is not None:
+        solver_params['profile'] = profile
+    if checkpoint is not None:
+        solver_params['checkpoint'] = checkpoint
+    if bound is not None and 'target_gap' in solver_params:
+        solver_params['bound'] = bound
+    seed_random_state(seed)
+    start_time = time.perf_counter()
+    if reduction is None:
+        solution, cost = solver(cost_matrix, facility_costs, **solver_params)
+    else:
+        solution, cost = solve_reduced(solver, cost_matrix, facility_costs, reduction, **solver_params)
+    return solution, cost, time.perf_counter() - start_time
+
+def result_row(file_path, algorithm, seed, num_facilities, num_clients, cost, execution_time, optimal, compile_time=0.0,
+               bound=None, reduced_facilities=None, budget=None, profile=None):
+    """
+    Constrói uma linha da tabela de resultados (com S.Otima e % preenchidos quando a ótima é conhecida).
+
+    TC é só o tempo de resolução; TCompilacao é o tempo de compilação (ou de carregamento da cache
+    do Numba) do algoritmo, pago uma vez por processo durante o aquecimento.
+    LB é o limite inferior da instância e %LB o gap certificado (majora o gap face ao ótimo, mesmo
+    quando este não é conhecido). F.Reduzido é o número de instalações do problema reduzido, quando é usado.
+    Avaliacoes e Traco vêm do orçamento do algoritmo: o traço é uma lista JSON de [tempo, avaliações, custo],
+    uma entrada por melhoria da melhor solução.
+    Perfil é o perfil de execução em JSON (contadores e tempo de cada fase, ver Profile), quando está ativo.
+    """
+    optimal_cost = optimal_for(optimal, file_path)
+    gap = gap_percent(cost, optimal_cost)
+    certified_gap = gap_percent(cost, bound)
+    return {
+        'Ficheiro': os.path.basename(file_path),
+        'Caminho': '', # Preenchido por run_benchmark (ver instance_path)
+        'Algoritmo': algorithm,
+        'Seed': seed,
+        'Num. Instalacoes': num_facilities,
+        'Num. Clientes': num_clients,
+        'S.Otima': '' if optimal_cost is None else round(optimal_cost, 3),
+        'S.Obtida': round(cost, 3),
+        '%': '' if gap is None else round(gap, 3) + 0.0,  # + 0.0 evita "-0.0"
+        'TC': round(execution_time, 3),
+        'TCompilacao': round(compile_time, 3),
+        'LB': '' if bound is None else round(bound, 3),
+        '%LB': '' if certified_gap is None else round(certified_gap, 3) + 0.0,
+        'F.Reduzido': '' if reduced_facilities is None else reduced_facilities,
+        'Avaliacoes': '' if budget is None else budget_evaluations(budget),
+        'Traco': '' if budget is None else json.dumps([[round(t, 6), int(e), round(c, 3)] for t, e, c in budget_trace(budget)]),
+        'Perfil': '' if profile is None else json.dumps({name: round(value, 6) for name, value in profile_summary(profile).items()}),
+    }
+
+def load_reduction(file_path, cost_matrix, facility_costs, use_cache=True):
+    """
+    Redução da instância (ver Reduction), calculada uma vez e guardada na cache de instâncias.
+
+    Returns:
+    tuple: Estado de cada instalação seguido do problema reduzido (ver Reduction.reduced_problem).
+    """
+    tag = f"reduction-{cost_matrix.dtype.name}"
+    status = load_cached_array(file_path, 'status', tag) if use_cache else None
+    if status is None or status.shape != (cost_matrix.shape[1],):
+        status = reduce_instance(cost_matrix, facility_costs)
+        if use_cache:
+            try:
+                store_cached_array(file_path, status, 'status', tag)
+            except OSError as error:
+                print(f"Aviso: não foi possível guardar a redução de {file_path} na cache ({error})")
+    return (status,) + reduced_problem(cost_matrix, facility_costs, status)
+
+def instance_path(file_path, instance_root=None):
+    """
+    Caminho de uma instância relativo à pasta das instâncias (com '/'), que a identifica na base de dados: ficheiros
+    com o mesmo nome em pastas diferentes são instâncias diferentes. Sem instance_root é o caminho absoluto.
+    """
+    path = os.path.abspath(file_path) if instance_root is None else os.path.relpath(file_path, instance_root)
+    return path.replace(os.sep, '/')
+
+def build_jobs(file_paths, algorithms, seeds):
+    """
+    Lista de jobs (instância, algoritmo, seed), agrupados por instância para que cada uma seja lida uma só vez.
+    """
+    return [(file_path, algorithm, seed) for file_path in file_paths for algorithm in algorithms for seed in seeds]
+
+def warm_up(algorithms, params, candidates_k=0, dtype='float64', bound_method=None, reduce=False, profile=False):
+    """
+    Fase de aquecimento: compila os kernels Numba de cada algoritmo executando-o numa instância pequena.
+
+    Os kernels usam cache=True, por isso a compilação só é feita uma vez e fica guardada em disco
+    (__pycache__); nas execuções seguintes o aquecimento apenas carrega o código já compilado.
+    Cada algoritmo é executado com a matriz em memória e com a matriz só de leitura, que é o tipo
+    devolvido pela cache de instâncias (memory mapping) e que o Numba compila à parte, e com as
+    listas de candidatas quando candidates_k > 0. A matriz tem o tipo usado na execução (dtype).
+    Com bound_method e reduce são também compilados os kernels do limite inferior e da redução (fora dos
+    tempos devolvidos); com reduce os algoritmos são aquecidos através do problema reduzido.
+    Com profile são compiladas as versões dos kernels com contadores (ver Profile), que o Numba compila à parte.
+    Para o branch-and-bound são também compilados os kernels dos nós abaixo da raiz (ver compile_node_kernels).
+
+    Returns:
+    dict: Algoritmo -> tempo de compilação em segundos.
+    """
+    rng = np.random.default_rng(0)
+    cost_matrix = (rng.random((8, 6)) * 10.0).astype(MATRIX_DTYPES[dtype])
+    facility_costs = rng.random(6) * 10.0
+    readonly_matrix = cost_matrix.copy()
+    readonly_matrix.flags.writeable = False
+
+    if bound_method is not None:
+        for matrix in (cost_matrix, readonly_matrix):
+            lower_bound(matrix, facility_costs, bound_method)
+    reductions = [None, None]
+    if reduce:
+        # Sem fixar instalações: numa instância tão pequena a redução deixaria partes dos algoritmos por compilar
+        no_fixing = np.full(len(facility_costs), FACILITY_FREE, dtype=np.int8)
+        for k, matrix in enumerate((cost_matrix, readonly_matrix)):
+            reduce_instance(matrix, facility_costs)
+            reductions[k] = (no_fixing,) + reduced_problem(matrix, facility_costs, no_fixing)
+
+    compile_times = {}
+    for algorithm in algorithms:
+        start_time = time.perf_counter()
+        for matrix, reduction in zip((cost_matrix, readonly_matrix), reductions):
+            solver_matrix = matrix if reduction is None else reduction[2]
+            candidates = build_candidate_lists(solver_matrix, candidates_k) if candidates_k > 0 else None
+            algorithm_profile = new_profile(profile and algorithm in PROFILED_ALGORITHMS)
+            run_algorithm(algorithm, matrix, facility_costs, params, candidates=candidates, reduction=reduction,
+                          profile=algorithm_profile)
+            if algorithm == 'bnb':
+                compile_node_kernels(solver_matrix, facility_costs if reduction is None else reduction[3])
+        compile_times[algorithm] = time.perf_counter() - start_time
+    return compile_times
+
+# Estado de cada processo: parâmetros da execução e última instância lida
+_worker_params = {}
+_worker_optimal = {}
+_worker_instance = (None, None)
+_worker_compile_times = {}
+_worker_candidates_k = 0
+_worker_dtype = 'float64'
+_worker_bound_method = None
+_worker_reduce = False
+_worker_profile = False
+_worker_checkpoint_dir = None
+
+def _init_worker(algorithms, params, optimal, threads_per_worker, candidates_k=0, dtype='float64', bound_method=None,
+                 reduce=False, profile=False, checkpoint_dir=None):
+    global _worker_params, _worker_optimal, _worker_compile_times, _worker_candidates_k, _worker_dtype
+    global _worker_bound_method, _worker_reduce, _worker_profile, _worker_checkpoint_dir
+    _worker_params = params
+    _worker_optimal = optimal
+    _worker_candidates_k = candidates_k
+    _worker_dtype = dtype
+    _worker_bound_method = bound_method
+    _worker_reduce = reduce
+    _worker_profile = profile
+    _worker_checkpoint_dir = checkpoint_dir
+    # Evita que N processos lancem cada um todas as threads do Numba
+    if threads_per_worker is not None:
+        set_num_threads(threads_per_worker)
+    _worker_compile_times = warm_up(algorithms, params, candidates_k, dtype, bound_method, reduce, profile)
+    return _worker_compile_times
+
+def _load_instance(file_path):
+    # Os jobs (e as tarefas) estão agrupados por instância: guardar a última (com as listas de candidatas e o limite inferior)
+    # evita voltar a lê-la
+    global _worker_instance
+    if _worker_instance[0] != file_path:
+        num_facilities, num_clients, fixed_costs, allocation_costs = read_data(file_path, dtype=_worker_dtype)
+        reduction = load_reduction(file_path, allocation_costs, fixed_costs) if _worker_reduce else None
+        # Com a redução, as listas de candidatas são as da matriz reduzida
+        solver_matrix = allocation_costs if reduction is None else reduction[2]
+        candidates = build_candidate_lists(solver_matrix, _worker_candidates_k) if _worker_candidates_k > 0 else None
+        bound = lower_bound(allocation_costs, fixed_costs, _worker_bound_method) if _worker_bound_method is not None else None
+        _worker_instance = (file_path, (num_facilities, num_clients, fixed_costs, allocation_costs, candidates, bound,
+                                        reduction))
+    return _worker_instance[1]
+
+def _run_job(job):
+    """
+    Executa um job. O tempo é medido dentro do processo que o executa.
+    """
+    file_path, algorithm, seed = job
+    num_facilities, num_clients, fixed_costs, allocation_costs, candidates, bound, reduction = _load_instance(file_path)
+    budget = new_budget() if algorithm in BUDGETED_ALGORITHMS else None
+    profile = new_profile(_worker_profile and algorithm in PROFILED_ALGORITHMS)
+    checkpoint = None
+    if _worker_checkpoint_dir is not None and algorithm in CHECKPOINTED_ALGORITHMS:
+        settings = run_settings(_worker_candidates_k, _worker_dtype, _worker_bound_method, _worker_reduce)
+        checkpoint = checkpoint_path(_worker_checkpoint_dir, file_path, algorithm, seed, _worker_params.get(algorithm, {}),
+                                     settings)
+    solution, cost, execution_time = run_algorithm(algorithm, allocation_costs, fixed_costs, _worker_params, seed,
+                                                   candidates, bound, reduction, budget, profile, checkpoint)
+    return result_row(file_path, algorithm, seed, num_facilities, num_clients, cost, execution_time, _worker_optimal,
+                      _worker_compile_times.get(algorithm, 0.0), bound, None if reduction is None else len(reduction[1]),
+                      budget, profile)
+
+def _run_jobs(jobs):
+    """
+    Executa uma tarefa (jobs da mesma instância, ver group_jobs) num processo.
+
+    Returns:
+    list: Linha da tabela de resultados de cada job, pela mesma ordem.
+    """
+    return [_run_job(job) for job in jobs]
+
+def group_jobs(jobs, workers):
+    """
+    Divide os jobs em tarefas para o conjunto de processos, uma por instância, para que cada instância seja lida (e as
+    listas de candidatas, o limite inferior e a redução calculados) num só processo. Com menos instâncias do que
+    processos, os jobs de cada instância são divididos em blocos, para que todos os processos tenham trabalho.
+
+    Returns:
+    list: Tarefas (listas de jobs da mesma instância, pela ordem dos jobs).
+    """
+    by_instance = {}
+    for job in jobs:
+        by_instance.setdefault(job[0], []).append(job)
+    chunks = math.ceil(workers / len(by_instance)) if by_instance else 1
+    tasks = []
+    for instance_jobs in by_instance.values():
+        size = math.ceil(len(instance_jobs) / chunks)
+        tasks += [instance_jobs[start:start + size] for start in range(0, len(instance_jobs), size)]
+    return tasks
+
+def _print_row(row):
+    print(f"{row['Ficheiro']:<14} {row['Algoritmo']:<8} seed {row['Seed']:<4} custo {row['S.Obtida']:.3f}  "
+          f"gap {row['%']}%  gap LB {row['%LB']}%  tempo {row['TC']:.3f}s")
+
+def checkpoint_path(checkpoint_dir, file_path, algorithm, seed, params, settings):
+    """
+    Ficheiro do checkpoint de um job. O nome inclui um resumo dos parâmetros e das opções, para que um checkpoint
+    nunca seja retomado com outros parâmetros.
+    """
+    # O caminho completo da instância também entra no resumo (o nome do ficheiro pode repetir-se noutra pasta)
+    digest = hashlib.sha1((os.path.abspath(file_path) + job_key(params) + job_key(settings)).encode('utf-8')).hexdigest()[:10]
+    return os.path.join(checkpoint_dir, f"{os.path.splitext(os.path.basename(file_path))[0]}-{algorithm}-{seed}-{digest}.npz")
+
+def run_settings(candidates_k=0, dtype='float64', bound_method=None, reduce=False):
+    """
+    Opções da execução que mudam os resultados (identificam os jobs na base de dados, com os parâmetros do algoritmo).
+    """
+    return {'candidates': candidates_k, 'dtype': dtype, 'bound': bound_method, 'reduce': reduce}
+
+def run_benchmark(file_paths, algorithms, params, optimal, writer=None, seeds=(0,), workers=1, threads_per_worker=1,
+                  candidates_k=0, dtype='float64', bound_method=None, reduce=False, profile=False, store=None, resume=True,
+                  checkpoint_dir=None, instance_root=None):
+    """
+    Executa todos os jobs (instância, algoritmo, seed), em série ou num conjunto de processos.
+
+    Parameters:
+    file_paths (list): Ficheiros das instâncias.
+    algorithms (list): Nomes dos algoritmos (chaves de ALGORITHMS).
+    params (dict): Parâmetros por algoritmo (ver parse_params).
+    optimal (dict): Soluções ótimas conhecidas (ver utils/optimal.py).
+    writer (csv.DictWriter): Se indicado, cada linha é escrita assim que todas as anteriores estiverem prontas.
+    seeds (list): Seeds a executar para cada par (instância, algoritmo).
+    workers (int): Número de processos; 1 executa tudo no processo atual.
+    threads_per_worker (int): Número de threads Numba de cada processo (só com workers > 1).
+    candidates_k (int): Tamanho das listas de candidatas por cliente (0 desativa as listas).
+    dtype (str): Tipo da matriz de custos de alocação (ver readFile.MATRIX_DTYPES).
+    bound_method (str): Método do limite inferior ('dual' ou 'lagrangian', ver LowerBound); None não calcula o limite.
+    reduce (bool): Resolve o problema reduzido (ver Reduction), com a redução calculada uma vez por instância.
+    profile (bool): Regista o perfil de execução (contadores e tempo de cada fase, ver Profile) na coluna Perfil.
+    store (sqlite3.Connection): Base de dados onde cada linha é guardada assim que o job termina (ver resultsStore).
+    resume (bool): Com store, os jobs já guardados (mesmos parâmetros e opções) não são executados de novo;
+                   as suas linhas são lidas da base de dados.
+    checkpoint_dir (str): Pasta dos checkpoints das pesquisas longas (ver Checkpoint); um job interrompido a meio
+                          continua do último checkpoint quando for executado de novo. None desativa os checkpoints.
+    instance_root (str): Pasta das instâncias; a coluna Caminho (que identifica os jobs na base de dados) é relativa
+                         a esta pasta (None: caminho absoluto).
+
+    Returns:
+    list: Linhas da tabela de resultados, pela ordem dos jobs.
+    """
+    jobs = build_jobs(file_paths, algorithms, seeds)
+    rows = []
+    settings = run_settings(candidates_k, dtype, bound_method, reduce)
+
+    # Linhas já guardadas de cada job (instância, algoritmo, seed)
+    stored = {}
+    if store is not None and resume:
+        for algorithm in algorithms:
+            for (file_name, seed), row in load_results(store, algorithm, params.get(algorithm, {}), settings).items():
+                stored[(file_name, algorithm, seed)] = row
+    paths = {file_path: instance_path(file_path, instance_root) for file_path in file_paths}
+    done = {job for job in jobs if (paths[job[0]], job[1], job[2]) in stored}
+    pending = [job for job in jobs if job not in done]
+    if done:
+        print(f"{len(done)} de {len(jobs)} jobs já estão na base de dados e não são executados de novo")
+
+    def emit(job, row):
+        row['Caminho'] = paths[job[0]]
+        rows.append(row)
+        if writer is not None:
+            writer.writerow(row)
+        if job not in done:
+            _print_row(row)
+            if store is not None:
+                store_result(store, row, params.get(job[1], {}), settings)
+
+    def stored_row(job):
+        return stored[(paths[job[0]], job[1], job[2])]
+
+    if workers <= 1 or not pending:
+        if pending:
+            compile_times = _init_worker(algorithms, params, optimal, None, candidates_k, dtype, bound_method, reduce, profile,
+                                         checkpoint_dir)
+            for algorithm, compile_time in compile_times.items():
+                print(f"Aquecimento {algorithm:<8} {compile_time:.3f}s")
+        for job in jobs:
+            emit(job, stored_row(job) if job in done else _run_job(job))
+        return rows
+
+    # spawn em todas as plataformas: fork depois de o Numba ter criado threads não é seguro
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(algorithms, params, optimal, threads_per_worker, candidates_k, dtype, bound_method,
+                                       reduce, profile, checkpoint_dir)) as executor:
+        # Cada job -> tarefa que o executa e a sua posição na tarefa
+        futures = {}
+        for task in group_jobs(pending, workers):
+            future = executor.submit(_run_jobs, task)
+            for index, job in enumerate(task):
+                futures[job] = (future, index)
+        # Escrever pela ordem dos jobs: cada resultado espera pelos anteriores
+        for job in jobs:
+            if job in done:
+                emit(job, stored_row(job))
+            else:
+                future, index = futures[job]
+                emit(job, future.result()[index])
+    return rows
+
+def open_results(output_csv):
+    """
+    Abre o ficheiro CSV de resultados para escrita e escreve o cabeçalho.
+
+    Returns:
+    tuple: Ficheiro aberto e csv.DictWriter associado.
+    """
+    output_dir = os.path.dirname(output_csv)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    file = open(output_csv, mode='w', newline='')
+    writer = csv.DictWriter(file, fieldnames=RESULT_COLUMNS)
+    writer.writeheader()
+    return file, writer
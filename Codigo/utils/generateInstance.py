@@ -0,0 +1,109 @@
+import argparse
+import os
+import numpy as np
+
+"""
+Gerador de instâncias sintéticas do UFLP, no mesmo formato das instâncias Kratica (lido por read_data).
+
+Formato: "m n", m linhas "capacidade custo_fixo" e, para cada cliente, uma linha com a procura seguida
+dos m custos de alocação (8 por linha). A matriz é gerada e escrita por blocos de clientes, por isso
+a memória usada não depende do número de clientes. Para a mesma seed o ficheiro é sempre o mesmo,
+qualquer que seja o tamanho dos blocos.
+
+Modelos de custos:
+    euclidean: instalações e clientes uniformes num quadrado 100 x 100, custo = distância euclidiana;
+               custos fixos escalados para abrir na ordem de F^(1/2) instalações.
+    kratica:   como as instâncias M de Kratica (custos de alocação em [2, 40] e custos fixos em [C/2, 3C]).
+    uniform:   custos de alocação uniformes em [0, 100] e custos fixos uniformes em [C, 3C].
+"""
+
+COST_MODELS = ('euclidean', 'kratica', 'uniform')
+
+# Valores por linha nos blocos de custos de alocação (como nos ficheiros Kratica)
+VALUES_PER_LINE = 8
+
+def _fixed_costs(model, num_facilities, num_clients, rng):
+    if model == 'euclidean':
+        # Com k instalações abertas o custo de serviço é ~ 38 * C / sqrt(k); este custo fixo médio leva a k ~ sqrt(F)
+        mean_cost = 19.0 * num_clients / num_facilities ** 0.75
+        return np.round(mean_cost * rng.uniform(0.5, 1.5, num_facilities), 3)
+    if model == 'kratica':
+        return np.round(rng.uniform(0.5 * num_clients, 3.0 * num_clients, num_facilities), 3)
+    return np.round(rng.uniform(num_clients, 3.0 * num_clients, num_facilities), 3)
+
+def _allocation_rows(model, num_rows, facility_points, rng):
+    num_facilities = facility_points.shape[0]
+    if model == 'euclidean':
+        client_points = rng.uniform(0.0, 100.0, (num_rows, 2))
+        diff = client_points[:, None, :] - facility_points[None, :, :]
+        return np.sqrt((diff ** 2).sum(axis=2))
+    if model == 'kratica':
+        return rng.uniform(2.0, 40.0, (num_rows, num_facilities))
+    return rng.uniform(0.0, 100.0, (num_rows, num_facilities))
+
+def generate_instance(file_path, num_facilities, num_clients, model='euclidean', seed=0, block_size=256):
+    """
+    Gera uma instância sintética e escreve-a em file_path.
+
+    Parameters:
+    file_path (str): Ficheiro de saída.
+    num_facilities (int): Número de instalações (F).
+    num_clients (int): Número de clientes (C).
+    model (str): Modelo de custos ('euclidean', 'kratica' ou 'uniform').
+    seed (int): Seed do gerador de números aleatórios.
+    block_size (int): Número de clientes gerados e escritos de cada vez.
+
+    Returns:
+    str: Caminho do ficheiro escrito.
+    """
+    if model not in COST_MODELS:
+        raise ValueError(f"Modelo de custos inválido: {model} (opções: {', '.join(COST_MODELS)})")
+
+    # Geradores independentes para cada parte, para que os clientes não dependam do tamanho dos blocos
+    fixed_rng, point_rng, client_rng, demand_rng = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(4)]
+    fixed_costs = _fixed_costs(model, num_facilities, num_clients, fixed_rng)
+    facility_points = point_rng.uniform(0.0, 100.0, (num_facilities, 2))
+
+    # Formato de um cliente: procura e depois os custos em linhas de VALUES_PER_LINE valores
+    full_lines, rest = divmod(num_facilities, VALUES_PER_LINE)
+    client_format = '%d \n' + (' %10.3f' * VALUES_PER_LINE + ' \n') * full_lines + (' %10.3f' * rest + ' \n' if rest else '')
+
+    output_dir = os.path.dirname(file_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as file:
+        file.write(f"{num_facilities} {num_clients}\n")
+        # A capacidade é ignorada no UFLP; é escrita apenas para manter o formato
+        capacities = np.maximum(1, np.round(fixed_costs / 15.0)).astype(np.int64)
+        file.writelines(f"{capacity} {fixed_cost:.3f}\n" for capacity, fixed_cost in zip(capacities, fixed_costs))
+
+        for start in range(0, num_clients, block_size):
+            num_rows = min(block_size, num_clients - start)
+            rows = np.round(_allocation_rows(model, num_rows, facility_points, client_rng), 3)
+            demands = demand_rng.integers(1, 21, num_rows)
+            file.writelines(client_format % (demand, *row) for demand, row in zip(demands, rows))
+    os.replace(tmp_path, file_path)
+    return file_path
+
+def instance_name(num_facilities, num_clients, model, seed):
+    """
+    Nome normalizado de uma instância sintética (por ex. euclidean_F100_C1000_s0.txt).
+    """
+    return f"{model}_F{num_facilities}_C{num_clients}_s{seed}.txt"
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera instâncias sintéticas do UFLP no formato Kratica.')
+    parser.add_argument('facilities', type=int, help='Número de instalações (F).')
+    parser.add_argument('clients', type=int, help='Número de clientes (C).')
+    parser.add_argument('-m', '--model', choices=COST_MODELS, default='euclidean', help='Modelo de custos.')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='Seed do gerador.')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Ficheiro de saída (por omissão, <modelo>_F<F>_C<C>_s<seed>.txt na pasta atual).')
+    args = parser.parse_args()
+
+    output = args.output or instance_name(args.facilities, args.clients, args.model, args.seed)
+    print(generate_instance(output, args.facilities, args.clients, args.model, args.seed))
+
+if __name__ == '__main__':
+    main()
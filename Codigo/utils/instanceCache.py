@@ -0,0 +1,176 @@
+import glob
+import hashlib
+import os
+import numpy as np
+
+"""
+Cache binária das instâncias já lidas.
+
+Cada instância é guardada em dois ficheiros .npy (custos fixos e matriz de alocação) na pasta
+InstanciasCache, ao lado da pasta Instancias. O nome dos ficheiros depende do caminho absoluto,
+do tamanho e da data de modificação do ficheiro de texto, por isso qualquer alteração à instância
+invalida automaticamente a entrada antiga. A matriz é carregada com memory mapping, ou seja, só é
+lida do disco à medida que vai sendo usada.
+"""
+
+# Pasta da cache (pode ser alterada com a variável de ambiente UFLP_CACHE_DIR)
+CACHE_DIR = os.environ.get(
+    'UFLP_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'InstanciasCache')
+)
+
+# Tamanho máximo da cache em bytes; as entradas usadas há mais tempo são removidas primeiro
+MAX_CACHE_BYTES = int(os.environ.get('UFLP_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+
+def _path_key(file_path):
+    return hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+
+def _state_key(file_path):
+    stat = os.stat(file_path)
+    return hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8')).hexdigest()[:16]
+
+def _entry_name(file_path, tag=''):
+    """
+    Nome base da entrada: chave do caminho, variante e chave do estado do ficheiro (tamanho e mtime).
+    """
+    return f"{_path_key(file_path)}-{tag or 'base'}-{_state_key(file_path)}"
+
+def _entries():
+    """
+    Devolve {nome base: [ficheiros]} de todas as entradas na cache.
+    """
+    entries = {}
+    for file_path in glob.glob(os.path.join(CACHE_DIR, '*.npy')):
+        base = os.path.basename(file_path).split('.', 1)[0]
+        entries.setdefault(base, []).append(file_path)
+    return entries
+
+def _remove_entry(files):
+    for file_path in files:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass  # Em Windows um ficheiro ainda mapeado não pode ser apagado
+
+def load_cached(file_path, tag=''):
+    """
+    Carrega uma instância da cache, se existir uma entrada válida.
+
+    Parameters:
+    file_path (str): Caminho para o ficheiro de texto da instância.
+    tag (str): Variante da entrada (permite guardar a mesma instância em formatos diferentes).
+
+    Returns:
+    tuple: (m, n, fixed_costs, allocation_costs) ou None se não existir entrada válida.
+    """
+    base = os.path.join(CACHE_DIR, _entry_name(file_path, tag))
+    fixed_path = base + '.fixed.npy'
+    alloc_path = base + '.alloc.npy'
+    if not (os.path.exists(fixed_path) and os.path.exists(alloc_path)):
+        return None
+
+    try:
+        fixed_costs = np.load(fixed_path)
+        allocation_costs = np.load(alloc_path, mmap_mode='r')
+    except (OSError, ValueError):
+        # Entrada corrompida (por ex. escrita interrompida): remove e volta a ler o texto
+        _remove_entry([fixed_path, alloc_path])
+        return None
+
+    # Marca a entrada como usada recentemente (política LRU de remoção)
+    try:
+        os.utime(alloc_path)
+    except OSError:
+        pass
+
+    n, m = allocation_costs.shape
+    return m, n, fixed_costs, allocation_costs
+
+def store_cached(file_path, fixed_costs, allocation_costs, tag=''):
+    """
+    Guarda uma instância na cache, remove as entradas antigas do mesmo ficheiro e aplica o limite de tamanho.
+
+    Parameters:
+    file_path (str): Caminho para o ficheiro de texto da instância.
+    fixed_costs (np.array): Custos fixos dos armazéns.
+    allocation_costs (np.array): Matriz de custos de alocação (clientes x armazéns).
+    tag (str): Variante da entrada.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    name = _entry_name(file_path, tag)
+    base = os.path.join(CACHE_DIR, name)
+
+    # Escrita atómica: primeiro para um ficheiro temporário, depois os.replace
+    for suffix, array in (('.fixed.npy', fixed_costs), ('.alloc.npy', allocation_costs)):
+        tmp_path = f"{base}{suffix}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            np.save(file, np.ascontiguousarray(array))
+        os.replace(tmp_path, base + suffix)
+
+    _remove_stale(file_path)
+    evict(MAX_CACHE_BYTES)
+
+def load_cached_array(file_path, name, tag=''):
+    """
+    Carrega um array auxiliar de uma instância (por ex. o resultado da redução), guardado com store_cached_array.
+
+    Returns:
+    np.array: O array, ou None se não existir entrada válida.
+    """
+    array_path = os.path.join(CACHE_DIR, f"{_entry_name(file_path, tag)}.{name}.npy")
+    if not os.path.exists(array_path):
+        return None
+    try:
+        return np.load(array_path)
+    except (OSError, ValueError):
+        _remove_entry([array_path])
+        return None
+
+def store_cached_array(file_path, array, name, tag=''):
+    """
+    Guarda um array auxiliar de uma instância, invalidado tal como as entradas de store_cached.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    array_path = os.path.join(CACHE_DIR, f"{_entry_name(file_path, tag)}.{name}.npy")
+    tmp_path = f"{array_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        np.save(file, np.ascontiguousarray(array))
+    os.replace(tmp_path, array_path)
+    _remove_stale(file_path)
+    evict(MAX_CACHE_BYTES)
+
+def _remove_stale(file_path):
+    # Invalidação: entradas do mesmo ficheiro com outro tamanho/mtime já não são válidas
+    path_key = _path_key(file_path)
+    state_key = _state_key(file_path)
+    for other, files in _entries().items():
+        if other.startswith(path_key + '-') and not other.endswith('-' + state_key):
+            _remove_entry(files)
+
+def invalidate(file_path=None):
+    """
+    Remove da cache as entradas de um ficheiro (ou todas, se file_path for None).
+    """
+    prefix = _path_key(file_path) + '-' if file_path is not None else ''
+    for base, files in _entries().items():
+        if base.startswith(prefix):
+            _remove_entry(files)
+
+def evict(max_bytes=MAX_CACHE_BYTES):
+    """
+    Remove as entradas usadas há mais tempo até a cache ocupar no máximo max_bytes.
+    """
+    entries = []
+    total = 0
+    for base, files in _entries().items():
+        size = sum(os.path.getsize(f) for f in files)
+        last_used = max(os.path.getmtime(f) for f in files)
+        entries.append((last_used, size, files))
+        total += size
+
+    entries.sort()
+    for last_used, size, files in entries:
+        if total <= max_bytes:
+            break
+        _remove_entry(files)
+        total -= size
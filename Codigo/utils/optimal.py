@@ -0,0 +1,40 @@
+import os
+
+def read_optimal(file_path):
+    """
+    Lê o ficheiro optimal.txt com as soluções ótimas conhecidas.
+
+    As linhas de cabeçalho (com caracteres inválidos) são ignoradas; as restantes têm o formato "nome valor".
+
+    Parameters:
+    file_path (str): Caminho para o ficheiro optimal.txt.
+
+    Returns:
+    dict: Nome da instância em minúsculas (sem extensão) -> custo ótimo.
+    """
+    optimal = {}
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) != 2:
+                continue
+            try:
+                optimal[parts[0].lower()] = float(parts[1])
+            except ValueError:
+                continue  # Linha de cabeçalho
+    return optimal
+
+def optimal_for(optimal, file_path):
+    """
+    Devolve o custo ótimo conhecido para um ficheiro de instância, ou None se não existir.
+    """
+    name = os.path.splitext(os.path.basename(file_path))[0].lower()
+    return optimal.get(name)
+
+def gap_percent(obtained, optimal_cost):
+    """
+    Desvio percentual da solução obtida em relação à ótima.
+    """
+    if optimal_cost is None or optimal_cost == 0:
+        return None
+    return 100.0 * (obtained - optimal_cost) / optimal_cost
@@ -1,6 +1,207 @@
+import os
 import numpy as np
+from utils.instanceCache import load_cached, store_cached
 
-def read_data(file_path):
+# Tipos possíveis da matriz de custos de alocação (os custos fixos são sempre float64)
+MATRIX_DTYPES = {
+    'float64': np.float64,
+    'float32': np.float32, # Metade da memória e da largura de banda, com ~7 algarismos significativos
+}
+
+# Tamanho de cada bloco de texto lido por convert_to_disk, em bytes
+READ_CHUNK_BYTES = 16 * 1024 ** 2
+
+def read_data(file_path, use_cache=True, dtype='float64'):
+    """
+    Lê uma instância, usando a cache binária (utils/instanceCache.py) sempre que possível.
+
+    Na primeira leitura o ficheiro de texto é interpretado por parse_data e guardado na cache;
+    nas seguintes a matriz de custos de alocação é carregada com memory mapping (só de leitura).
+    Cada tipo da matriz tem a sua própria entrada na cache.
+
+    Parameters:
+    file_path (str): Caminho para o ficheiro da instância.
+    use_cache (bool): Se False, lê sempre o ficheiro de texto.
+    dtype (str): Tipo da matriz de custos de alocação ('float64' ou 'float32', ver MATRIX_DTYPES).
+
+    Returns:
+    tuple: Número de armazéns, número de clientes, custos fixos e matriz de custos de alocação (clientes x armazéns).
+    """
+    if dtype not in MATRIX_DTYPES:
+        raise ValueError(f"Tipo de matriz inválido: {dtype} (opções: {', '.join(MATRIX_DTYPES)})")
+    tag = '' if dtype == 'float64' else dtype
+
+    if use_cache:
+        cached = load_cached(file_path, tag)
+        if cached is not None:
+            return cached
+
+    m, n, fixed_costs, allocation_costs = parse_data(file_path)
+    allocation_costs = allocation_costs.astype(MATRIX_DTYPES[dtype], copy=False)
+
+    if use_cache:
+        try:
+            store_cached(file_path, fixed_costs, allocation_costs, tag)
+        except OSError as error:
+            # Uma cache que não pode ser escrita não deve impedir a leitura da instância
+            print(f"Aviso: não foi possível guardar {file_path} na cache ({error})")
+
+    return m, n, fixed_costs, allocation_costs
+
+def parse_data(file_path):
+    """
+    Lê uma instância (formato Kratica M ou ORLIB) de uma só vez.
+
+    O ficheiro inteiro é convertido num único buffer NumPy e os custos fixos e a matriz de
+    custos de alocação são obtidos por slicing, sem criar um objeto Python por valor.
+
+    Layout dos tokens: m n | m pares (capacidade, custo fixo) | n blocos (procura, m custos).
+    Nos ficheiros ORLIB a capacidade é a palavra "capacity", que é substituída por 0.
+
+    Parameters:
+    file_path (str): Caminho para o ficheiro da instância.
+
+    Returns:
+    tuple: Número de armazéns, número de clientes, custos fixos e matriz de custos de alocação (clientes x armazéns).
+    """
+    with open(file_path, 'rb') as file:
+        content = file.read()
+
+    # Tokenizar o ficheiro inteiro num só buffer de floats
+    tokens = np.fromstring(content.replace(b'capacity', b'0').decode('latin-1'), sep=' ')
+
+    # Ler o número de armazéns e clientes
+    m, n = int(tokens[0]), int(tokens[1])
+
+    expected = 2 + 2 * m + n * (m + 1)
+    if tokens.size != expected:
+        raise ValueError(f"Ficheiro {file_path} tem {tokens.size} valores, esperava {expected}")
+
+    # Guardar apenas o segundo valor de cada par (capacidade, custo fixo)
+    fixed_costs = tokens[3:2 + 2 * m:2].copy()
+
+    # Cada cliente ocupa m + 1 valores: a procura (ignorada) seguida dos m custos de alocação
+    allocation_costs = np.ascontiguousarray(tokens[2 + 2 * m:].reshape(n, m + 1)[:, 1:])
+
+    return m, n, fixed_costs, allocation_costs
+
+def _stream_tokens(file, chunk_bytes):
+    """
+    Tokeniza um ficheiro de instância bloco a bloco (um token nunca fica partido entre dois blocos).
+    """
+    tail = b''
+    while True:
+        chunk = file.read(chunk_bytes)
+        content = tail + chunk
+        if chunk:
+            # O último token pode continuar no bloco seguinte
+            cut = max(content.rfind(b' '), content.rfind(b'\n'), content.rfind(b'\t'), content.rfind(b'\r'))
+            if cut < 0:
+                tail = content
+                continue
+            content, tail = content[:cut], content[cut:]
+        if content.strip(): # Um bloco só com espaços daria um valor inválido
+            yield np.fromstring(content.replace(b'capacity', b'0').decode('latin-1'), sep=' ')
+        if not chunk:
+            return
+
+def disk_paths(file_path, dtype='float64'):
+    """
+    Ficheiros .npy de uma instância convertida por convert_to_disk (ao lado do ficheiro de texto).
+
+    Returns:
+    tuple: Caminhos dos custos fixos e da matriz de custos de alocação.
+    """
+    base = os.path.splitext(file_path)[0] + ('' if dtype == 'float64' else f".{dtype}")
+    return base + '.fixed.npy', base + '.alloc.npy'
+
+def convert_to_disk(file_path, dtype='float64', chunk_bytes=READ_CHUNK_BYTES):
+    """
+    Converte uma instância de texto em ficheiros .npy sem nunca ter a matriz inteira em memória.
+
+    O texto é lido e tokenizado por blocos de chunk_bytes e os custos de cada cliente completo são
+    acrescentados ao ficheiro da matriz, por isso a memória usada não depende do tamanho da instância.
+    A matriz é depois lida por blocos pelos algoritmos de algoritmos/OutOfCore.py.
+
+    Parameters:
+    file_path (str): Caminho para o ficheiro da instância (formato Kratica M ou ORLIB, ver parse_data).
+    dtype (str): Tipo da matriz de custos de alocação ('float64' ou 'float32', ver MATRIX_DTYPES).
+    chunk_bytes (int): Tamanho de cada bloco de texto lido.
+
+    Returns:
+    tuple: Número de armazéns, número de clientes e caminhos dos custos fixos e da matriz (ver disk_paths).
+    """
+    if dtype not in MATRIX_DTYPES:
+        raise ValueError(f"Tipo de matriz inválido: {dtype} (opções: {', '.join(MATRIX_DTYPES)})")
+    fixed_path, matrix_path = disk_paths(file_path, dtype)
+    tmp_path = f"{matrix_path}.{os.getpid()}.tmp"
+
+    m = n = None
+    fixed_costs = None
+    written = 0
+    tokens = np.empty(0)
+    output = None
+    try:
+        with open(file_path, 'rb') as file:
+            for chunk in _stream_tokens(file, chunk_bytes):
+                tokens = np.concatenate((tokens, chunk))
+                # Cabeçalho: m n | m pares (capacidade, custo fixo)
+                if m is None and tokens.size >= 2:
+                    m, n = int(tokens[0]), int(tokens[1])
+                    tokens = tokens[2:]
+                    output = open(tmp_path, 'wb')
+                    header = {'descr': np.lib.format.dtype_to_descr(np.dtype(MATRIX_DTYPES[dtype])),
+                              'fortran_order': False, 'shape': (n, m)}
+                    np.lib.format.write_array_header_2_0(output, header)
+                if m is not None and fixed_costs is None and tokens.size >= 2 * m:
+                    fixed_costs = tokens[1:2 * m:2].copy()
+                    tokens = tokens[2 * m:]
+                # Clientes completos (procura seguida dos m custos de alocação)
+                if fixed_costs is not None:
+                    rows = min(tokens.size // (m + 1), n - written)
+                    block = tokens[:rows * (m + 1)].reshape(rows, m + 1)[:, 1:]
+                    output.write(block.astype(MATRIX_DTYPES[dtype]).tobytes())
+                    written += rows
+                    tokens = tokens[rows * (m + 1):]
+                    if written == n and tokens.size:
+                        break
+
+        if fixed_costs is None or written != n or tokens.size:
+            found = 'mais' if tokens.size and written == n else 'menos'
+            raise ValueError(f"Ficheiro {file_path} tem {found} valores do que os esperados para {m} armazéns e {n} clientes")
+        output.close()
+        os.replace(tmp_path, matrix_path)
+    finally:
+        if output is not None and not output.closed:
+            output.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    np.save(fixed_path, fixed_costs)
+    return m, n, fixed_path, matrix_path
+
+def read_disk_data(file_path, dtype='float64'):
+    """
+    Lê uma instância para os algoritmos por blocos: custos fixos em memória e a matriz no disco.
+
+    A conversão (convert_to_disk) só é feita se os ficheiros .npy não existirem ou forem mais antigos
+    do que o ficheiro de texto.
+
+    Returns:
+    tuple: Número de armazéns, número de clientes, custos fixos e caminho da matriz de custos de alocação.
+    """
+    fixed_path, matrix_path = disk_paths(file_path, dtype)
+    converted = all(os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(file_path)
+                    for path in (fixed_path, matrix_path))
+    if not converted:
+        convert_to_disk(file_path, dtype)
+    fixed_costs = np.load(fixed_path)
+    return len(fixed_costs), int(np.load(matrix_path, mmap_mode='r').shape[0]), fixed_costs, matrix_path
+
+def read_data_legacy(file_path):
+    """
+    Leitor original, linha a linha. Mantido para comparação em benchmarkReadData.py.
+    """
     with open(file_path, 'r') as file:
         # Ler o número de armazéns e clientes
         m, n = map(int, file.readline().split())
@@ -43,7 +244,7 @@ def read_data(file_path):
                 if not line:
                     file.readline()
 
-            
+
     # Converter allocation_costs e fixed_costs para um array NumPy
     allocation_costs = np.array(allocation_costs)
     fixed_costs = np.array(fixed_costs)
@@ -0,0 +1,168 @@
+import csv
+import json
+import os
+import sqlite3
+import time
+
+"""
+Base de dados (SQLite) com os resultados das execuções, só de acréscimo.
+
+Cada linha da tabela de resultados (ver benchmarkRunner.result_row) é guardada assim que o job termina,
+com os parâmetros do algoritmo e as opções da execução que mudam o resultado (listas de candidatas, dtype,
+redução, limite inferior). Uma execução interrompida perde no máximo os jobs que estavam a correr: ao voltar
+a executar, os jobs (instância, algoritmo, parâmetros, seed) já guardados são saltados. A instância é identificada
+pelo caminho relativo à pasta das instâncias (coluna Caminho), e não só pelo nome do ficheiro, que se pode repetir
+em pastas diferentes.
+
+As tabelas em CSV ou xlsx (como as de ResultadosCsv e Resultados Finais) são exportadas da base de dados
+com export_results; quando o mesmo job foi guardado várias vezes, conta a execução mais recente.
+"""
+
+# Coluna da tabela de resultados -> coluna da base de dados
+STORE_COLUMNS = {
+    'Ficheiro': 'instance',
+    'Caminho': 'path',
+    'Algoritmo': 'algorithm',
+    'Seed': 'seed',
+    'Num. Instalacoes': 'num_facilities',
+    'Num. Clientes': 'num_clients',
+    'S.Otima': 'optimal',
+    'S.Obtida': 'cost',
+    '%': 'gap',
+    'TC': 'time',
+    'TCompilacao': 'compile_time',
+    'LB': 'bound',
+    '%LB': 'certified_gap',
+    'F.Reduzido': 'reduced_facilities',
+    'Avaliacoes': 'evaluations',
+    'Traco': 'trace',
+    'Perfil': 'profile',
+}
+
+# Tipo SQLite das colunas que não são números reais
+_COLUMN_TYPES = {'instance': 'TEXT', 'path': 'TEXT', 'algorithm': 'TEXT', 'trace': 'TEXT', 'profile': 'TEXT', 'seed': 'INTEGER',
+                 'num_facilities': 'INTEGER', 'num_clients': 'INTEGER', 'reduced_facilities': 'INTEGER', 'evaluations': 'INTEGER'}
+
+# Colunas das tabelas antigas, uma por algoritmo (ResultadosCsv/*.csv e Resultados Finais/*.xlsx)
+LEGACY_COLUMNS = ['Ficheiro', 'Num. Instalacoes', 'Num. Clientes', 'S.Otima', 'S.Obtida', '%', 'TC']
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    params TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    {', '.join(f"{column} {_COLUMN_TYPES.get(column, 'REAL')}" for column in STORE_COLUMNS.values())}
+);
+CREATE INDEX IF NOT EXISTS results_job ON results (algorithm, params, settings, instance, seed);
+"""
+
+def open_store(db_path):
+    """
+    Abre (ou cria) a base de dados de resultados.
+
+    Parameters:
+    db_path (str): Caminho do ficheiro SQLite.
+
+    Returns:
+    sqlite3.Connection: Ligação à base de dados.
+    """
+    db_dir = os.path.dirname(db_path)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    connection = sqlite3.connect(db_path)
+    connection.executescript(_SCHEMA)
+    # Bases de dados criadas antes de uma coluna existir (as linhas antigas ficam com NULL)
+    existing = {info[1] for info in connection.execute("PRAGMA table_info(results)")}
+    for column in STORE_COLUMNS.values():
+        if column not in existing:
+            connection.execute(f"ALTER TABLE results ADD COLUMN {column} {_COLUMN_TYPES.get(column, 'REAL')}")
+    return connection
+
+def job_key(params):
+    """
+    Texto que identifica um dicionário de parâmetros (ou de opções) na base de dados, independente da ordem.
+    """
+    return json.dumps(params or {}, sort_keys=True, default=str)
+
+def store_result(connection, row, params, settings):
+    """
+    Guarda uma linha de resultados (e faz commit, para que sobreviva a uma interrupção).
+
+    Parameters:
+    connection (sqlite3.Connection): Base de dados (ver open_store).
+    row (dict): Linha da tabela de resultados (ver benchmarkRunner.result_row).
+    params (dict): Parâmetros do algoritmo usados no job.
+    settings (dict): Opções da execução que mudam o resultado.
+    """
+    columns = ['params', 'settings', 'finished_at'] + list(STORE_COLUMNS.values())
+    values = [job_key(params), job_key(settings), time.time()]
+    values += [None if row.get(name, '') == '' else row[name] for name in STORE_COLUMNS]
+    connection.execute(f"INSERT INTO results ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", values)
+    connection.commit()
+
+def load_results(connection, algorithm, params, settings):
+    """
+    Linhas guardadas de um algoritmo com estes parâmetros e opções (a mais recente de cada job).
+
+    Returns:
+    dict: (caminho da instância, seed) -> linha da tabela de resultados (as linhas sem caminho não são incluídas).
+    """
+    query = f"""SELECT {', '.join(STORE_COLUMNS.values())} FROM results
+                WHERE algorithm = ? AND params = ? AND settings = ? ORDER BY id"""
+    rows = {}
+    for values in connection.execute(query, (algorithm, job_key(params), job_key(settings))):
+        row = {name: '' if value is None else value for name, value in zip(STORE_COLUMNS, values)}
+        if row['Caminho'] != '':
+            rows[(row['Caminho'], row['Seed'])] = row
+    return rows
+
+def export_results(connection, output_path, algorithms=None, columns=None):
+    """
+    Exporta os resultados guardados para uma tabela CSV ou xlsx (pela extensão de output_path).
+
+    Parameters:
+    connection (sqlite3.Connection): Base de dados (ver open_store).
+    output_path (str): Ficheiro .csv ou .xlsx (o xlsx precisa do openpyxl).
+    algorithms (list): Algoritmos a exportar (None: todos).
+    columns (list): Colunas da tabela (None: todas as de STORE_COLUMNS; LEGACY_COLUMNS dá o formato antigo).
+
+    Returns:
+    int: Número de linhas exportadas.
+    """
+    columns = columns or list(STORE_COLUMNS)
+    # A execução mais recente de cada job
+    query = f"""SELECT {', '.join(STORE_COLUMNS[name] for name in columns)} FROM results
+                WHERE id IN (SELECT MAX(id) FROM results GROUP BY algorithm, params, settings, instance, path, seed)"""
+    arguments = []
+    if algorithms:
+        query += f" AND algorithm IN ({', '.join('?' * len(algorithms))})"
+        arguments += list(algorithms)
+    query += " ORDER BY instance, path, algorithm, params, settings, seed"
+    rows = [['' if value is None else value for value in values] for values in connection.execute(query, arguments)]
+    write_table(rows, output_path, columns)
+    return len(rows)
+
+def write_table(rows, output_path, columns):
+    """
+    Escreve linhas (listas de valores pela ordem de columns) num ficheiro CSV ou xlsx.
+    """
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    if output_path.lower().endswith('.xlsx'):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ImportError(f"Exportar para xlsx precisa do openpyxl (pip install openpyxl); use .csv em {output_path}") from None
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(columns)
+        for row in rows:
+            sheet.append(row)
+        workbook.save(output_path)
+        return
+    with open(output_path, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        writer.writerows(rows)